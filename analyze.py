@@ -1,98 +1,293 @@
 # analyze.py
+import argparse
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import MinMaxScaler
-import matplotlib.pyplot as plt
 import numpy as np
 
-def analyze_data(input_parquet_path='processed_tweets.parquet'):
+import plotting
+from buzz import online_buzz_signal
+from metrics import METRICS, add_metrics_arguments, instrumented_run
+from near_duplicates import near_duplicate_clusters
+from signal_model import SignalModel
+from signals import SIGNAL_WEIGHTS, grouped_signals, trailing_window_signals
+from symbols import SymbolIndex
+
+# Columns analyze_data needs; everything else in the processed dataset is left on disk
+ANALYSIS_COLUMNS = ['timestamp_utc', 'cleaned_content', 'retweet_count', 'like_count', 'user_followers']
+
+# Width of the time buckets the signals are resampled into
+RESAMPLE_FREQ = '15min'
+
+def _to_utc(value):
+    """
+    Converts a datetime-like value to a UTC pandas Timestamp (naive values are taken as UTC).
+    """
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+def load_processed_data(input_parquet_path='processed_tweets.parquet', start=None, end=None, columns=None):
+    """
+    Reads processed tweets with start <= timestamp_utc < end, loading only the given columns.
+
+    Works on a single Parquet file or a dataset directory. On a dataset partitioned by
+    process_data(partitioned=True) the time range prunes whole date/hour partitions;
+    within files it is pushed down to row group statistics.
+    """
+    dataset = ds.dataset(input_parquet_path, format='parquet', partitioning='hive')
+    if columns is not None and 'symbols' in columns and 'symbols' not in dataset.schema.names:
+        raise ValueError(f"{input_parquet_path} has no symbols column; reprocess it with process.py")
+
+    time_filter = None
+    partitioned = {'date', 'hour'} <= set(dataset.schema.names)
+    if start is not None:
+        start = _to_utc(start)
+        time_filter = ds.field('timestamp_utc') >= pa.scalar(start, type=pa.timestamp('ns', tz='UTC'))
+        if partitioned:
+            day = start.strftime('%Y-%m-%d')
+            time_filter &= (ds.field('date') > day) | ((ds.field('date') == day) & (ds.field('hour') >= start.hour))
+    if end is not None:
+        end = _to_utc(end)
+        end_filter = ds.field('timestamp_utc') < pa.scalar(end, type=pa.timestamp('ns', tz='UTC'))
+        if partitioned:
+            day = end.strftime('%Y-%m-%d')
+            end_filter &= (ds.field('date') < day) | ((ds.field('date') == day) & (ds.field('hour') <= end.hour))
+        time_filter = end_filter if time_filter is None else time_filter & end_filter
+
+    return dataset.to_table(columns=columns, filter=time_filter).to_pandas()
+
+def symbol_signals(df, signal_window=None, freq=RESAMPLE_FREQ, weights=SIGNAL_WEIGHTS):
+    """
+    Computes the signals of every symbol and resamples them into freq buckets, for all
+    symbols at once.
+
+    df is a time-indexed, sorted frame of tweets with buzz_signal and symbols columns.
+    Each tweet counts once for every symbol it mentions. The features are min-max
+    scaled among the tweets of the same symbol (over the trailing signal_window, if
+    given); if df already has composite_signal and confidence, e.g. from a signal
+    model, those are used as they are. Returns a long-format DataFrame with one row per
+    symbol and bucket: symbol, bucket, signal and confidence (the means over the
+    bucket's tweets) and count, sorted by symbol and bucket.
+    """
+    # The postings list the rows of each symbol in row order, i.e. in time order
+    index = SymbolIndex(df['symbols'])
+    codes = np.repeat(np.arange(len(index)), np.diff(index.offsets))
+    columns = ['composite_signal', 'confidence'] if 'composite_signal' in df else \
+        ['buzz_signal', 'retweet_count', 'like_count', 'user_followers']
+    tweets = df[columns].iloc[index.rows]
+    if 'composite_signal' not in df:
+        tweets = grouped_signals(tweets, codes, signal_window, weights)
+
+    bucket = tweets.index.floor(freq)
+    grouped = tweets.groupby([codes, bucket], sort=True)
+    result = grouped.agg(signal=('composite_signal', 'mean'), confidence=('confidence', 'mean'),
+                         count=('composite_signal', 'size'))
+    result.index.names = ['symbol', 'bucket']
+    result = result.reset_index()
+    result['symbol'] = pd.Categorical.from_codes(result['symbol'], categories=index.symbols)
+    return result
+
+def analyze_data(input_parquet_path='processed_tweets.parquet', start=None, end=None, columns=None,
+                 buzz_state_dir=None, signal_window=None, model_path=None,
+                 plot_filename='market_signal_visualization.png', plot_in_background=False,
+                 dedup_index_dir=None, collapse_near_duplicates=False, symbol=None, by_symbol=False):
     """
     Loads processed data and performs analysis to generate trading signals.
+
+    start/end restrict the analysis to tweets in [start, end) and columns lists any
+    extra columns to load alongside the ones the analysis needs. With buzz_state_dir
+    the buzz signal comes from the incremental scorer in buzz.py, persisted in that
+    directory, instead of a TF-IDF refit over the loaded tweets. With signal_window
+    (e.g. '1h') each tweet's features are scaled over that trailing window, as
+    signals.StreamingSignalCalculator does, instead of over the whole loaded range.
+    With model_path, a model saved by signal_model.py fit provides the vocabulary, idf
+    and scaling, and nothing is refit; this takes precedence over the two options above.
+
+    With dedup_index_dir, tweets are clustered into near duplicates (copy-pasted or
+    lightly edited text) against the persistent MinHash/LSH index in that directory,
+    adding near_duplicate_of (the id of the cluster's first tweet) and
+    is_near_duplicate. With collapse_near_duplicates only the first tweet of each
+    cluster is kept, so repeated spam does not inflate the signals.
+
+    With symbol (e.g. 'BANKNIFTY') only the tweets mentioning that symbol are
+    analyzed. They are looked up in an inverted index built from the symbols column
+    written by process.py, so the tweet text is not searched again.
+
+    With by_symbol the signals are computed per symbol instead, for all symbols in one
+    grouped pass (see symbol_signals), and the long-format table of 15-minute buckets
+    per symbol is returned instead of the tweets; nothing is plotted.
+
+    The signals are plotted to plot_filename (None skips plotting), in a separate
+    process if plot_in_background is set. Returns the tweets with their signals.
     """
     print("Loading processed data for analysis...")
-    df = pd.read_parquet(input_parquet_path)
+    columns = ANALYSIS_COLUMNS + [col for col in (columns or []) if col not in ANALYSIS_COLUMNS]
+    if (buzz_state_dir is not None or dedup_index_dir is not None) and 'id' not in columns:
+        columns.append('id')
+    if (symbol is not None or by_symbol) and 'symbols' not in columns:
+        columns.append('symbols')
+    with METRICS.step('load') as sizes:
+        df = load_processed_data(input_parquet_path, start=start, end=end, columns=columns)
+        sizes['rows'] = len(df)
+    if df.empty:
+        print("No processed tweets in the requested time range.")
+        return
 
     # Ensure data is sorted by time for time-series analysis
-    df.sort_values('timestamp_utc', inplace=True)
-    df.set_index('timestamp_utc', inplace=True)
+    with METRICS.step('sort', rows=len(df)):
+        df.sort_values('timestamp_utc', inplace=True)
+        df.set_index('timestamp_utc', inplace=True)
+
+    if symbol is not None:
+        with METRICS.step('symbol_index', rows=len(df)):
+            index = SymbolIndex(df['symbols'])
+            df = df.iloc[index.rows_for(symbol)].copy()
+        print(f"{len(df):,} tweets mention {symbol}")
+        if df.empty:
+            return
+
+    if dedup_index_dir is not None:
+        with METRICS.step('near_duplicates', rows=len(df)):
+            df['near_duplicate_of'] = near_duplicate_clusters(df['id'], df.index, df['cleaned_content'],
+                                                              dedup_index_dir)
+        df['is_near_duplicate'] = df['near_duplicate_of'] != df['id']
+        METRICS.count('near_duplicates', int(df['is_near_duplicate'].sum()))
+        if collapse_near_duplicates:
+            df = df[~df['is_near_duplicate']].copy()
+            print(f"Collapsed near duplicates; {len(df):,} tweets left")
 
     print("Data loaded. Starting analysis...")
 
     # --- 1. Text-to-Signal Conversion (TF-IDF) ---
     print("\n--- Generating TF-IDF based Buzz Signal ---")
-    # Use a small number of features for a simple "buzz" score
-    vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(df['cleaned_content'].dropna())
+    if model_path is not None:
+        model = SignalModel.load(model_path)
+        print(f"Scoring with signal model {model.version} fitted at {model.info.get('fitted_at')}")
+        with METRICS.step('model_score', rows=len(df)):
+            signals = model.score(df)
+        df['buzz_signal'] = signals['buzz_signal'].to_numpy()
+    elif buzz_state_dir is not None:
+        # Hashed, decayed TF-IDF: only tweets not seen in earlier runs are scored
+        with METRICS.step('online_buzz', rows=len(df)):
+            df['buzz_signal'] = online_buzz_signal(df['id'], df.index, df['cleaned_content'], buzz_state_dir)
+    else:
+        # Use a small number of features for a simple "buzz" score
+        vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
+        with METRICS.step('tfidf', rows=len(df)):
+            tfidf_matrix = vectorizer.fit_transform(df['cleaned_content'].dropna())
 
-    # Create a simple "buzz" signal by summing the TF-IDF scores for each tweet
-    # This represents the overall importance of the terms in that tweet.
-    df['buzz_signal'] = np.asarray(tfidf_matrix.sum(axis=1)).ravel()
-    print("Top 10 words by TF-IDF:", vectorizer.get_feature_names_out()[:10])
+        # Create a simple "buzz" signal by summing the TF-IDF scores for each tweet
+        # This represents the overall importance of the terms in that tweet.
+        df['buzz_signal'] = np.asarray(tfidf_matrix.sum(axis=1)).ravel()
+        print("Top 10 words by TF-IDF:", vectorizer.get_feature_names_out()[:10])
 
+    if by_symbol:
+        print("\n--- Creating Composite Trading Signals per Symbol ---")
+        if model_path is not None:
+            df[['composite_signal', 'confidence']] = signals[['composite_signal', 'confidence']].to_numpy()
+        with METRICS.step('symbol_signals', rows=len(df)) as sizes:
+            result = symbol_signals(df, signal_window)
+            sizes['rows'] = len(result)
+        if symbol is not None:
+            result = result[result['symbol'] == symbol].reset_index(drop=True)
+        print(f"{len(result):,} buckets for {result['symbol'].nunique():,} symbols")
+        print(result.head())
+        return result
 
     # --- 2. Signal Aggregation ---
     print("\n--- Creating a Composite Trading Signal ---")
     # Combine multiple features into a single signal
     # We will use buzz_signal, retweet_count, and like_count
     
-    # Normalize the features to be on a similar scale (0 to 1)
-    scaler = MinMaxScaler()
-    df[['buzz_normalized', 'retweets_normalized', 'likes_normalized']] = scaler.fit_transform(
-        df[['buzz_signal', 'retweet_count', 'like_count']]
-    )
-
-    # Define weights for each component
-    # Let's say content buzz is most important
-    weights = {'buzz': 0.6, 'retweets': 0.3, 'likes': 0.1}
-
-    # Calculate the composite signal
-    df['composite_signal'] = (
-        weights['buzz'] * df['buzz_normalized'] +
-        weights['retweets'] * df['retweets_normalized'] +
-        weights['likes'] * df['likes_normalized']
-    )
-    
-    # Calculate a confidence interval (e.g., based on user followers)
-    # Here, we create a simple confidence score: more followers = higher confidence
-    df['confidence'] = scaler.fit_transform(df[['user_followers']])
-    
+    if model_path is not None:
+        df[['composite_signal', 'confidence']] = signals[['composite_signal', 'confidence']].to_numpy()
+    elif signal_window is not None:
+        # Scale over the trailing window only, so no signal depends on later tweets
+        with METRICS.step('scaling', rows=len(df)):
+            df[['composite_signal', 'confidence']] = trailing_window_signals(df, signal_window).to_numpy()
+    else:
+        # Normalize the features to be on a similar scale (0 to 1)
+        with METRICS.step('scaling', rows=len(df)):
+            scaler = MinMaxScaler()
+            df[['buzz_normalized', 'retweets_normalized', 'likes_normalized']] = scaler.fit_transform(
+                df[['buzz_signal', 'retweet_count', 'like_count']]
+            )
+
+            # Weights for each component; content buzz counts most
+            weights = SIGNAL_WEIGHTS
+
+            # Calculate the composite signal
+            df['composite_signal'] = (
+                weights['buzz'] * df['buzz_normalized'] +
+                weights['retweets'] * df['retweets_normalized'] +
+                weights['likes'] * df['likes_normalized']
+            )
+
+            # Calculate a confidence interval (e.g., based on user followers)
+            # Here, we create a simple confidence score: more followers = higher confidence
+            df['confidence'] = scaler.fit_transform(df[['user_followers']])
+
     print("Sample of generated signals:")
     print(df[['composite_signal', 'confidence']].head())
 
 
     # --- 3. Memory-Efficient Visualization ---
+    if plot_filename is None:
+        return df
     print("\n--- Generating Visualizations ---")
     # To visualize large datasets, we resample the data instead of plotting every point.
     # Let's resample the signals to a 15-minute interval.
-    
-    resampled_df = df['composite_signal'].resample('15T').mean().dropna()
-    resampled_confidence = df['confidence'].resample('15T').mean().dropna()
-
-    plt.style.use('seaborn-v0_8-darkgrid')
-    fig, ax1 = plt.subplots(figsize=(15, 7))
-
-    # Plot the aggregated signal
-    ax1.plot(resampled_df.index, resampled_df.values, label='Aggregated Composite Signal (15min avg)', color='b')
-    ax1.set_xlabel('Time (UTC)')
-    ax1.set_ylabel('Composite Signal Strength', color='b')
-    ax1.tick_params(axis='y', labelcolor='b')
-    ax1.set_title('Aggregated Market Buzz Signal Over Time')
-    
-    # Create a second y-axis for confidence
-    ax2 = ax1.twinx()
-    ax2.plot(resampled_confidence.index, resampled_confidence.values, label='Avg. Confidence (15min avg)', color='g', linestyle='--')
-    ax2.set_ylabel('Average Confidence Score', color='g')
-    ax2.tick_params(axis='y', labelcolor='g')
-
-    fig.tight_layout()
-    plt.legend()
-    
-    # Save the plot to a file
-    plot_filename = 'market_signal_visualization.png'
-    plt.savefig(plot_filename)
-    print(f"Visualization saved to {plot_filename}")
-    plt.show()
+    with METRICS.step('resample', rows=len(df)):
+        resampled_df = df['composite_signal'].resample(RESAMPLE_FREQ).mean().dropna()
+        resampled_confidence = df['confidence'].resample(RESAMPLE_FREQ).mean().dropna()
+
+    if plot_in_background:
+        with METRICS.step('plot_start'):
+            plotting.plot_signals_in_background(resampled_df, resampled_confidence, plot_filename)
+        print(f"Rendering visualization to {plot_filename} in the background")
+    else:
+        with METRICS.step('plot', rows=len(resampled_df)):
+            plotting.plot_signals(resampled_df, resampled_confidence, plot_filename)
+    return df
 
 
 if __name__ == '__main__':
-    analyze_data()
+    parser = argparse.ArgumentParser(description="Generate trading signals from processed tweets.")
+    parser.add_argument('--input', default='processed_tweets.parquet', help="Parquet file or dataset directory")
+    parser.add_argument('--start', help="only analyze tweets at or after this UTC time")
+    parser.add_argument('--end', help="only analyze tweets before this UTC time")
+    parser.add_argument('--last-hours', type=float, help="only analyze the last N hours (overrides --start)")
+    parser.add_argument('--buzz-state', help="directory for the incremental buzz scorer's state "
+                                             "(default: refit TF-IDF on the loaded tweets)")
+    parser.add_argument('--signal-window', help="scale signals over this trailing window, e.g. 1h "
+                                                "(default: over all loaded tweets)")
+    parser.add_argument('--model', help="score with a model saved by signal_model.py fit instead of refitting")
+    parser.add_argument('--dedup-index', help="directory of the near-duplicate index; flags near duplicates")
+    parser.add_argument('--collapse-duplicates', action='store_true',
+                        help="with --dedup-index, keep only the first tweet of each near-duplicate cluster")
+    parser.add_argument('--symbol', help="only analyze tweets mentioning this symbol, e.g. NIFTY")
+    parser.add_argument('--by-symbol', help="compute the signals of every symbol and save them, in 15-minute "
+                                            "buckets, to this Parquet file (no plot)")
+    parser.add_argument('--plot-file', default='market_signal_visualization.png', help="where to save the plot")
+    parser.add_argument('--no-plot', action='store_true', help="skip the visualization stage")
+    parser.add_argument('--plot-background', action='store_true',
+                        help="render the plot in a separate process")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    start = args.start
+    if args.last_hours is not None:
+        start = pd.Timestamp.now(tz='UTC') - pd.Timedelta(hours=args.last_hours)
+    with instrumented_run('analyze', args.metrics_file, args.prometheus_file, args.profile, args.tracemalloc):
+        result = analyze_data(args.input, start=start, end=args.end, buzz_state_dir=args.buzz_state,
+                     signal_window=args.signal_window, model_path=args.model,
+                     plot_filename=None if args.no_plot else args.plot_file,
+                     plot_in_background=args.plot_background, dedup_index_dir=args.dedup_index,
+                     collapse_near_duplicates=args.collapse_duplicates, symbol=args.symbol,
+                     by_symbol=args.by_symbol is not None)
+        if args.by_symbol is not None and result is not None:
+            result.to_parquet(args.by_symbol, index=False)
+            print(f"Saved signals per symbol to {args.by_symbol}")
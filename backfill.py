@@ -0,0 +1,231 @@
+# backfill.py
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+def search_time(moment):
+    """
+    Formats a UTC datetime for the search's since:/until: operators.
+    """
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%d_%H:%M:%S_UTC')
+
+def window_query(query, start, end):
+    return f'{query} since:{search_time(start)} until:{search_time(end)}'
+
+def _parse_date(value):
+    """
+    Turns a date ('2025-08-01'), an ISO 8601 time or a datetime into a UTC datetime.
+    """
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+class BackfillPlan:
+    """
+    Time windows of a historical backfill, sized by the tweet density observed so far
+    and kept in a JSON file with the completion of every window, so a large backfill
+    can run concurrently and resume where it stopped.
+
+    Each backfill, a query over a [since, until) range, is carved into since:/until:
+    windows newest first, one window at a time as searches become free. A window is
+    sized to hold about target_tweets tweets at the density (tweets per second) of
+    the windows of that backfill finished last, within [min_window, max_window]; the
+    first one spans initial_window. Backfills are keyed by their query and range, so
+    running the same backfill again carries on with its plan.
+
+    A search whose window turns out far denser than planned can stop early with
+    split(): the part it covered is finished and the rest of the window goes back to
+    the range still to carve, to be cut into smaller windows other accounts can
+    take. Windows left running by a crash are handed out again first, under the same
+    query, so ScrapeCheckpoints resumes their pagination.
+
+    Changes are kept in memory and written by save(), at most every save_interval
+    seconds through maybe_save(). before_save is called first, as in
+    ScrapeCheckpoints.
+    """
+
+    def __init__(self, path='backfill_plan.json', target_tweets=1000, min_window=timedelta(minutes=15),
+                 max_window=timedelta(days=7), initial_window=timedelta(days=1), save_interval=5.0,
+                 before_save=None):
+        self.path = path
+        self.target_tweets = target_tweets
+        self.min_window = min_window
+        self.max_window = max_window
+        self.initial_window = initial_window
+        self.save_interval = save_interval
+        self.before_save = before_save
+        self.backfills = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.backfills = json.load(f)['backfills']
+        # Windows handed out by an earlier run that never finished
+        self._resume = [name for backfill in self.backfills.values()
+                        for name, window in backfill['windows'].items() if window['status'] == 'running']
+        self._running = {}
+        self._last_save = time.monotonic()
+
+    def add(self, query, since, until):
+        """
+        Plans the backfill of query over [since, until), unless it is planned already,
+        and returns its key.
+        """
+        since, until = _parse_date(since), _parse_date(until)
+        key = window_query(query, since, until)
+        if key in self.backfills:
+            return key
+        self.backfills[key] = {
+            'query': query, 'since': since.isoformat(), 'until': until.isoformat(),
+            # Ranges not carved into windows yet, newest first
+            'pending': [[since.isoformat(), until.isoformat()]] if since < until else [],
+            'windows': {}, 'density': None, 'tweets': 0,
+        }
+        return key
+
+    def window_size(self, key):
+        """
+        Returns the duration of the next window of a backfill.
+        """
+        density = self.backfills[key]['density']
+        if density is None:
+            return self.initial_window
+        if density <= 0:
+            return self.max_window
+        return min(self.max_window, max(self.min_window, timedelta(seconds=self.target_tweets / density)))
+
+    def has_work(self):
+        return bool(self._resume) or any(backfill['pending'] for backfill in self.backfills.values())
+
+    @property
+    def running(self):
+        return len(self._running)
+
+    def next_window(self):
+        """
+        Hands out the next window to search, as its search query, marking it running;
+        returns None if every window is carved and handed out.
+
+        The backfill with the fewest windows running is served first, so searches
+        spread over all the queries.
+        """
+        if self._resume:
+            name = self._resume.pop(0)
+            self._running[name] = next(key for key, backfill in self.backfills.items()
+                                       if name in backfill['windows'])
+            return name
+        candidates = [key for key, backfill in self.backfills.items() if backfill['pending']]
+        if not candidates:
+            return None
+        busy = {}
+        for key in self._running.values():
+            busy[key] = busy.get(key, 0) + 1
+        key = min(candidates, key=lambda key: busy.get(key, 0))
+
+        backfill = self.backfills[key]
+        start, end = (_parse_date(value) for value in backfill['pending'][0])
+        size = self.window_size(key)
+        # A sliver shorter than min_window is not worth a search of its own
+        window_start = start if end - start < size + self.min_window else end - size
+        if window_start == start:
+            backfill['pending'].pop(0)
+        else:
+            backfill['pending'][0][1] = window_start.isoformat()
+        name = window_query(backfill['query'], window_start, end)
+        backfill['windows'][name] = {'since': window_start.isoformat(), 'until': end.isoformat(),
+                                     'status': 'running', 'tweets': 0}
+        self._running[name] = key
+        return name
+
+    def window(self, name):
+        """
+        Returns the record of a window handed out by next_window().
+        """
+        return self.backfills[self._running[name]]['windows'][name]
+
+    def _observe(self, key, tweets, seconds):
+        # The density of neighbouring time counts most, older windows fade out
+        backfill = self.backfills[key]
+        density = tweets / max(seconds, 1.0)
+        backfill['density'] = density if backfill['density'] is None else 0.5 * (backfill['density'] + density)
+        backfill['tweets'] += tweets
+
+    def finish(self, name, tweets):
+        """
+        Records that a window was searched to its end, yielding tweets tweets.
+        """
+        key = self._running.pop(name)
+        window = self.backfills[key]['windows'][name]
+        window['status'] = 'done'
+        window['tweets'] += tweets
+        seconds = (_parse_date(window['until']) - _parse_date(window['since'])).total_seconds()
+        self._observe(key, window['tweets'], seconds)
+        window['finished_at'] = datetime.now(timezone.utc).isoformat()
+
+    def split(self, name, tweets, oldest):
+        """
+        Records that a window was searched down to the tweet time oldest, yielding
+        tweets tweets, and returns the rest of it to the range still to carve. The
+        second of oldest stays in the rest, as it may not have been searched fully.
+
+        A rest of at least twice min_window goes back as two halves, so the search
+        that split and another one both get part of it.
+        """
+        key = self._running.pop(name)
+        backfill = self.backfills[key]
+        window = backfill['windows'][name]
+        boundary = _parse_date(oldest).replace(microsecond=0) + timedelta(seconds=1)
+        window['status'] = 'split'
+        window['tweets'] += tweets
+        window['searched_since'] = boundary.isoformat()
+        self._observe(key, window['tweets'], (_parse_date(window['until']) - boundary).total_seconds())
+        window['finished_at'] = datetime.now(timezone.utc).isoformat()
+        # The rest is newer than anything not carved yet, so it goes first
+        since = _parse_date(window['since'])
+        if boundary - since >= 2 * self.min_window:
+            middle = since + timedelta(seconds=(boundary - since).total_seconds() // 2)
+            rest = [[middle.isoformat(), boundary.isoformat()], [window['since'], middle.isoformat()]]
+        else:
+            rest = [[window['since'], boundary.isoformat()]]
+        backfill['pending'][:0] = rest
+
+    def release(self, name):
+        """
+        Gives up on a running window for this run; the next run hands it out again.
+        """
+        self._running.pop(name)
+
+    def is_complete(self, key=None):
+        """
+        Returns True once every window of a backfill (of every backfill, for None) is
+        searched.
+        """
+        keys = self.backfills if key is None else [key]
+        return all(not self.backfills[k]['pending']
+                   and all(window['status'] != 'running' for window in self.backfills[k]['windows'].values())
+                   for k in keys)
+
+    def progress(self, key):
+        """
+        Returns the fraction of a backfill's range searched so far.
+        """
+        backfill = self.backfills[key]
+        total = (_parse_date(backfill['until']) - _parse_date(backfill['since'])).total_seconds()
+        left = sum((_parse_date(end) - _parse_date(start)).total_seconds() for start, end in backfill['pending'])
+        left += sum((_parse_date(window['until']) - _parse_date(window['since'])).total_seconds()
+                    for window in backfill['windows'].values() if window['status'] == 'running')
+        return 1.0 if total <= 0 else 1.0 - left / total
+
+    def maybe_save(self):
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        """
+        Atomically replaces the plan file.
+        """
+        if self.before_save is not None:
+            self.before_save()
+        if self.path:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'backfills': self.backfills}, f, indent=4)
+            os.replace(self.path + '.tmp', self.path)
+        self._last_save = time.monotonic()
@@ -0,0 +1,860 @@
+# benchmark.py
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MinMaxScaler
+
+from analyze import RESAMPLE_FREQ, analyze_data, symbol_signals
+from backfill import BackfillPlan, window_query
+from buzz import OnlineBuzzScorer
+from metrics import METRICS
+from mock_twscrape import FakeAuthServer, MockAPI, mock_tweet
+from near_duplicates import NearDuplicateIndex
+from process import (CATEGORICAL_COLUMNS, COUNT_COLUMNS, ENGINES, PARQUET_COMPRESSION, PROCESSED_SCHEMA,
+                     clean_tweet_content, clean_tweet_content_batch, expand_input_paths, process_data,
+                     process_frame)
+from scheduler import FixedScheduler, QueryScheduler, poisson_arrivals, simulate_polling
+from scrapper import (iter_backfill_tweets, iter_new_tweets, scrape_queries, start_accounts, tweet_to_record,
+                      tweet_to_row)
+from seen_index import SeenIdIndex
+from session_cache import SessionCache
+from signal_model import SignalModel
+from signals import SIGNAL_WEIGHTS
+from symbols import SymbolIndex, SymbolMatcher, load_symbol_dictionary, normalize_alias
+from synthetic import HASHTAGS, TWITTER_EPOCH_MS, WORDS, generate_synthetic_tweets, write_synthetic_ndjson
+from tweet_writers import NDJSONTweetWriter, ParquetTweetWriter, records_to_batch, serialize_records
+
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+# The mock API keeps every tweet it serves in memory, so the scrape stage is capped
+SCRAPE_MAX_ROWS = 100_000
+# A stage regresses when it is this much slower, or uses this much more memory, than the baseline
+REGRESSION_TOLERANCE = 0.25
+
+def _timed(func, *args, **kwargs):
+    """
+    Runs func once and returns (result, elapsed seconds).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_clean(rows):
+    """
+    Compares the per-row clean_tweet_content apply with clean_tweet_content_batch.
+    """
+    print(f"Generating {rows:,} synthetic tweets...")
+    contents = pd.Series([tweet['content'] for tweet in generate_synthetic_tweets(rows)])
+
+    expected, apply_secs = _timed(contents.apply, clean_tweet_content)
+    result, batch_secs = _timed(clean_tweet_content_batch, contents)
+
+    if not expected.equals(result):
+        raise AssertionError("clean_tweet_content_batch output differs from clean_tweet_content")
+
+    print(f"apply(clean_tweet_content):  {apply_secs:8.3f}s  {rows / apply_secs:12,.0f} rows/s")
+    print(f"clean_tweet_content_batch:   {batch_secs:8.3f}s  {rows / batch_secs:12,.0f} rows/s")
+    print(f"Speedup: {apply_secs / batch_secs:.2f}x (outputs identical)")
+
+def bench_scrape(accounts, queries, limit, latency):
+    """
+    Compares scraping a set of queries one at a time with fanning them out across the
+    mock account pool, offline against MockAPI.
+    """
+    query_list = [f'#{tag}' for tag in HASHTAGS[:queries]]
+
+    for label, concurrency in [('sequential', 1), (f'{accounts} accounts', None)]:
+        api = MockAPI(num_accounts=accounts, latency=latency)
+        records, secs = _timed(asyncio.run, scrape_queries(api, query_list, limit=limit, concurrency=concurrency))
+        requests = sum(account.total_requests for account in api.pool.accounts)
+        print(f"{label:>14}: {secs:7.2f}s  {len(records):7,} unique tweets  "
+              f"{requests:5,} requests  {len(records) / secs:10,.0f} tweets/s")
+
+def bench_rescrape(accounts, queries, universe, new, latency):
+    """
+    Scrapes the same queries twice, the second time after new tweets were posted, and
+    compares a second run without memory of the first with one using a SeenIdIndex.
+    """
+    query_list = [f'#{tag}' for tag in HASHTAGS[:queries]]
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, 'seen_ids.npy')
+        with SeenIdIndex(index_path) as index:
+            api = MockAPI(num_accounts=accounts, latency=latency, universe_size=universe + new)
+            # The newest tweets are not posted yet at the first run
+            api.universe = api.universe[new:]
+            first = asyncio.run(scrape_queries(api, query_list, limit=-1))
+            index.update(record['id'] for record in first)
+        print(f"First run: {len(first):,} tweets; index {os.path.getsize(index_path) / 1e3:,.0f}KB on disk")
+
+        for label, known_ids in [('no index', None), ('seen index', SeenIdIndex(index_path))]:
+            api = MockAPI(num_accounts=accounts, latency=latency, universe_size=universe + new)
+            records, secs = _timed(asyncio.run, scrape_queries(api, query_list, limit=-1, known_ids=known_ids))
+            requests = sum(account.total_requests for account in api.pool.accounts)
+            print(f"{label:>11}: {secs:7.2f}s  {len(records):7,} tweets written  {requests:5,} requests")
+
+def _bursty_universe(rows, days, seed=42, start=datetime(2025, 8, 1, tzinfo=timezone.utc)):
+    """
+    Synthetic tweets spread over days days the way market chatter is: most of them in
+    weekday trading hours (09:15-15:30 IST), a trickle at other times and a burst
+    around one event. Newest first, as MockAPI.universe holds them.
+    """
+    rng = np.random.default_rng(seed)
+    session_days = [day for day in range(days) if (start + pd.Timedelta(days=day)).weekday() < 5] or [0]
+    kinds = rng.choice(3, rows, p=[0.7, 0.25, 0.05])
+    seconds = np.where(
+        kinds == 0, rng.choice(session_days, rows) * 86400 + rng.integers(13500, 36000, rows),
+        np.where(kinds == 1, rng.integers(0, days * 86400, rows),
+                 (days // 2) * 86400 + 36000 + rng.integers(0, 3600, rows)))
+    seconds = np.sort(seconds)
+    universe = []
+    for seq, (record, second) in enumerate(zip(generate_synthetic_tweets(rows, seed), seconds)):
+        timestamp = start + pd.Timedelta(seconds=int(second))
+        record['id'] = ((int(timestamp.timestamp() * 1000) - TWITTER_EPOCH_MS) << 22) | (seq & 0x3FFFFF)
+        record['timestamp_utc'] = timestamp.isoformat()
+        universe.append(record)
+    return universe[::-1]
+
+def bench_backfill(accounts, rows, days, latency, window_tweets=1000):
+    """
+    Backfills days days of a bursty tweet stream across accounts mock accounts: as one
+    search over the whole range, as fixed one-day and one-hour windows, and as
+    adaptive windows from a BackfillPlan. Checks that every strategy collects the
+    same tweets.
+    """
+    universe = _bursty_universe(rows, days)
+    since = datetime(2025, 8, 1, tzinfo=timezone.utc)
+    until = since + pd.Timedelta(days=days)
+    plans = {
+        'fixed 1-day windows': dict(min_window=pd.Timedelta(days=1), max_window=pd.Timedelta(days=1),
+                                    initial_window=pd.Timedelta(days=1)),
+        'fixed 1-hour windows': dict(min_window=pd.Timedelta(hours=1), max_window=pd.Timedelta(hours=1),
+                                     initial_window=pd.Timedelta(hours=1)),
+        'adaptive windows': dict(),
+    }
+
+    async def backfill(api, label):
+        if label not in plans:
+            tweets = iter_new_tweets(api, [window_query('#nifty', since, until)], limit=-1, stop_after_known=None)
+            return {tweet.id async for tweet in tweets}, 1
+        plan = BackfillPlan(None, target_tweets=window_tweets, **plans[label])
+        plan.add('#nifty', since, until)
+        # Fixed windows are never split
+        split_after = float('inf') if plans[label] else None
+        ids = {tweet.id async for tweet in iter_backfill_tweets(api, plan, split_after=split_after)}
+        if not plan.is_complete():
+            raise AssertionError(f"{label} left windows unsearched")
+        return ids, sum(len(backfill['windows']) for backfill in plan.backfills.values())
+
+    print(f"{rows:,} tweets over {days} days, {accounts} accounts, {latency * 1e3:.0f}ms per page")
+    print(f"{'strategy':>20} {'seconds':>8} {'requests':>9} {'windows':>8} {'tweets':>8}")
+    expected = None
+    for label in ['one search', *plans]:
+        api = MockAPI(num_accounts=accounts, latency=latency, requests_per_window=10 ** 9, universe_size=0,
+                      match_rate=1.0)
+        api.universe = universe
+        (ids, windows), seconds = _timed(asyncio.run, backfill(api, label))
+        expected = ids if expected is None else expected
+        if ids != expected:
+            raise AssertionError(f"{label} collected different tweets")
+        requests = sum(account.total_requests for account in api.pool.accounts)
+        print(f"{label:>20} {seconds:>8.2f} {requests:>9,} {windows:>8,} {len(ids):>8,}")
+
+def bench_schedule(queries, hours, budgets=(0.1, 0.2, 0.5, 1.0), seed=42):
+    """
+    Replays hours hours of tweets for queries queries through simulate_polling, with
+    Zipf-distributed query rates and a half-hour burst in a quiet query, at several
+    request budgets: polling every query at the same cadence (fast enough to spend
+    the budget) vs the adaptive QueryScheduler.
+    """
+    duration = int(hours * 3600)
+    rates = [np.full(duration, 1.0 / rank ** 1.2) for rank in range(1, queries + 1)]
+    burst = rates[min(queries - 1, 40)]
+    burst[duration // 3:duration // 3 + 1800] = 1.0
+    arrivals = {f'q{i}': poisson_arrivals(rate, duration, seed=seed + i) for i, rate in enumerate(rates)}
+    posted = sum(len(posts) for posts in arrivals.values())
+
+    print(f"{posted:,} tweets posted to {queries} queries over {hours}h")
+    print(f"{'req/s':>6} {'scheduler':>9} {'requests':>9} {'captured':>9} {'missed':>8} {'tweets/req':>11} "
+          f"{'median delay':>13} {'p90 delay':>10}")
+    for budget in budgets:
+        for label, scheduler in [('fixed', FixedScheduler(arrivals, interval=queries / budget)),
+                                 ('adaptive', QueryScheduler(arrivals))]:
+            result = simulate_polling(scheduler, arrivals, duration, budget)
+            delays = result['delays']
+            print(f"{budget:>6.2f} {label:>9} {result['requests']:>9,} {result['captured']:>9,} "
+                  f"{result['missed']:>8,} {result['captured'] / max(result['requests'], 1):>11.1f} "
+                  f"{np.median(delays):>12.0f}s {np.percentile(delays, 90):>9.0f}s")
+
+def bench_sessions(accounts, login_latency, latency):
+    """
+    Measures how long a scraper start takes until its accounts can search and until
+    the first search returns, logging in against a local FakeAuthServer: logging
+    every account in up front as before, then with an empty session cache, with all
+    sessions cached, and with half of them expired.
+    """
+    account_list = [{'username': f'acct{i}', 'password': 'pass', 'email': f'acct{i}@example.com',
+                     'email_password': 'mail'} for i in range(accounts)]
+
+    async def start(server, sessions):
+        api = MockAPI(num_accounts=0, latency=latency, auth_url=server.url)
+        logins = server.logins
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            refresh = await start_accounts(api, account_list, sessions)
+        ready = time.perf_counter() - started
+        await scrape_queries(api, ['#nifty'], limit=api.page_size, concurrency=accounts)
+        first_search = time.perf_counter() - started
+        if refresh is not None:
+            await refresh
+        return ready, first_search, time.perf_counter() - started, server.logins - logins
+
+    async def run(path):
+        async with FakeAuthServer(login_latency) as server:
+            print(f"{'start':>13} {'ready':>8} {'1st search':>11} {'all ready':>10} {'logins':>7}")
+            for label in ['no cache', 'cold', 'warm', 'half expired']:
+                sessions = None if label == 'no cache' else SessionCache(path)
+                if label == 'half expired':
+                    for username in list(sessions.sessions)[::2]:
+                        sessions.sessions[username]['expires_at'] = datetime.now(timezone.utc).isoformat()
+                ready, first_search, total, logins = await start(server, sessions)
+                print(f"{label:>13} {ready:>7.2f}s {first_search:>10.2f}s {total:>9.2f}s {logins:>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(os.path.join(tmp, 'sessions.json')))
+
+def bench_buzz(rows, batches):
+    """
+    Compares refitting TfidfVectorizer on the whole history each time a batch of tweets
+    arrives with the incremental OnlineBuzzScorer, which only scores the new batch and
+    saves its state.
+    """
+    print(f"Generating {rows:,} synthetic tweets in {batches} batches...")
+    tweets = pd.DataFrame(generate_synthetic_tweets(rows), columns=['timestamp_utc', 'content'])
+    texts = clean_tweet_content_batch(tweets['content'])
+    timestamps = pd.to_datetime(tweets['timestamp_utc'], utc=True)
+    bounds = np.linspace(0, rows, batches + 1).astype(int)
+
+    refit_secs = []
+    for end in bounds[1:]:
+        vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
+        matrix, secs = _timed(vectorizer.fit_transform, texts[:end])
+        refit_secs.append(secs)
+    refit_buzz = np.asarray(matrix.sum(axis=1)).ravel()
+
+    online_secs = []
+    scorer = OnlineBuzzScorer()
+    online_buzz = []
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = os.path.join(tmp, 'state.npz')
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            began = time.perf_counter()
+            online_buzz.append(scorer.update_and_score(texts[start:end], timestamps[start:end]))
+            scorer.save(state_path)
+            online_secs.append(time.perf_counter() - began)
+        state_bytes = os.path.getsize(state_path)
+    online_buzz = np.concatenate(online_buzz)
+
+    print(f"full refit per batch:  {sum(refit_secs):8.3f}s total  {refit_secs[-1]:7.3f}s for the last batch")
+    print(f"online scorer:         {sum(online_secs):8.3f}s total  {online_secs[-1]:7.3f}s for the last batch"
+          f"  ({state_bytes / 1024:,.0f} KiB state)")
+    print(f"Speedup: {sum(refit_secs) / sum(online_secs):.2f}x overall, "
+          f"{refit_secs[-1] / online_secs[-1]:.2f}x on the last batch")
+    correlation = pd.Series(online_buzz).corr(pd.Series(refit_buzz), method='spearman')
+    print(f"Rank correlation with the final refit's buzz: {correlation:.3f}")
+
+def bench_model(rows, batch):
+    """
+    Compares refitting the TF-IDF vocabulary and scalers on the history plus a new
+    batch, as analyze_data does, with scoring the batch with a saved SignalModel.
+    """
+    print(f"Generating {rows:,} synthetic tweets plus a batch of {batch:,}...")
+    tweets = pd.DataFrame(generate_synthetic_tweets(rows + batch))
+    tweets['cleaned_content'] = clean_tweet_content_batch(tweets['content'])
+    history, new = tweets.iloc[:rows], tweets.iloc[rows:]
+
+    _, refit_secs = _timed(SignalModel.fit, tweets)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'signal_model')
+        SignalModel.fit(history).save(model_path)
+        model, load_secs = _timed(SignalModel.load, model_path)
+        _, score_secs = _timed(model.score, new)
+
+    print(f"refit on history + batch:  {refit_secs * 1e3:10.1f}ms")
+    print(f"load saved model:          {load_secs * 1e3:10.1f}ms")
+    print(f"score batch:               {score_secs * 1e3:10.1f}ms  {batch / score_secs:12,.0f} tweets/s")
+    print(f"Speedup: {refit_secs / (load_secs + score_secs):.1f}x")
+
+def bench_schema(rows):
+    """
+    Reports the memory and Parquet size of processed tweets with the compact schema
+    (uint32 counts, dictionary-encoded username/user_location, zstd files) against the
+    previous one (int64 counts, plain strings, snappy files).
+    """
+    print(f"Processing {rows:,} synthetic tweets...")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        compact = process_frame(pd.DataFrame(generate_synthetic_tweets(rows)))
+    legacy = compact.astype({**{col: 'int64' for col in COUNT_COLUMNS},
+                             **{col: 'object' for col in CATEGORICAL_COLUMNS}})
+    legacy_schema = pa.schema([
+        pa.field(field.name, pa.int64() if field.name in COUNT_COLUMNS
+                 else pa.string() if field.name in CATEGORICAL_COLUMNS else field.type)
+        for field in PROCESSED_SCHEMA
+    ])
+
+    sizes = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, df, schema, compression in [('previous', legacy, legacy_schema, 'snappy'),
+                                               ('compact', compact, PROCESSED_SCHEMA, PARQUET_COMPRESSION)]:
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            path = os.path.join(tmp, f'{label}.parquet')
+            pq.write_table(table, path, compression=compression)
+            loaded = pq.read_table(path).to_pandas()
+            changed = COUNT_COLUMNS + CATEGORICAL_COLUMNS
+            sizes[label] = {
+                'pandas (changed columns)': df[changed].memory_usage(deep=True).sum(),
+                'pandas (all columns)': df.memory_usage(deep=True).sum(),
+                'arrow table': table.nbytes,
+                'parquet file': os.path.getsize(path),
+                'pandas read back': loaded.memory_usage(deep=True).sum(),
+            }
+
+    print(f"{'':>26} {'previous':>12} {'compact':>12} {'saved':>7}")
+    for name in sizes['previous']:
+        before, after = sizes['previous'][name], sizes['compact'][name]
+        print(f"{name:>26} {before / 1e6:>10.1f}MB {after / 1e6:>10.1f}MB {1 - after / before:>7.0%}")
+
+def _decoded(table):
+    # Dictionary order depends on the engine, so compare the values they stand for
+    return table.cast(pa.schema([
+        pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ]))
+
+def bench_engines(rows, data_dir='bench_data', seed=42, stream=False):
+    """
+    Processes the same synthetic NDJSON input with the pandas and Arrow engines, each
+    in a fresh process, and checks that they write identical Parquet output.
+    """
+    raw_dir = os.path.join(data_dir, f'raw-{rows}-{seed}')
+    if not os.path.isdir(raw_dir):
+        print(f"Generating {rows:,} synthetic tweets in {raw_dir}...")
+        os.makedirs(data_dir, exist_ok=True)
+        run_stage(_stage_generate, raw_dir, rows, seed)
+
+    results, tables = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for engine in ENGINES:
+            path = os.path.join(tmp, f'{engine}.parquet')
+            results[engine] = run_stage(_stage_process, raw_dir, path, stream, engine)
+            tables[engine] = _decoded(pq.read_table(path))
+        if not tables['pandas'].equals(tables['arrow']):
+            raise AssertionError("Arrow engine output differs from the pandas engine")
+
+    mode = 'streaming' if stream else 'in memory'
+    print(f"Processing {rows:,} tweets ({mode}):")
+    for engine, result in results.items():
+        steps = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in
+                          sorted(result['steps'].items(), key=lambda item: -item[1])[:4])
+        print(f"{engine:>8}: {result['seconds']:8.2f}s  {rows / result['seconds']:10,.0f} rows/s  "
+              f"peak RSS {result['peak_rss_mb']:7.0f}MB  ({steps})")
+    print(f"Speedup: {results['pandas']['seconds'] / results['arrow']['seconds']:.2f}x (outputs identical)")
+
+def _stage_compare(path, expected_path):
+    # Run as a stage so reading both outputs never inflates this process's peak RSS,
+    # which the next stage's process would inherit
+    return {'equal': pq.read_table(path).equals(pq.read_table(expected_path))}
+
+def bench_parallel(rows, workers=(1, 2, 4, 8), data_dir='bench_data', seed=42, engine='pandas'):
+    """
+    Processes the same synthetic NDJSON input with process_data's sharded mode at each
+    worker count and reports the scaling, checking every output against one worker's.
+    """
+    raw_dir = os.path.join(data_dir, f'raw-{rows}-{seed}')
+    if not os.path.isdir(raw_dir):
+        print(f"Generating {rows:,} synthetic tweets in {raw_dir}...")
+        os.makedirs(data_dir, exist_ok=True)
+        run_stage(_stage_generate, raw_dir, rows, seed)
+
+    print(f"Processing {rows:,} tweets with the {engine} engine on {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>11} {'speedup':>8} {'peak RSS':>9}")
+    expected_path, first_seconds = None, None
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in workers:
+            path = os.path.join(tmp, f'workers-{count}.parquet')
+            result = run_stage(_stage_process, raw_dir, path, False, engine, count)
+            if expected_path is None:
+                expected_path, first_seconds = path, result['seconds']
+            else:
+                if not run_stage(_stage_compare, path, expected_path)['equal']:
+                    raise AssertionError(f"Output with {count} workers differs from {workers[0]} worker(s)")
+                os.remove(path)
+            print(f"{count:>8} {result['seconds']:>9.2f} {rows / result['seconds']:>11,.0f} "
+                  f"{first_seconds / result['seconds']:>7.2f}x {result['peak_rss_mb']:>7.0f}MB")
+    print("Outputs identical")
+
+def bench_near_duplicates(rows, batches, dup_rate=0.2, seed=42):
+    """
+    Feeds synthetic tweets, dup_rate of which are copies of an earlier tweet with one
+    word changed, to a NearDuplicateIndex batch by batch, and reports the time per
+    batch as the index grows and how many copies are caught.
+    """
+    print(f"Generating {rows:,} synthetic tweets with {dup_rate:.0%} near-duplicate copies...")
+    contents = clean_tweet_content_batch(pd.Series([tweet['content'] for tweet in generate_synthetic_tweets(rows, seed)]))
+    texts = contents.tolist()
+    rng = np.random.default_rng(seed)
+    is_copy = rng.random(rows) < dup_rate
+    is_copy[0] = False
+    for i in np.flatnonzero(is_copy):
+        words = texts[rng.integers(0, i)].split(' ')
+        words[rng.integers(0, len(words))] = WORDS[rng.integers(0, len(WORDS))]
+        texts[i] = ' '.join(words)
+    ids = np.arange(rows, dtype=np.int64)
+
+    index = NearDuplicateIndex()
+    clusters = np.empty(rows, dtype=np.int64)
+    print(f"{'batch':>6} {'indexed':>10} {'ms':>9} {'us/tweet':>9}")
+    for number, batch in enumerate(np.array_split(np.arange(rows), batches), start=1):
+        indexed = len(index)
+        clusters[batch], seconds = _timed(index.assign, ids[batch], [texts[i] for i in batch])
+        print(f"{number:>6} {indexed:>10,} {seconds * 1e3:>9.1f} {seconds / len(batch) * 1e6:>9.1f}")
+
+    flagged = clusters != ids
+    caught = int((flagged & is_copy).sum())
+    print(f"Copies flagged: {caught:,} of {int(is_copy.sum()):,} (recall {caught / max(is_copy.sum(), 1):.1%}); "
+          f"originals flagged: {int((flagged & ~is_copy).sum()):,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        _, save_seconds = _timed(index.save, os.path.join(tmp, 'index'))
+        _, load_seconds = _timed(NearDuplicateIndex.load, os.path.join(tmp, 'index'))
+    print(f"Index of {len(index):,} tweets: save {save_seconds:.2f}s, load {load_seconds:.2f}s")
+
+def bench_symbols(rows, names=5_000, regex_rows=2_000, seed=42):
+    """
+    Times symbol extraction with the default dictionary and with one padded out to
+    names symbols, against a single regex alternation of all aliases on a sample, and
+    per-symbol lookups through the inverted index against scanning the symbols lists.
+    """
+    print(f"Generating {rows:,} synthetic tweets...")
+    tweets = list(generate_synthetic_tweets(rows, seed))
+    contents = clean_tweet_content_batch(pa.array([tweet['content'] for tweet in tweets], type=pa.string()))
+    hashtags = pa.array([tweet['hashtags'] for tweet in tweets], type=pa.list_(pa.string()))
+
+    dictionary = load_symbol_dictionary()
+    large = dict(dictionary)
+    for i in range(max(names - len(dictionary), 0)):
+        large[f'SYM{i}'] = [f'company{i} industries', f'cmp{i}', f'company{i} holdings ltd']
+
+    print(f"{'dictionary':>11} {'symbols':>8} {'seconds':>8} {'us/tweet':>9} {'mentions':>10}")
+    for label, entries in [('default', dictionary), ('large', large)]:
+        matcher = SymbolMatcher(entries)
+        symbols, seconds = _timed(matcher.match, contents, hashtags)
+        print(f"{label:>11} {len(matcher):>8,} {seconds:>8.2f} {seconds / rows * 1e6:>9.2f} "
+              f"{len(pc.list_flatten(symbols)):>10,}")
+
+    # Baseline: one alternation of every alias, longest first, searched tweet by tweet
+    aliases = {' '.join(normalize_alias(alias)): symbol for symbol, entries in large.items()
+               for alias in [symbol, *entries] if normalize_alias(alias)}
+    pattern = re.compile(r'\b(?:' + '|'.join(sorted(map(re.escape, aliases), key=len, reverse=True)) + r')\b')
+    sample = contents.slice(0, regex_rows).to_pylist()
+    _, seconds = _timed(lambda: [{aliases[match] for match in pattern.findall(text)} for text in sample])
+    print(f"regex alternation over {len(aliases):,} aliases: {seconds / len(sample) * 1e6:,.0f} us/tweet")
+
+    index, seconds = _timed(SymbolIndex, symbols)
+    print(f"Inverted index of {len(index):,} symbols built in {seconds * 1e3:.1f}ms")
+    lookups = list(index.counts().index[:10])
+    _, index_seconds = _timed(lambda: [index.rows_for(symbol) for symbol in lookups])
+    flat, parents = pc.list_flatten(symbols), pc.list_parent_indices(symbols)
+    _, scan_seconds = _timed(lambda: [parents.filter(pc.equal(flat, symbol)) for symbol in lookups])
+    print(f"{len(lookups)} symbol lookups: index {index_seconds * 1e3:.2f}ms, scanning the lists {scan_seconds * 1e3:.1f}ms")
+
+def _loop_symbol_signals(df, index):
+    """
+    Per-symbol signals the straightforward way: scale and resample each symbol's
+    tweets in turn, as analyze_data does for all tweets.
+    """
+    results = []
+    for symbol in index.symbols:
+        tweets = df.iloc[index.rows_for(symbol)]
+        scaler = MinMaxScaler()
+        scaled = scaler.fit_transform(tweets[['buzz_signal', 'retweet_count', 'like_count']])
+        composite = pd.Series(scaled @ np.array([SIGNAL_WEIGHTS['buzz'], SIGNAL_WEIGHTS['retweets'],
+                                                 SIGNAL_WEIGHTS['likes']]), index=tweets.index)
+        confidence = pd.Series(scaler.fit_transform(tweets[['user_followers']])[:, 0], index=tweets.index)
+        resampled = composite.resample(RESAMPLE_FREQ)
+        results.append(pd.DataFrame({'symbol': symbol, 'signal': resampled.mean(),
+                                     'confidence': confidence.resample(RESAMPLE_FREQ).mean(),
+                                     'count': resampled.size()}).dropna())
+    return pd.concat(results).rename_axis('bucket').reset_index()
+
+def bench_symbol_signals(rows, symbols=5_000, seed=42):
+    """
+    Per-symbol signals for rows tweets mentioning a Zipf-distributed mix of symbols:
+    one grouped pass (analyze.symbol_signals) against a loop over the symbols, checked
+    for the same result.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2025-08-01', tz='UTC') + pd.to_timedelta(np.sort(rng.integers(0, 30 * 86400, rows)), unit='s')
+    # Up to three symbols per tweet, popular ones far more often
+    counts = rng.integers(0, 4, rows)
+    codes = (rng.zipf(1.3, counts.sum()) - 1) % symbols
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    names = pa.array([f'SYM{i:05d}' for i in range(symbols)])
+    df = pd.DataFrame({
+        'buzz_signal': rng.random(rows), 'retweet_count': rng.integers(0, 1000, rows).astype('uint32'),
+        'like_count': rng.integers(0, 5000, rows).astype('uint32'),
+        'user_followers': rng.integers(0, 100_000, rows).astype('uint32'),
+        'symbols': pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), names.take(pa.array(codes))).to_numpy(zero_copy_only=False),
+    }, index=pd.DatetimeIndex(times, name='timestamp_utc'))
+    index = SymbolIndex(df['symbols'])
+    print(f"{rows:,} tweets, {len(codes):,} symbol mentions of {len(index):,} symbols")
+
+    grouped, grouped_seconds = _timed(symbol_signals, df)
+    print(f"grouped pass:    {grouped_seconds:>8.2f}s  ({len(grouped):,} symbol buckets)")
+    looped, loop_seconds = _timed(_loop_symbol_signals, df, index)
+    print(f"loop by symbol:  {loop_seconds:>8.2f}s  ({loop_seconds / grouped_seconds:.0f}x slower)")
+    looped = looped.sort_values(['symbol', 'bucket'], kind='stable').reset_index(drop=True)
+    same = (grouped['symbol'].astype(str).equals(looped['symbol']) and grouped['bucket'].equals(looped['bucket'])
+            and np.allclose(grouped['signal'], looped['signal']) and np.allclose(grouped['confidence'], looped['confidence'])
+            and (grouped['count'].to_numpy() == looped['count'].to_numpy()).all())
+    print(f"Same result: {same}")
+
+def bench_records(rows, seed=42):
+    """
+    Converts rows mock twscrape Tweets and serializes them the way the scraper used to
+    (a dict per tweet, pretty-printed JSON), as NDJSON lines, and as TweetRecords
+    written as Arrow batches, reporting records/sec and bytes/record of each and
+    checking that every path decodes to the same records.
+    """
+    print(f"Generating {rows:,} mock tweets...")
+    tweets = [mock_tweet(record) for record in generate_synthetic_tweets(rows, seed)]
+
+    def pretty_json():
+        return json.dumps([tweet_to_record(tweet) for tweet in tweets], ensure_ascii=False, indent=4).encode('utf-8')
+
+    def ndjson():
+        return ''.join(json.dumps(tweet_to_record(tweet), ensure_ascii=False, separators=(',', ':')) + '\n'
+                       for tweet in tweets).encode('utf-8')
+
+    def arrow(compression):
+        return lambda: serialize_records([tweet_to_row(tweet) for tweet in tweets], compression)
+
+    expected = records_to_batch([tweet_to_row(tweet) for tweet in tweets]).to_pylist()
+    print(f"{'path':>24} {'seconds':>8} {'records/s':>12} {'bytes/record':>13}")
+    for label, serialize, decode in [
+            ('dict + JSON indent=4', pretty_json, json.loads),
+            ('dict + NDJSON', ndjson, lambda data: [json.loads(line) for line in data.splitlines()]),
+            ('TweetRecord + Arrow', arrow(None), lambda data: pa.ipc.open_stream(data).read_all().to_pylist()),
+            ('TweetRecord + Arrow zstd', arrow('zstd'), lambda data: pa.ipc.open_stream(data).read_all().to_pylist())]:
+        data, seconds = _timed(serialize)
+        if decode(data) != expected:
+            raise AssertionError(f"{label} does not decode to the same records")
+        print(f"{label:>24} {seconds:>8.2f} {rows / seconds:>12,.0f} {len(data) / rows:>13.1f}")
+
+def bench_scrape_output(rows, seed=42):
+    """
+    Times getting rows scraped tweets (mock API, no latency) into a processed Parquet
+    file: written as NDJSON and then processed by process.py with either engine,
+    against processed while scraping by ParquetTweetWriter and only merged by
+    process.py. Checks that all three produce the same tweets.
+    """
+    api = MockAPI(num_accounts=4, page_size=100, latency=0, requests_per_window=10 ** 9,
+                  universe_size=rows, match_rate=1.0, seed=seed)
+
+    async def scrape(writer):
+        with writer:
+            async for tweet in iter_new_tweets(api, ['#nifty'], limit=-1):
+                writer.write(tweet_to_row(tweet))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _, ndjson_scrape = _timed(asyncio.run, scrape(NDJSONTweetWriter(os.path.join(tmp, 'raw'))))
+        for engine in ENGINES:
+            path = os.path.join(tmp, f'{engine}.parquet')
+            _, seconds = _timed(process_data, os.path.join(tmp, 'raw'), path, engine=engine)
+            results[f'NDJSON + process ({engine})'] = (ndjson_scrape, seconds, pq.read_table(path))
+        _, parquet_scrape = _timed(asyncio.run, scrape(ParquetTweetWriter(os.path.join(tmp, 'processed'))))
+        path = os.path.join(tmp, 'merged.parquet')
+        _, seconds = _timed(process_data, os.path.join(tmp, 'processed'), path)
+        results['Parquet while scraping'] = (parquet_scrape, seconds, pq.read_table(path))
+
+    expected = _decoded(results['NDJSON + process (pandas)'][2])
+    print(f"{rows:,} scraped tweets")
+    print(f"{'path':>28} {'scrape':>8} {'process':>8} {'total':>8}")
+    for label, (scrape_seconds, process_seconds, table) in results.items():
+        if not _decoded(table).equals(expected):
+            raise AssertionError(f"{label} output differs")
+        print(f"{label:>28} {scrape_seconds:>7.2f}s {process_seconds:>7.2f}s {scrape_seconds + process_seconds:>7.2f}s")
+    print("Outputs identical")
+
+def _parse_scale(value):
+    """
+    Turns '10k', '1m', '10m' or a plain number into a row count.
+    """
+    value = value.lower().replace('_', '')
+    if value in SCALES:
+        return SCALES[value]
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+def _stage_worker(func, args):
+    """
+    Runs one stage function quietly and returns its result with timing and peak RSS.
+    """
+    METRICS.start_run(func.__name__)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        result = func(*args)
+    result.setdefault('seconds', time.perf_counter() - start)
+    result['steps'] = {name: totals['seconds'] for name, totals in METRICS.steps.items()}
+    # ru_maxrss is in KiB on Linux; the stage's own pool workers count as well
+    result['peak_rss_mb'] = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    return result
+
+def run_stage(func, *args):
+    """
+    Runs a stage in a fresh process, so its peak RSS is not inflated by earlier stages.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_stage_worker, func, args).result()
+
+def _stage_generate(raw_dir, rows, seed):
+    # Written aside and renamed, so an interrupted run never leaves a partial cache
+    tmp_dir = raw_dir + '.tmp'
+    paths = write_synthetic_ndjson(tmp_dir, rows, seed)
+    size = sum(os.path.getsize(path) for path in paths)
+    os.replace(tmp_dir, raw_dir)
+    return {'rows': rows, 'bytes': size}
+
+def _stage_scrape(rows, seed):
+    api = MockAPI(num_accounts=4, page_size=100, latency=0, requests_per_window=10 ** 9,
+                  universe_size=rows, match_rate=1.0, seed=seed)
+
+    async def scrape(directory):
+        with NDJSONTweetWriter(directory) as writer:
+            async for tweet in iter_new_tweets(api, ['#nifty'], limit=-1):
+                writer.write(tweet_to_record(tweet))
+        return writer.records_written
+
+    # Only the scrape itself is timed, not building the mock API's tweets
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        written = asyncio.run(scrape(tmp))
+        return {'rows': written, 'seconds': time.perf_counter() - start}
+
+def _stage_process(raw_dir, processed_path, stream, engine='pandas', workers=None):
+    process_data(raw_dir, processed_path, stream=stream, engine=engine, workers=workers)
+    return {'rows': pq.ParquetFile(processed_path).metadata.num_rows,
+            'bytes': sum(os.path.getsize(path) for path in expand_input_paths(raw_dir))}
+
+def _stage_analyze(processed_path):
+    return {'rows': len(analyze_data(processed_path, plot_filename=None))}
+
+def bench_suite(scales, data_dir='bench_data', seed=42, stream=True, baseline_path='benchmark_baseline.json',
+                save_baseline=False, tolerance=REGRESSION_TOLERANCE):
+    """
+    Runs the pipeline end to end on deterministic synthetic tweets at each scale and
+    reports time, throughput and peak RSS per stage, compared with a stored baseline.
+
+    Synthetic raw files are kept in data_dir and reused by later runs with the same
+    size and seed. Returns True if no stage regressed.
+    """
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    results = {}
+    ok = True
+
+    for rows in scales:
+        print(f"\n=== {rows:,} tweets ===")
+        raw_dir = os.path.join(data_dir, f'raw-{rows}-{seed}')
+        processed_path = os.path.join(data_dir, f'processed-{rows}-{seed}.parquet')
+        stages = []
+        if not os.path.isdir(raw_dir):
+            stages.append(('generate', _stage_generate, (raw_dir, rows, seed)))
+        stages += [
+            ('scrape', _stage_scrape, (min(rows, SCRAPE_MAX_ROWS), seed)),
+            ('process', _stage_process, (raw_dir, processed_path, stream)),
+            ('analyze', _stage_analyze, (processed_path,)),
+        ]
+
+        results[str(rows)] = scale_results = {}
+        print(f"{'stage':>8} {'rows':>11} {'seconds':>9} {'rows/s':>11} {'MB/s':>7} {'peak RSS':>10}  vs baseline")
+        for name, func, args in stages:
+            result = run_stage(func, *args)
+            result['rows_per_sec'] = result['rows'] / result['seconds']
+            scale_results[name] = result
+            mb_per_sec = f"{result['bytes'] / result['seconds'] / 1e6:7.1f}" if 'bytes' in result else ' ' * 7
+
+            comparison = ''
+            previous = baseline.get('results', {}).get(str(rows), {}).get(name)
+            if previous and name != 'generate':
+                time_change = result['seconds'] / previous['seconds'] - 1
+                rss_change = result['peak_rss_mb'] / previous['peak_rss_mb'] - 1
+                comparison = f"time {time_change:+.0%}, RSS {rss_change:+.0%}"
+                if time_change > tolerance or rss_change > tolerance:
+                    comparison += '  REGRESSION'
+                    ok = False
+            print(f"{name:>8} {result['rows']:>11,} {result['seconds']:>9.2f} {result['rows_per_sec']:>11,.0f} "
+                  f"{mb_per_sec} {result['peak_rss_mb']:>8,.0f}MB  {comparison}")
+            # Per-step breakdown recorded by the pipeline's own instrumentation
+            for step, seconds in sorted(result['steps'].items(), key=lambda item: -item[1]):
+                print(f"{'':>8}   {step:<16} {seconds:>9.2f}")
+
+    if save_baseline:
+        baseline.setdefault('results', {}).update(results)
+        baseline['machine'] = {'python': sys.version.split()[0], 'platform': platform.platform(),
+                               'cpus': os.cpu_count(), 'saved_at': datetime.now(timezone.utc).isoformat()}
+        with open(baseline_path, 'w') as f:
+            json.dump(baseline, f, indent=1)
+        print(f"\nBaseline saved to {baseline_path}")
+    elif not baseline:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to store one")
+    print("No regressions" if ok else "\nRegressions found")
+    return ok
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks for the tweet processing pipeline.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    clean_parser = subparsers.add_parser('clean', help="per-row vs batch tweet cleaning")
+    clean_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    sessions_parser = subparsers.add_parser('sessions', help="scraper start with and without cached login sessions")
+    sessions_parser.add_argument('--accounts', type=int, default=8)
+    sessions_parser.add_argument('--login-latency', type=float, default=0.2,
+                                 help="simulated seconds per login request (5 per login)")
+    sessions_parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per page")
+
+    buzz_parser = subparsers.add_parser('buzz', help="TF-IDF refit per batch vs the online buzz scorer")
+    buzz_parser.add_argument('--rows', type=int, default=200_000)
+    buzz_parser.add_argument('--batches', type=int, default=10)
+
+    model_parser = subparsers.add_parser('model', help="refit vs scoring a batch with a saved signal model")
+    model_parser.add_argument('--rows', type=int, default=200_000)
+    model_parser.add_argument('--batch', type=int, default=1_000)
+
+    suite_parser = subparsers.add_parser('suite', help="end-to-end pipeline timings with baseline comparison")
+    suite_parser.add_argument('--scales', nargs='+', default=['10k', '1m'], help="row counts, e.g. 10k 1m 10m")
+    suite_parser.add_argument('--data-dir', default='bench_data', help="where synthetic inputs are cached")
+    suite_parser.add_argument('--seed', type=int, default=42)
+    suite_parser.add_argument('--in-memory', action='store_true', help="process without --stream")
+    suite_parser.add_argument('--baseline', default='benchmark_baseline.json')
+    suite_parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    suite_parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+
+    schema_parser = subparsers.add_parser('schema', help="memory and file size of the compact processed schema")
+    schema_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    engines_parser = subparsers.add_parser('engines', help="pandas vs Arrow processing engine, checked for identical output")
+    engines_parser.add_argument('--rows', type=int, default=1_000_000)
+    engines_parser.add_argument('--data-dir', default='bench_data', help="where synthetic inputs are cached")
+    engines_parser.add_argument('--seed', type=int, default=42)
+    engines_parser.add_argument('--stream', action='store_true', help="process in bounded-memory batches")
+
+    parallel_parser = subparsers.add_parser('parallel', help="sharded processing with 1, 2, 4 and 8 worker processes")
+    parallel_parser.add_argument('--rows', type=int, default=1_000_000)
+    parallel_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parallel_parser.add_argument('--data-dir', default='bench_data', help="where synthetic inputs are cached")
+    parallel_parser.add_argument('--seed', type=int, default=42)
+    parallel_parser.add_argument('--engine', choices=ENGINES, default='pandas')
+
+    neardup_parser = subparsers.add_parser('neardup', help="near-duplicate index speed and recall on injected copies")
+    neardup_parser.add_argument('--rows', type=int, default=1_000_000)
+    neardup_parser.add_argument('--batches', type=int, default=10)
+    neardup_parser.add_argument('--dup-rate', type=float, default=0.2)
+
+    symbols_parser = subparsers.add_parser('symbols', help="symbol extraction and inverted index lookups")
+    symbols_parser.add_argument('--rows', type=int, default=1_000_000)
+    symbols_parser.add_argument('--names', type=int, default=5_000, help="symbols in the large dictionary")
+
+    grouped_parser = subparsers.add_parser('grouped', help="per-symbol signals: grouped pass vs loop over symbols")
+    grouped_parser.add_argument('--rows', type=int, default=1_000_000)
+    grouped_parser.add_argument('--symbols', type=int, default=5_000)
+
+    records_parser = subparsers.add_parser('records', help="tweet record conversion and serialization, dict+JSON vs Arrow")
+    records_parser.add_argument('--rows', type=int, default=200_000)
+
+    output_parser = subparsers.add_parser('output', help="scrape to NDJSON and process vs scrape straight to Parquet")
+    output_parser.add_argument('--rows', type=int, default=SCRAPE_MAX_ROWS)
+
+    scrape_parser = subparsers.add_parser('scrape', help="sequential vs concurrent multi-query scraping (mock API)")
+    scrape_parser.add_argument('--accounts', type=int, default=8)
+    scrape_parser.add_argument('--queries', type=int, default=16, help=f"at most {len(HASHTAGS)}")
+    scrape_parser.add_argument('--limit', type=int, default=400)
+    scrape_parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per page")
+
+    backfill_parser = subparsers.add_parser('backfill', help="historical backfill: one search vs fixed vs adaptive windows")
+    backfill_parser.add_argument('--accounts', type=int, default=8)
+    backfill_parser.add_argument('--rows', type=int, default=50_000)
+    backfill_parser.add_argument('--days', type=int, default=30)
+    backfill_parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per page")
+    backfill_parser.add_argument('--window-tweets', type=int, default=1000, help="tweets per adaptive window")
+
+    schedule_parser = subparsers.add_parser('schedule', help="simulated polling: fixed cadence vs adaptive scheduler")
+    schedule_parser.add_argument('--queries', type=int, default=50)
+    schedule_parser.add_argument('--hours', type=float, default=6)
+    schedule_parser.add_argument('--budgets', type=float, nargs='+', default=[0.1, 0.2, 0.5, 1.0],
+                                 help="requests per second to simulate")
+
+    rescrape_parser = subparsers.add_parser('rescrape', help="repeated scrape with and without the seen-id index")
+    rescrape_parser.add_argument('--accounts', type=int, default=8)
+    rescrape_parser.add_argument('--queries', type=int, default=16, help=f"at most {len(HASHTAGS)}")
+    rescrape_parser.add_argument('--universe', type=int, default=20_000, help="tweets posted before the first run")
+    rescrape_parser.add_argument('--new', type=int, default=1_000, help="tweets posted between the runs")
+    rescrape_parser.add_argument('--latency', type=float, default=0.05, help="simulated seconds per page")
+
+    args = parser.parse_args()
+    if args.benchmark == 'clean':
+        bench_clean(args.rows)
+    elif args.benchmark == 'sessions':
+        bench_sessions(args.accounts, args.login_latency, args.latency)
+    elif args.benchmark == 'buzz':
+        bench_buzz(args.rows, args.batches)
+    elif args.benchmark == 'model':
+        bench_model(args.rows, args.batch)
+    elif args.benchmark == 'suite':
+        ok = bench_suite([_parse_scale(scale) for scale in args.scales], args.data_dir, args.seed,
+                         not args.in_memory, args.baseline, args.save_baseline, args.tolerance)
+        sys.exit(0 if ok else 1)
+    elif args.benchmark == 'schema':
+        bench_schema(args.rows)
+    elif args.benchmark == 'engines':
+        bench_engines(args.rows, args.data_dir, args.seed, args.stream)
+    elif args.benchmark == 'parallel':
+        bench_parallel(args.rows, args.workers, args.data_dir, args.seed, args.engine)
+    elif args.benchmark == 'neardup':
+        bench_near_duplicates(args.rows, args.batches, args.dup_rate)
+    elif args.benchmark == 'symbols':
+        bench_symbols(args.rows, args.names)
+    elif args.benchmark == 'grouped':
+        bench_symbol_signals(args.rows, args.symbols)
+    elif args.benchmark == 'records':
+        bench_records(args.rows)
+    elif args.benchmark == 'output':
+        bench_scrape_output(args.rows)
+    elif args.benchmark == 'scrape':
+        bench_scrape(args.accounts, args.queries, args.limit, args.latency)
+    elif args.benchmark == 'backfill':
+        bench_backfill(args.accounts, args.rows, args.days, args.latency, args.window_tweets)
+    elif args.benchmark == 'schedule':
+        bench_schedule(args.queries, args.hours, args.budgets)
+    elif args.benchmark == 'rescrape':
+        bench_rescrape(args.accounts, args.queries, args.universe, args.new, args.latency)
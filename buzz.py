@@ -0,0 +1,188 @@
+# buzz.py
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sklearn.feature_extraction.text import HashingVectorizer
+
+STATE_FILENAME = 'state.npz'
+SCORES_DIRNAME = 'scores'
+SCORES_SCHEMA = pa.schema([('id', pa.int64()), ('buzz_signal', pa.float64())])
+
+# Decay weights are kept relative to a reference time and rebased before they overflow
+_MAX_LOG2_WEIGHT = 256
+
+class OnlineBuzzScorer:
+    """
+    Incremental version of the TF-IDF buzz signal in analyze_data.
+
+    Terms are hashed into n_features buckets (same tokens and stop words as the
+    TfidfVectorizer it replaces), so there is no vocabulary to refit. Document
+    frequencies decay with a half-life of half_life_hours, which makes them describe a
+    rolling window of recent tweets instead of the whole history. Each tweet is scored
+    once, when it arrives: its terms are added to the frequencies and its buzz is the
+    sum of its L2-normalised tf-idf weights, which costs O(tokens in the tweet).
+    """
+
+    def __init__(self, n_features=2 ** 18, half_life_hours=24.0):
+        self.n_features = n_features
+        self.half_life_hours = half_life_hours
+        self.vectorizer = HashingVectorizer(n_features=n_features, stop_words='english',
+                                            alternate_sign=False, norm=None)
+        # Weighted counts in units of 2 ** (hours since reference_time / half-life);
+        # multiplying by 2 ** (-(t - reference_time) / half-life) gives the decayed value at t
+        self.doc_freq = np.zeros(n_features)
+        self.num_docs = 0.0
+        self.reference_time = None
+        self.latest_time = None
+
+    def _log2_weights(self, timestamps):
+        seconds = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)).as_unit('ns').asi8 / 1e9
+        if self.reference_time is None:
+            self.reference_time = float(seconds.min()) if len(seconds) else 0.0
+        return (seconds - self.reference_time) / (self.half_life_hours * 3600), seconds
+
+    def _rebase(self, log2_shift):
+        """
+        Moves the reference time forward by log2_shift half-lives.
+        """
+        factor = 2.0 ** -log2_shift
+        self.doc_freq *= factor
+        self.num_docs *= factor
+        self.reference_time += log2_shift * self.half_life_hours * 3600
+
+    def update_and_score(self, texts, timestamps):
+        """
+        Adds tweets, in the given order, to the document frequencies and returns their
+        buzz scores as a float array. Tweets should arrive roughly in time order.
+
+        Each tweet is scored against the frequencies as they stand right after it was
+        added, exactly as if the tweets were fed one at a time.
+        """
+        texts = pd.Series(texts).fillna('').to_numpy()
+        log2_weights, seconds = self._log2_weights(timestamps)
+        if len(texts) == 0:
+            return np.zeros(0)
+        if log2_weights.max() > _MAX_LOG2_WEIGHT:
+            shift = np.floor(log2_weights.max())
+            self._rebase(shift)
+            log2_weights -= shift
+        # Tweets more than _MAX_LOG2_WEIGHT half-lives older than that count as that old;
+        # their weight is negligible either way, and this keeps 1 / weight finite
+        log2_weights = np.maximum(log2_weights, max(log2_weights.max(), 0.0) - _MAX_LOG2_WEIGHT)
+        weights = 2.0 ** log2_weights
+
+        counts = self.vectorizer.transform(texts)
+        rows = np.repeat(np.arange(len(texts)), np.diff(counts.indptr))
+        terms, entry_weights = counts.indices, weights[rows]
+
+        # Document frequency of each (tweet, term) entry including the tweets before it
+        # in the batch: a running sum of weights over the entries of each term, in order
+        order = np.argsort(terms, kind='stable')
+        sorted_terms = terms[order]
+        running = np.cumsum(entry_weights[order])
+        first = np.r_[True, sorted_terms[1:] != sorted_terms[:-1]]
+        before_term = (running - entry_weights[order])[first]
+        doc_freq = np.empty(len(terms))
+        doc_freq[order] = running - before_term[np.cumsum(first) - 1] + self.doc_freq[sorted_terms]
+        num_docs = self.num_docs + np.cumsum(weights)
+
+        # Same smoothed idf as TfidfVectorizer, on the frequencies decayed to each tweet
+        idf = np.log((1.0 + num_docs[rows] / entry_weights) / (1.0 + doc_freq / entry_weights)) + 1.0
+        tfidf = counts.data * idf
+        sums = np.bincount(rows, weights=tfidf, minlength=len(texts))
+        norms = np.sqrt(np.bincount(rows, weights=tfidf * tfidf, minlength=len(texts)))
+        scores = np.divide(sums, norms, out=np.zeros(len(texts)), where=norms > 0)
+
+        self.doc_freq += np.bincount(terms, weights=entry_weights, minlength=self.n_features)
+        self.num_docs = float(num_docs[-1])
+        latest = float(seconds.max())
+        self.latest_time = latest if self.latest_time is None else max(self.latest_time, latest)
+        return scores
+
+    def save(self, path):
+        """
+        Writes the scorer state to path atomically. Only non-zero frequencies are stored.
+        """
+        nonzero = np.flatnonzero(self.doc_freq)
+        params = {'n_features': self.n_features, 'half_life_hours': self.half_life_hours,
+                  'num_docs': self.num_docs, 'reference_time': self.reference_time,
+                  'latest_time': self.latest_time}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, params=json.dumps(params), terms=nonzero.astype(np.int32),
+                                doc_freq=self.doc_freq[nonzero])
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restores a scorer written by save().
+        """
+        with np.load(path) as state:
+            params = json.loads(str(state['params']))
+            scorer = cls(params['n_features'], params['half_life_hours'])
+            scorer.doc_freq[state['terms']] = state['doc_freq']
+        scorer.num_docs = params['num_docs']
+        scorer.reference_time = params['reference_time']
+        scorer.latest_time = params['latest_time']
+        return scorer
+
+def _stored_scores(scores_dir, ids):
+    """
+    Returns the previously computed buzz scores for the given tweet ids, indexed by id.
+    """
+    if not os.path.isdir(scores_dir) or len(ids) == 0:
+        return pd.Series(dtype='float64')
+    dataset = ds.dataset(scores_dir, schema=SCORES_SCHEMA, format='parquet')
+    # The id range lets row groups of other time periods be skipped from their statistics
+    id_filter = ((ds.field('id') >= int(ids.min())) & (ds.field('id') <= int(ids.max()))
+                 & ds.field('id').isin(pa.array(ids, type=pa.int64())))
+    stored = dataset.to_table(filter=id_filter).to_pandas()
+    return stored.set_index('id')['buzz_signal']
+
+def online_buzz_signal(ids, timestamps, texts, state_dir='buzz_state', n_features=2 ** 18,
+                       half_life_hours=24.0):
+    """
+    Returns the buzz_signal of each tweet, given as parallel ids, timestamps and
+    cleaned texts, as a float array.
+
+    The scorer state and the score of every tweet it has seen are kept in state_dir,
+    so a tweet is scored exactly once: tweets seen in earlier runs keep their score and
+    only new ones are fed to the scorer, in time order. n_features and half_life_hours
+    only apply when state_dir holds no state yet.
+    """
+    state_path = os.path.join(state_dir, STATE_FILENAME)
+    scores_dir = os.path.join(state_dir, SCORES_DIRNAME)
+    if os.path.exists(state_path):
+        scorer = OnlineBuzzScorer.load(state_path)
+    else:
+        scorer = OnlineBuzzScorer(n_features, half_life_hours)
+
+    tweets = pd.DataFrame({'id': np.asarray(ids, dtype=np.int64),
+                           'timestamp_utc': pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)),
+                           'cleaned_content': np.asarray(texts, dtype=object)})
+    stored = _stored_scores(scores_dir, tweets['id'].to_numpy())
+    new = tweets[~tweets['id'].isin(stored.index)].drop_duplicates('id')
+    new = new.sort_values('timestamp_utc', kind='stable')
+    print(f"Buzz: {len(stored):,} tweets already scored, scoring {len(new):,} new tweets")
+
+    if len(new):
+        new_scores = scorer.update_and_score(new['cleaned_content'], new['timestamp_utc'])
+        table = pa.table({'id': new['id'].to_numpy(), 'buzz_signal': new_scores}, schema=SCORES_SCHEMA)
+        # Scores are written before the state: if we stop in between, these tweets are
+        # not scored (and counted) a second time on the next run
+        os.makedirs(scores_dir, exist_ok=True)
+        name = f'part-{uuid.uuid4().hex[:8]}.parquet'
+        tmp_path = os.path.join(scores_dir, f'.{name}.tmp')
+        pq.write_table(table.sort_by('id'), tmp_path)
+        os.replace(tmp_path, os.path.join(scores_dir, name))
+        scorer.save(state_path)
+        stored = pd.concat([stored, pd.Series(new_scores, index=new['id'].to_numpy())])
+
+    return stored.reindex(tweets['id']).to_numpy()
@@ -0,0 +1,87 @@
+# checkpoints.py
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+class ScrapeCheckpoints:
+    """
+    Pagination progress of each search query, kept in a JSON file so a crashed or
+    rate-limited scrape resumes where it stopped. A search that ends normally is
+    marked complete (mark_complete), so the next run starts from the newest tweets.
+
+    For every query it records the cursor of the next page to fetch (None once the
+    search has been paged to its end), the newest and oldest tweet id seen, the pages
+    and tweets fetched, and whether the pagination completed. Progress is recorded in
+    memory as pages are consumed and written to the file by save(), at most every
+    save_interval seconds through maybe_save(). before_save is called first, so the
+    scraped tweets can be made durable (e.g. NDJSONTweetWriter.sync) before the
+    cursor that skips them is.
+    """
+
+    def __init__(self, path='scrape_checkpoints.json', save_interval=5.0, before_save=None):
+        self.path = path
+        self.save_interval = save_interval
+        self.before_save = before_save
+        self.queries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.queries = json.load(f)['queries']
+        self._last_save = time.monotonic()
+
+    def get(self, query):
+        """
+        Returns the progress of a query (a new, empty record if it never ran).
+        """
+        return self.queries.get(query, {'cursor': None, 'newest_id': None, 'oldest_id': None,
+                                        'pages': 0, 'tweets': 0, 'completed': False})
+
+    def resume_cursor(self, query):
+        """
+        Returns the cursor a query should continue from, or None to start from the
+        newest tweets.
+        """
+        return self.get(query)['cursor']
+
+    def record_page(self, query, tweet_ids, next_cursor):
+        """
+        Records that a page of a query was consumed; next_cursor is None if it was the
+        last page.
+        """
+        state = dict(self.get(query))
+        if tweet_ids:
+            newest, oldest = max(tweet_ids), min(tweet_ids)
+            state['newest_id'] = newest if state['newest_id'] is None else max(state['newest_id'], newest)
+            state['oldest_id'] = oldest if state['oldest_id'] is None else min(state['oldest_id'], oldest)
+        state['cursor'] = next_cursor
+        state['pages'] += 1
+        state['tweets'] += len(tweet_ids)
+        state['completed'] = next_cursor is None
+        state['updated_at'] = datetime.now(timezone.utc).isoformat()
+        self.queries[query] = state
+
+    def mark_complete(self, query):
+        """
+        Records that a query needs no further pages, e.g. because it reached tweets
+        scraped before.
+        """
+        state = dict(self.get(query))
+        state['cursor'] = None
+        state['completed'] = True
+        state['updated_at'] = datetime.now(timezone.utc).isoformat()
+        self.queries[query] = state
+
+    def maybe_save(self):
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        """
+        Atomically replaces the checkpoint file.
+        """
+        if self.before_save is not None:
+            self.before_save()
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'queries': self.queries}, f, indent=4)
+        os.replace(self.path + '.tmp', self.path)
+        self._last_save = time.monotonic()
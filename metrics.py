@@ -0,0 +1,191 @@
+# metrics.py
+import contextlib
+import cProfile
+import json
+import os
+import resource
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+class PipelineMetrics:
+    """
+    Timers and counters for the steps of a pipeline run.
+
+    Each step (load, dedup, clean, parquet_write, tfidf, ...) accumulates its call
+    count, seconds, rows and bytes. When a run is started with a jsonl_path, every
+    finished step is also appended there as one JSON line, and finish_run() adds a
+    summary line and, with a prometheus_path, writes all totals in the Prometheus text
+    format (suitable for node_exporter's textfile collector).
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self.counters = {}
+        self.gauges = {}
+        self.pipeline = None
+        self.run_id = None
+        self.jsonl_path = None
+        self.prometheus_path = None
+        self._run_started = None
+
+    def start_run(self, pipeline, jsonl_path=None, prometheus_path=None):
+        self.steps, self.counters, self.gauges = {}, {}, {}
+        self.pipeline = pipeline
+        self.run_id = uuid.uuid4().hex[:12]
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._run_started = time.perf_counter()
+
+    def _emit(self, event):
+        if self.jsonl_path is None:
+            return
+        event = {'time': datetime.now(timezone.utc).isoformat(), 'run_id': self.run_id,
+                 'pipeline': self.pipeline, **event}
+        with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + '\n')
+
+    def record(self, name, seconds, rows=None, bytes_read=None):
+        """
+        Adds one timed call of a step.
+        """
+        totals = self.steps.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0})
+        totals['calls'] += 1
+        totals['seconds'] += seconds
+        totals['rows'] += rows or 0
+        totals['bytes'] += bytes_read or 0
+        event = {'event': 'step', 'step': name, 'seconds': round(seconds, 6)}
+        if rows is not None:
+            event['rows'] = rows
+            event['rows_per_sec'] = round(rows / seconds, 1) if seconds > 0 else None
+        if bytes_read is not None:
+            event['bytes'] = bytes_read
+        self._emit(event)
+
+    @contextlib.contextmanager
+    def step(self, name, rows=None, bytes_read=None):
+        """
+        Times the enclosed block as one call of step name. The yielded dict can be
+        used to set 'rows' or 'bytes' once they are known.
+        """
+        sizes = {'rows': rows, 'bytes': bytes_read}
+        start = time.perf_counter()
+        try:
+            yield sizes
+        finally:
+            self.record(name, time.perf_counter() - start, sizes['rows'], sizes['bytes'])
+
+    def merge(self, steps, counters):
+        """
+        Adds step totals and counters recorded in another process, such as a pool
+        worker. Step seconds are then summed over the processes, not wall time.
+        """
+        for name, other in steps.items():
+            totals = self.steps.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0})
+            for field in totals:
+                totals[field] += other[field]
+        for name, value in counters.items():
+            self.count(name, value)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def finish_run(self):
+        """
+        Emits the run summary and writes the Prometheus file, if configured.
+        """
+        seconds = time.perf_counter() - self._run_started if self._run_started else 0.0
+        self.set_gauge('run_seconds', seconds)
+        # ru_maxrss is in KiB on Linux
+        self.set_gauge('peak_rss_megabytes', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        self.set_gauge('last_run_timestamp_seconds', time.time())
+        self._emit({'event': 'run', 'steps': self.steps, 'counters': self.counters, 'gauges': self.gauges})
+        if self.prometheus_path is not None:
+            self.write_prometheus(self.prometheus_path)
+
+    def write_prometheus(self, path):
+        """
+        Atomically writes the step totals and counters in the Prometheus text format.
+        """
+        pipeline = self.pipeline or 'pipeline'
+        lines = []
+        for field, help_text in [('seconds', "Time spent in each pipeline step."),
+                                 ('rows', "Rows handled by each pipeline step."),
+                                 ('bytes', "Bytes read by each pipeline step."),
+                                 ('calls', "Times each pipeline step ran.")]:
+            metric = f'tweet_pipeline_step_{field}_total'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            for name, totals in self.steps.items():
+                lines.append(f'{metric}{{pipeline="{pipeline}",step="{name}"}} {totals[field]}')
+        for name, value in self.counters.items():
+            metric = f'tweet_pipeline_{name}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric}{{pipeline="{pipeline}"}} {value}']
+        for name, value in self.gauges.items():
+            metric = f'tweet_pipeline_{name}'
+            lines += [f'# TYPE {metric} gauge', f'{metric}{{pipeline="{pipeline}"}} {value}']
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(path + '.tmp', path)
+
+    def print_summary(self):
+        """
+        Prints the step totals, slowest first.
+        """
+        print(f"\n{'step':>16} {'calls':>6} {'seconds':>9} {'rows':>11} {'rows/s':>11} {'MB':>8}")
+        for name, totals in sorted(self.steps.items(), key=lambda item: -item[1]['seconds']):
+            rate = f"{totals['rows'] / totals['seconds']:>11,.0f}" if totals['rows'] and totals['seconds'] else ' ' * 11
+            size = f"{totals['bytes'] / 1e6:>8.1f}" if totals['bytes'] else ' ' * 8
+            print(f"{name:>16} {totals['calls']:>6} {totals['seconds']:>9.3f} {totals['rows']:>11,} {rate} {size}")
+        for name, value in self.counters.items():
+            print(f"{name}: {value:,}")
+        for name, value in self.gauges.items():
+            if name != 'last_run_timestamp_seconds':
+                print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value:,}")
+
+# Shared by process.py and analyze.py; a run is configured by instrumented_run()
+METRICS = PipelineMetrics()
+
+def add_metrics_arguments(parser):
+    """
+    Adds the instrumentation options shared by the pipeline scripts.
+    """
+    parser.add_argument('--metrics-file', help="append per-step metrics to this JSON lines file")
+    parser.add_argument('--prometheus-file', help="write metric totals to this Prometheus text file")
+    parser.add_argument('--profile', help="profile the run with cProfile and save the stats to this file")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="trace Python allocations and report the peak and top allocation sites")
+
+@contextlib.contextmanager
+def instrumented_run(pipeline, metrics_file=None, prometheus_file=None, profile=None, trace_memory=False):
+    """
+    Starts a METRICS run for the enclosed block and exports it at the end. cProfile and
+    tracemalloc are only enabled when asked for, since both slow the run down.
+    """
+    METRICS.start_run(pipeline, metrics_file, prometheus_file)
+    profiler = cProfile.Profile() if profile else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield METRICS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+            print(f"cProfile stats saved to {profile} (view with: python -m pstats {profile})")
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            METRICS.set_gauge('tracemalloc_peak_bytes', peak)
+            print(f"Peak traced Python memory: {peak / 1e6:,.1f} MB; top allocation sites:")
+            for stat in snapshot.statistics('lineno')[:10]:
+                print(f"  {stat}")
+        METRICS.finish_run()
+        if metrics_file or prometheus_file or profile or trace_memory:
+            METRICS.print_summary()
@@ -0,0 +1,283 @@
+# mock_twscrape.py
+import asyncio
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+from twscrape.accounts_pool import NoAccountError
+
+from synthetic import generate_synthetic_tweets
+
+def mock_tweet(record):
+    """
+    Wraps a synthetic tweet dict in an object with the twscrape Tweet attributes we use.
+    """
+    user = SimpleNamespace(
+        username=record['username'],
+        followersCount=record['user_followers'],
+        location=record['user_location'],
+    )
+    return SimpleNamespace(
+        id=record['id'],
+        user=user,
+        date=datetime.fromisoformat(record['timestamp_utc']),
+        rawContent=record['content'],
+        likeCount=record['like_count'],
+        retweetCount=record['retweet_count'],
+        replyCount=record['reply_count'],
+        quoteCount=record['quote_count'],
+        hashtags=record['hashtags'],
+        mentionedUsers=[SimpleNamespace(username=name) for name in record['mentioned_users']],
+        url=record['url'],
+    )
+
+class FakeAuthServer:
+    """
+    Local HTTP endpoint standing in for the site's login flow, for measuring what
+    logging accounts in costs.
+
+    Every POST /login is answered after latency seconds; a login takes several of
+    them in a row, like twscrape's multi-step login flow, and the last step returns
+    the session cookies. Use as an async context manager; url is set once started.
+    """
+
+    def __init__(self, latency=0.3):
+        self.latency = latency
+        self.requests = 0
+        self.logins = 0
+        self.url = None
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b''):
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get('content-length', 0))) or b'{}')
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                response = {}
+                if body.get('final'):
+                    self.logins += 1
+                    token = hashlib.sha1(f"{body['username']}:{self.logins}".encode()).hexdigest()
+                    response = {'cookies': {'auth_token': token, 'ct0': token[:16]}}
+                payload = json.dumps(response).encode()
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: ' + str(len(payload)).encode() + b'\r\n\r\n' + payload)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        self.url = f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._server.close()
+        await self._server.wait_closed()
+
+class MockAccountsPool:
+    """
+    Offline stand-in for twscrape's AccountsPool.
+
+    Like the real pool, a search holds one account for its whole pagination, an
+    account that hits its request budget is locked until its rate-limit window
+    resets, and when no account is free it either waits or raises NoAccountError.
+
+    The num_accounts built-in accounts start logged in. Accounts added with
+    add_account are inactive until they log in, which goes through login_steps
+    requests to the FakeAuthServer at auth_url (or succeeds at once without one), or
+    get a session with add_account_cookies.
+    """
+
+    def __init__(self, num_accounts=4, requests_per_window=50, window=15.0,
+                 raise_when_no_account=False, wait_interval=0.05, auth_url=None, login_steps=5):
+        self.accounts = [self._new_account(f'mock{i}', active=True) for i in range(num_accounts)]
+        self.requests_per_window = requests_per_window
+        self.window = window
+        self.raise_when_no_account = raise_when_no_account
+        self.wait_interval = wait_interval
+        self.auth_url = auth_url
+        self.login_steps = login_steps
+        self.login_calls = 0
+
+    @staticmethod
+    def _new_account(username, active=False, cookies=None):
+        return SimpleNamespace(username=username, active=active, cookies=cookies or {}, busy=False,
+                               locked_until=0.0, window_start=0.0, requests=0, total_requests=0)
+
+    async def add_account(self, username, password, email, email_password, cookies=None, **kwargs):
+        if all(account.username != username for account in self.accounts):
+            cookies = json.loads(cookies) if cookies else {}
+            self.accounts.append(self._new_account(username, active=bool(cookies), cookies=cookies))
+
+    async def add_account_cookies(self, username, cookies):
+        account = await self.get_account(username)
+        if account is None:
+            account = self._new_account(username)
+            self.accounts.append(account)
+        account.cookies, account.active = json.loads(cookies), True
+
+    async def get_account(self, username):
+        return next((account for account in self.accounts if account.username == username), None)
+
+    async def login(self, account):
+        self.login_calls += 1
+        if self.auth_url is None:
+            account.cookies = {'auth_token': f'token-{account.username}', 'ct0': 'ct0'}
+        else:
+            async with httpx.AsyncClient(base_url=self.auth_url) as client:
+                for step in range(self.login_steps):
+                    rep = await client.post('/login', json={'username': account.username,
+                                                            'final': step == self.login_steps - 1})
+            account.cookies = rep.json()['cookies']
+        account.active = True
+        return True
+
+    async def login_all(self, usernames=None):
+        accounts = [account for account in self.accounts
+                    if (account.username in usernames if usernames is not None else not account.active)]
+        success = 0
+        for account in accounts:
+            success += await self.login(account)
+        return {'total': len(accounts), 'success': success, 'failed': len(accounts) - success}
+
+    async def relogin(self, usernames):
+        usernames = usernames if isinstance(usernames, list) else [usernames]
+        for account in self.accounts:
+            if account.username in usernames:
+                account.active, account.cookies = False, {}
+        await self.login_all(usernames)
+
+    async def get_all(self):
+        return list(self.accounts)
+
+    async def acquire(self):
+        """
+        Returns a free account, waiting for one or raising NoAccountError if none is free.
+        """
+        while True:
+            now = time.monotonic()
+            for account in self.accounts:
+                if account.active and not account.busy and account.locked_until <= now:
+                    account.busy = True
+                    return account
+            if self.raise_when_no_account:
+                raise NoAccountError("No account available for queue SearchTimeline")
+            await asyncio.sleep(self.wait_interval)
+
+    def release(self, account):
+        account.busy = False
+
+    def count_request(self, account):
+        """
+        Records one API request and returns False if it exceeded the account's budget,
+        in which case the account is locked until its window resets.
+        """
+        now = time.monotonic()
+        if now - account.window_start >= self.window:
+            account.window_start, account.requests = now, 0
+        if account.requests >= self.requests_per_window:
+            account.locked_until = account.window_start + self.window
+            return False
+        account.requests += 1
+        account.total_requests += 1
+        return True
+
+class MockAPI:
+    """
+    Offline stand-in for twscrape.API that serves synthetic tweets with simulated
+    page latency and per-account rate limits, for benchmarking the scraper.
+
+    Each query matches a deterministic sample of a shared universe of tweets, so
+    different queries overlap the way overlapping hashtags do on the real site. The
+    since: and until: operators restrict a query to a time range.
+    """
+
+    def __init__(self, num_accounts=4, page_size=20, latency=0.05, requests_per_window=50,
+                 window=15.0, universe_size=20_000, match_rate=0.2, seed=0,
+                 raise_when_no_account=False, auth_url=None):
+        self.pool = MockAccountsPool(num_accounts, requests_per_window, window, raise_when_no_account,
+                                     auth_url=auth_url)
+        self.page_size = page_size
+        self.latency = latency
+        self.match_rate = match_rate
+        self.seed = seed
+        # Newest first, as the Latest search tab returns them
+        self.universe = sorted(generate_synthetic_tweets(universe_size, seed=seed),
+                               key=lambda record: record['id'], reverse=True)
+
+    def matching_tweets(self, query):
+        """
+        Returns the universe tweets matching a query, newest first.
+
+        Whether a tweet matches depends only on the tweet and the query without its
+        since:/until: operators, so a larger universe (more recent tweets) keeps all
+        the matches of a smaller one.
+        """
+        bounds = dict(re.findall(r'\b(since|until):(\S+)', query))
+        query = re.sub(r'\s*\b(since|until):\S+', '', query).strip()
+        # since: is inclusive and until: exclusive; both compare as ISO 8601 strings
+        since, until = (_parse_search_time(bounds[name]) if name in bounds else None
+                        for name in ('since', 'until'))
+        threshold = self.match_rate * 2 ** 64
+        key = f'{self.seed}:{query}'.encode()
+        return [record for record in self.universe
+                if (since is None or record['timestamp_utc'] >= since)
+                and (until is None or record['timestamp_utc'] < until)
+                and int.from_bytes(hashlib.blake2b(record['id'].to_bytes(8, 'little'), digest_size=8,
+                                                   key=key[:64]).digest(), 'little') < threshold]
+
+    async def search_pages(self, q, limit=-1, cursor=None):
+        """
+        Yields (tweets, next_cursor) for each page of a search, continuing after cursor
+        if given. next_cursor is None on the last page; a search cut short by limit
+        still returns the cursor of the page after it.
+        """
+        matches = self.matching_tweets(q)
+        if cursor is not None:
+            # Like the site's cursors, this one stays valid while new tweets arrive
+            matches = [record for record in matches if record['id'] < int(cursor)]
+        # A search without results still costs a request for its empty page
+        pages = range(0, max(1, len(matches) if limit <= 0 else min(limit, len(matches))), self.page_size)
+
+        account = await self.pool.acquire()
+        try:
+            for start in pages:
+                # A rate-limited account is swapped for another one, as twscrape does
+                while not self.pool.count_request(account):
+                    self.pool.release(account)
+                    # Cleared first so a failed acquire does not release it twice
+                    account = None
+                    account = await self.pool.acquire()
+                await asyncio.sleep(self.latency)
+                end = start + self.page_size if limit <= 0 else min(start + self.page_size, limit)
+                page = matches[start:end]
+                next_cursor = str(page[-1]['id']) if end < len(matches) else None
+                yield [mock_tweet(record) for record in page], next_cursor
+        finally:
+            if account is not None:
+                self.pool.release(account)
+
+    async def search(self, q, limit=-1, kv=None):
+        async for tweets, _ in self.search_pages(q, limit, (kv or {}).get('cursor')):
+            for tweet in tweets:
+                yield tweet
+
+def _parse_search_time(value):
+    """
+    Turns a since:/until: value (2025-08-01 or 2025-08-01_10:00:00_UTC) into the ISO
+    8601 form of the synthetic tweets' timestamp_utc.
+    """
+    value = value.removesuffix('_UTC').replace('_', 'T')
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).isoformat()
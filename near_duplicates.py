@@ -0,0 +1,306 @@
+# near_duplicates.py
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Bumped whenever the index layout changes; load() refuses other versions
+FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'index.json'
+ARRAY_NAMES = ['band_keys', 'band_refs', 'ids', 'signatures', 'seen_ids', 'seen_clusters']
+
+# Texts are hashed in chunks so the per-shingle arrays stay small
+_CHUNK_ROWS = 100_000
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+def _mix64(x):
+    """
+    splitmix64 finaliser: spreads the bits of a uint64 array over the whole word.
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def _shingle_hashes(texts, shingle_size, seed):
+    """
+    Returns (row, hash) arrays with a 64-bit hash of every shingle_size-byte window of
+    each text, after collapsing runs of whitespace. Texts shorter than one shingle
+    count as a single shingle.
+    """
+    texts = pa.array(texts, type=pa.string()).fill_null('')
+    texts = pc.utf8_trim_whitespace(pc.replace_substring_regex(texts, r'\s+', ' '))
+    texts = texts.cast(pa.large_string())
+    offsets = np.frombuffer(texts.buffers()[1], dtype=np.int64, count=len(texts) + 1, offset=texts.offset * 8)
+    data = np.frombuffer(texts.buffers()[2], dtype=np.uint8) if offsets[-1] > offsets[0] else np.zeros(0, np.uint8)
+    lengths = np.diff(offsets)
+    windows = np.maximum(lengths - shingle_size + 1, np.minimum(lengths, 1))
+    rows = np.repeat(np.arange(len(texts)), windows)
+    starts = np.repeat(offsets[:-1] - np.cumsum(np.r_[0, windows[:-1]]), windows) + np.arange(len(rows))
+    ends = np.repeat(offsets[1:], windows)
+
+    # Polynomial hash of the window's bytes; bytes past the end of a short text are 0
+    padded = np.concatenate([data, np.zeros(shingle_size, np.uint8)]).astype(np.uint64)
+    hashes = np.full(len(rows), np.uint64(seed), dtype=np.uint64)
+    for j in range(shingle_size):
+        byte = np.where(starts + j < ends, padded[starts + j], np.uint64(0))
+        hashes = hashes * np.uint64(0x100000001B3) + byte
+    return rows, _mix64(hashes)
+
+def minhash_signatures(texts, num_perm=64, shingle_size=5, seed=0):
+    """
+    Returns a (len(texts), num_perm) uint32 MinHash signature per text, over its
+    shingle_size-byte shingles.
+
+    Uses one-permutation hashing: each shingle is hashed once, the top bits pick one of
+    num_perm bins (a power of two) and each bin keeps its minimum, which costs O(text
+    length) instead of O(text length * num_perm). Empty bins are filled from the next
+    non-empty bin (rotation densification), so the fraction of equal positions in two
+    signatures still estimates the Jaccard similarity of their shingle sets. Empty
+    texts get an all-0xFFFFFFFF signature.
+    """
+    if num_perm & (num_perm - 1):
+        raise ValueError(f"num_perm must be a power of two, got {num_perm}")
+    bin_bits = num_perm.bit_length() - 1
+    texts = list(texts) if not isinstance(texts, (pd.Series, np.ndarray, pa.Array)) else texts
+    signatures = np.full((len(texts), num_perm), _EMPTY, dtype=np.uint32)
+    for start in range(0, len(texts), _CHUNK_ROWS):
+        chunk = texts[start:start + _CHUNK_ROWS]
+        rows, hashes = _shingle_hashes(chunk, shingle_size, seed)
+        bins = (hashes >> np.uint64(64 - bin_bits)).astype(np.int64) if bin_bits else np.zeros(len(hashes), np.int64)
+        values = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        # The all-ones value is reserved for empty bins
+        values = np.minimum(values, _EMPTY - np.uint32(1))
+        block = signatures[start:start + len(chunk)]
+        np.minimum.at(block.reshape(-1), rows * num_perm + bins, values)
+
+    # Rotation: an empty bin takes the value of the next non-empty bin to its right
+    # (wrapping around), offset by the distance so borrowed values stay distinguishable
+    empty = signatures == _EMPTY
+    if empty.any():
+        positions = np.where(~empty, np.arange(num_perm), 2 * num_perm)
+        positions = np.concatenate([positions, positions + num_perm], axis=1)
+        following = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        has_shingles = ~empty.all(axis=1)
+        distance = (following - np.arange(num_perm))[has_shingles]
+        source = np.take_along_axis(signatures[has_shingles], following[has_shingles] % num_perm, axis=1)
+        signatures[has_shingles] = source + (distance * 0x9E3779B1).astype(np.uint32)
+    return signatures
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index that clusters near-duplicate tweets.
+
+    Every tweet whose text is not a near duplicate of an earlier one starts a cluster
+    and is added to the index: its signature, and for each of the bands (of
+    num_perm / bands signature positions) a hash of that band. A new tweet becomes a
+    candidate duplicate of an indexed tweet when any band hash matches, found by binary
+    search on per-band sorted arrays, so checking a tweet costs O(bands * log n). A
+    candidate is accepted when the signatures agree in at least threshold of their
+    positions (estimated Jaccard similarity of the shingle sets); the tweet then joins
+    the candidate's cluster, whose id is the tweet id of its first member. The cluster
+    of every tweet assigned so far is remembered, so re-processing a tweet always gives
+    the same answer.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8, shingle_size=5, seed=0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.seed = seed
+        # Per band, the band hashes of the indexed tweets in sorted order and the
+        # position in ids/signatures each one belongs to
+        self.band_keys = np.zeros((bands, 0), dtype=np.uint64)
+        self.band_refs = np.zeros((bands, 0), dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        # Every tweet id assigned so far, sorted, with its cluster id
+        self.seen_ids = np.zeros(0, dtype=np.int64)
+        self.seen_clusters = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _band_hashes(self, signatures):
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        keys = np.full(rows.shape[:2], np.uint64(self.seed), dtype=np.uint64)
+        for j in range(rows.shape[2]):
+            keys = _mix64(keys ^ rows[:, :, j])
+        return keys
+
+    def _similar(self, signatures, other_signatures):
+        return (signatures == other_signatures).mean(axis=-1) >= self.threshold
+
+    def _indexed_matches(self, signatures, keys):
+        """
+        Returns, for each signature, the position of the earliest indexed tweet it is a
+        near duplicate of, or -1.
+        """
+        matches = np.full(len(signatures), -1, dtype=np.int64)
+        if not len(self.ids):
+            return matches
+        n = self.band_keys.shape[1]
+        for band in range(self.bands):
+            found = np.searchsorted(self.band_keys[band], keys[:, band])
+            hit = found < n
+            hit[hit] = self.band_keys[band][found[hit]] == keys[hit, band]
+            rows = np.flatnonzero(hit)
+            refs = self.band_refs[band][found[rows]]
+            similar = self._similar(signatures[rows], self.signatures[refs])
+            rows, refs = rows[similar], refs[similar]
+            better = (matches[rows] < 0) | (refs < matches[rows])
+            matches[rows[better]] = refs[better]
+        return matches
+
+    def _batch_matches(self, signatures, keys, eligible):
+        """
+        Returns, for each signature, the earliest earlier row of the batch that shares a
+        band with it and is a near duplicate of it, or -1.
+        """
+        matches = np.full(len(signatures), -1, dtype=np.int64)
+        for band in range(self.bands):
+            rows = np.flatnonzero(eligible)
+            order = rows[np.argsort(keys[rows, band], kind='stable')]
+            sorted_keys = keys[order, band]
+            first = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+            leader = order[np.flatnonzero(first)[np.cumsum(first) - 1]]
+            later = leader != order
+            rows, leaders = order[later], leader[later]
+            similar = self._similar(signatures[rows], signatures[leaders])
+            rows, leaders = rows[similar], leaders[similar]
+            better = (matches[rows] < 0) | (leaders < matches[rows])
+            matches[rows[better]] = leaders[better]
+        return matches
+
+    def assign(self, ids, texts):
+        """
+        Returns the cluster id of each tweet, given as parallel ids and cleaned texts in
+        arrival order, and adds the tweets that start new clusters to the index.
+
+        A tweet is a near duplicate when its cluster id differs from its own id. Tweets
+        assigned by an earlier call keep their cluster. Within one call, a tweet joins
+        the cluster of the earliest indexed tweet it matches or, failing that, of the
+        earliest earlier tweet of the call it matches.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        texts = pd.Series(texts).reset_index(drop=True)
+        clusters = np.empty(len(ids), dtype=np.int64)
+
+        # Tweets assigned before keep their cluster; a repeated id follows its first row
+        found = np.searchsorted(self.seen_ids, ids)
+        known = found < len(self.seen_ids)
+        known[known] = self.seen_ids[found[known]] == ids[known]
+        clusters[known] = self.seen_clusters[found[known]]
+        _, first_rows, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        is_first = np.zeros(len(ids), dtype=bool)
+        is_first[first_rows] = True
+        new = np.flatnonzero(is_first & ~known)
+
+        if len(new):
+            new_ids = ids[new]
+            signatures = minhash_signatures(texts.iloc[new], self.num_perm, self.shingle_size, self.seed)
+            keys = self._band_hashes(signatures)
+            has_shingles = (signatures != _EMPTY).any(axis=1)
+
+            indexed = self._indexed_matches(signatures, keys)
+            indexed[~has_shingles] = -1
+            parents = self._batch_matches(signatures, keys, has_shingles)
+            # Follow each row to the first row of its chain, which is either matched to
+            # the index or starts a new cluster
+            parents = np.where((indexed < 0) & (parents >= 0), parents, np.arange(len(new)))
+            while True:
+                jumped = parents[parents]
+                if np.array_equal(jumped, parents):
+                    break
+                parents = jumped
+            roots = new_ids.copy()
+            roots[indexed >= 0] = self.ids[indexed[indexed >= 0]]
+            clusters[new] = roots[parents]
+
+            starts = (parents == np.arange(len(new))) & (indexed < 0) & has_shingles
+            self._add(new_ids[starts], signatures[starts], keys[starts])
+            self._remember(new_ids, clusters[new])
+
+        # Repeated ids within the call get the cluster of their first row
+        clusters[~is_first] = clusters[first_rows][inverse[~is_first]]
+        return clusters
+
+    def _add(self, ids, signatures, keys):
+        refs = np.arange(len(self.ids), len(self.ids) + len(ids))
+        self.ids = np.concatenate([self.ids, ids])
+        self.signatures = np.concatenate([self.signatures, signatures])
+        band_keys = np.concatenate([self.band_keys, keys.T], axis=1)
+        band_refs = np.concatenate([self.band_refs, np.broadcast_to(refs, (self.bands, len(refs)))], axis=1)
+        # Stable, so among equal keys the earlier tweet stays first
+        order = np.argsort(band_keys, axis=1, kind='stable')
+        self.band_keys = np.take_along_axis(band_keys, order, axis=1)
+        self.band_refs = np.take_along_axis(band_refs, order, axis=1)
+
+    def _remember(self, ids, clusters):
+        seen_ids = np.concatenate([self.seen_ids, ids])
+        order = np.argsort(seen_ids, kind='stable')
+        self.seen_ids = seen_ids[order]
+        self.seen_clusters = np.concatenate([self.seen_clusters, clusters])[order]
+
+    def save(self, path):
+        """
+        Writes the index to the directory path, replacing any previous index there.
+        """
+        manifest = {'format_version': FORMAT_VERSION, 'num_perm': self.num_perm, 'bands': self.bands,
+                    'threshold': self.threshold, 'shingle_size': self.shingle_size, 'seed': self.seed,
+                    'indexed': len(self.ids), 'seen': len(self.seen_ids)}
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(tmp_path, name + '.npy'), getattr(self, name))
+        with open(os.path.join(tmp_path, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=1)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index written by save().
+        """
+        with open(os.path.join(path, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"{path} has index format {manifest.get('format_version')}, "
+                             f"expected {FORMAT_VERSION}; delete it to start a new index")
+        index = cls(manifest['num_perm'], manifest['bands'], manifest['threshold'],
+                    manifest['shingle_size'], manifest['seed'])
+        for name in ARRAY_NAMES:
+            setattr(index, name, np.load(os.path.join(path, name + '.npy')))
+        return index
+
+def near_duplicate_clusters(ids, timestamps, texts, index_dir='dedup_index', threshold=0.8):
+    """
+    Returns the near-duplicate cluster id of each tweet, given as parallel ids,
+    timestamps and cleaned texts, as an int64 array; a tweet is a near duplicate when
+    its cluster id is not its own id.
+
+    New tweets are assigned in time order against the index kept in index_dir, which
+    is updated. threshold only applies when index_dir holds no index yet.
+    """
+    if os.path.exists(os.path.join(index_dir, MANIFEST_FILENAME)):
+        index = NearDuplicateIndex.load(index_dir)
+    else:
+        index = NearDuplicateIndex(threshold=threshold)
+
+    tweets = pd.DataFrame({'id': np.asarray(ids, dtype=np.int64),
+                           'timestamp_utc': pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True)),
+                           'cleaned_content': np.asarray(texts, dtype=object)})
+    ordered = tweets.sort_values('timestamp_utc', kind='stable')
+    clusters = pd.Series(index.assign(ordered['id'], ordered['cleaned_content']), index=ordered.index)
+    index.save(index_dir)
+    duplicates = int((clusters.to_numpy() != ordered['id'].to_numpy()).sum())
+    print(f"Near duplicates: {duplicates:,} of {len(tweets):,} tweets, {len(index):,} clusters indexed")
+    return clusters.reindex(tweets.index).to_numpy()
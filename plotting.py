@@ -0,0 +1,48 @@
+# plotting.py
+import multiprocessing
+
+def plot_signals(resampled_signal, resampled_confidence, plot_filename='market_signal_visualization.png'):
+    """
+    Plots the resampled composite signal and confidence and saves the figure to plot_filename.
+    """
+    # Imported on first use, so processes that never plot never pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')  # render straight to file; never needs a display or blocks
+    import matplotlib.pyplot as plt
+
+    plt.style.use('seaborn-v0_8-darkgrid')
+    fig, ax1 = plt.subplots(figsize=(15, 7))
+
+    # Plot the aggregated signal
+    ax1.plot(resampled_signal.index, resampled_signal.values, label='Aggregated Composite Signal (15min avg)', color='b')
+    ax1.set_xlabel('Time (UTC)')
+    ax1.set_ylabel('Composite Signal Strength', color='b')
+    ax1.tick_params(axis='y', labelcolor='b')
+    ax1.set_title('Aggregated Market Buzz Signal Over Time')
+
+    # Create a second y-axis for confidence
+    ax2 = ax1.twinx()
+    ax2.plot(resampled_confidence.index, resampled_confidence.values, label='Avg. Confidence (15min avg)', color='g', linestyle='--')
+    ax2.set_ylabel('Average Confidence Score', color='g')
+    ax2.tick_params(axis='y', labelcolor='g')
+
+    fig.tight_layout()
+    plt.legend()
+
+    # Save the plot to a file
+    fig.savefig(plot_filename)
+    plt.close(fig)
+    print(f"Visualization saved to {plot_filename}")
+
+def plot_signals_in_background(resampled_signal, resampled_confidence, plot_filename='market_signal_visualization.png'):
+    """
+    Renders plot_signals in a separate process and returns the started Process.
+
+    The process is spawned rather than forked, so it starts clean instead of inheriting
+    the caller's threads, and only the small resampled series are sent to it. The
+    interpreter waits for it before exiting; call join() to wait earlier.
+    """
+    process = multiprocessing.get_context('spawn').Process(
+        target=plot_signals, args=(resampled_signal, resampled_confidence, plot_filename))
+    process.start()
+    return process
@@ -1,6 +1,28 @@
 # process.py
-import pandas as pd
+import argparse
+import functools
+import glob
+import json
+import multiprocessing
+import os
 import re
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+
+from metrics import METRICS, add_metrics_arguments, instrumented_run
+from symbols import SYMBOLS_TYPE, load_symbol_matcher
 
 def clean_tweet_content(text):
     """
@@ -14,38 +36,1055 @@ def clean_tweet_content(text):
     text = text.strip() # Remove leading/trailing whitespace
     return text.lower() # Convert to lowercase
 
-def process_data(input_json_path='raw_tweets.json', output_parquet_path='processed_tweets.parquet'):
+@functools.lru_cache(maxsize=None)
+def _unicode_classes():
     """
-    Loads raw data, processes it, and saves it to Parquet format.
+    Returns RE2 character classes equivalent to Python's \\w and \\s, plus the
+    whitespace characters that str.strip() removes.
+
+    Arrow's RE2 engine treats \\w and \\s as ASCII-only, so the classes are built
+    from Python's own Unicode tables to keep results identical to the re module.
     """
-    print("Loading raw data...")
-    # Load data from JSON into a pandas DataFrame
-    df = pd.read_json(input_json_path)
+    all_chars = ''.join(map(chr, range(sys.maxunicode + 1)))
 
-    print("Processing data...")
+    def char_class(pattern):
+        return ''.join(
+            f'\\x{{{m.start():x}}}-\\x{{{m.end() - 1:x}}}' for m in re.finditer(pattern, all_chars)
+        )
+
+    whitespace = ''.join(re.findall(r'\s', all_chars))
+    return char_class(r'\w+'), char_class(r'\s+'), whitespace
+
+def _clean_content_array(arr):
+    """
+    Applies the clean_tweet_content steps to one pyarrow string array.
+    """
+    word, space, whitespace = _unicode_classes()
+    arr = pc.fill_null(arr, '')
+    # Same URL pattern as clean_tweet_content, run first so it sees the raw text
+    arr = pc.replace_substring_regex(arr, f'http[^{space}]+|www[^{space}]+|https[^{space}]+', '')
+    # Mentions, hashtags and punctuation fused into a single pass; a bare '@' is
+    # matched on its own so a punctuation run can never swallow a mention's '@'.
+    arr = pc.replace_substring_regex(arr, f'@[{word}]+|[^{word}{space}@]+|@', '')
+    arr = pc.utf8_trim(arr, whitespace)
+    # ascii_lower is exact for ASCII rows; the rest go through str.lower, which
+    # applies full Unicode case mapping (e.g. 'İ' -> 'i̇') unlike utf8_lower.
+    non_ascii = pc.invert(pc.string_is_ascii(arr))
+    lowered = pc.ascii_lower(arr)
+    if pc.any(non_ascii).as_py():
+        replacements = [text.lower() for text in pc.filter(arr, non_ascii).to_pylist()]
+        lowered = pc.replace_with_mask(lowered, non_ascii, pa.array(replacements, type=pa.string()))
+    return lowered
+
+def clean_tweet_content_batch(contents):
+    """
+    Vectorized version of clean_tweet_content for a whole column of tweets.
+
+    Accepts a pandas Series or a pyarrow string (Chunked)Array and returns the same
+    kind of container. The cleaning runs as Arrow compute kernels over the whole column
+    and the output is identical to applying clean_tweet_content row by row.
+    """
+    if isinstance(contents, (pa.Array, pa.ChunkedArray)):
+        arr = contents.cast(pa.string())
+    else:
+        values = pd.Series(contents)
+        try:
+            arr = pa.array(values, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed object column: anything that is not a string cleans to ""
+            arr = pa.array([v if isinstance(v, str) else None for v in values], type=pa.string())
+
+    if isinstance(arr, pa.ChunkedArray):
+        cleaned = pa.chunked_array([_clean_content_array(chunk) for chunk in arr.chunks], type=pa.string())
+    else:
+        cleaned = _clean_content_array(arr)
+
+    if isinstance(contents, (pa.Array, pa.ChunkedArray)):
+        return cleaned
+    if isinstance(cleaned, pa.ChunkedArray):
+        cleaned = pa.concat_arrays(cleaned.chunks) if cleaned.num_chunks else pa.array([], type=pa.string())
+    index = contents.index if isinstance(contents, pd.Series) else None
+    return pd.Series(cleaned.to_numpy(zero_copy_only=False), index=index, name=getattr(contents, 'name', None))
+
+# Column order of the processed dataset
+FINAL_COLUMNS = [
+    'id', 'timestamp_utc', 'username', 'user_followers', 'user_location',
+    'content', 'cleaned_content', 'hashtags', 'mentioned_users', 'like_count',
+    'retweet_count', 'reply_count', 'quote_count', 'url', 'symbols'
+]
+
+# Engagement and follower counts are never negative and stay far below 2**32, so they
+# are stored as uint32 (values outside that range are clipped to it in process_frame)
+COUNT_COLUMNS = ['like_count', 'retweet_count', 'reply_count', 'quote_count', 'user_followers']
+COUNT_DTYPE = 'uint32'
+# Columns with few distinct values repeated across many tweets, stored dictionary
+# encoded in Arrow/Parquet and as categoricals in pandas
+CATEGORICAL_COLUMNS = ['username', 'user_location']
+
+# Arrow schema of the processed dataset, fixed up front so that every batch
+# written by the streaming path (even one where a column is all empty) matches.
+PROCESSED_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('timestamp_utc', pa.timestamp('ns', tz='UTC')),
+    ('username', pa.dictionary(pa.int32(), pa.string())),
+    ('user_followers', pa.uint32()),
+    ('user_location', pa.dictionary(pa.int32(), pa.string())),
+    ('content', pa.string()),
+    ('cleaned_content', pa.string()),
+    ('hashtags', pa.list_(pa.string())),
+    ('mentioned_users', pa.list_(pa.string())),
+    ('like_count', pa.uint32()),
+    ('retweet_count', pa.uint32()),
+    ('reply_count', pa.uint32()),
+    ('quote_count', pa.uint32()),
+    ('url', pa.string()),
+    ('symbols', SYMBOLS_TYPE),
+])
+
+# Raw tweet fields as the Arrow engine reads them (timestamps are parsed afterwards).
+# Counts must be JSON integers here; the pandas engine also coerces other values.
+RAW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('username', pa.string()),
+    ('timestamp_utc', pa.string()),
+    ('content', pa.string()),
+    ('like_count', pa.int64()),
+    ('retweet_count', pa.int64()),
+    ('reply_count', pa.int64()),
+    ('quote_count', pa.int64()),
+    ('hashtags', pa.list_(pa.string())),
+    ('mentioned_users', pa.list_(pa.string())),
+    ('url', pa.string()),
+    ('user_followers', pa.int64()),
+    ('user_location', pa.string()),
+])
+
+# Raw tweets written by tweet_writers.ArrowTweetWriter: Arrow IPC streams of
+# RAW_SCHEMA record batches, read without any JSON decoding
+ARROW_EXTENSION = '.arrows'
+
+# Tweets already processed by tweet_writers.ParquetTweetWriter (PROCESSED_SCHEMA),
+# which only need merging
+PROCESSED_EXTENSION = '.parquet'
+
+ENGINES = ['pandas', 'arrow']
+
+# zstd makes processed files about a quarter smaller than the default snappy at a
+# similar read speed
+PARQUET_COMPRESSION = 'zstd'
+
+# Hive partition columns derived from timestamp_utc (date=YYYY-MM-DD/hour=H)
+PARTITION_SCHEMA = pa.schema([
+    ('date', pa.string()),
+    ('hour', pa.int32()),
+])
+PARTITIONED_SCHEMA = pa.unify_schemas([PROCESSED_SCHEMA, PARTITION_SCHEMA])
+
+# Watermark of an incrementally built dataset; the leading underscore keeps Parquet
+# dataset readers from treating it as a data file.
+WATERMARK_FILENAME = '_watermark.json'
+
+def is_ndjson(input_json_path):
+    """
+    Returns True if the file holds newline-delimited JSON rather than a JSON array.
+    """
+    if is_arrow_stream(input_json_path):
+        return False
+    with open(input_json_path, 'r', encoding='utf-8') as f:
+        while True:
+            char = f.read(1)
+            if not char:
+                return False
+            if not char.isspace():
+                return char != '['
+
+def is_arrow_stream(input_path):
+    """
+    Returns True for raw tweets in an Arrow IPC stream file (ARROW_EXTENSION).
+    """
+    return input_path.endswith(ARROW_EXTENSION)
+
+def is_processed_parquet(input_path):
+    """
+    Returns True for tweets the scraper already processed (PROCESSED_EXTENSION).
+    """
+    return input_path.endswith(PROCESSED_EXTENSION)
+
+def _iter_arrow_stream(input_path):
+    """
+    Yields the record batches of a raw Arrow stream, up to the last complete one if
+    the stream is cut off (e.g. a file still being written).
+    """
+    with pa.OSFile(input_path, 'rb') as source:
+        try:
+            reader = pa.ipc.open_stream(source)
+        except pa.ArrowInvalid:
+            return
+        while True:
+            started, position = time.perf_counter(), source.tell()
+            try:
+                batch = reader.read_next_batch()
+            except StopIteration:
+                return
+            except (pa.ArrowInvalid, OSError):
+                return
+            METRICS.record('load', time.perf_counter() - started, batch.num_rows, source.tell() - position)
+            METRICS.count('raw_records', batch.num_rows)
+            yield batch
+
+def _iter_json_array(f, read_size):
+    """
+    Yields the elements of a top-level JSON array without loading the whole file.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    started = False
+    while True:
+        # Skip whitespace, the opening bracket and separators between elements
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ',' or (buf[pos] == '[' and not started)):
+            started = started or buf[pos] == '['
+            pos += 1
+        if pos < len(buf) and buf[pos] == ']':
+            return
+        if pos < len(buf):
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value running up to the end of the buffer may be truncated
+                if end < len(buf) or eof:
+                    yield record
+                    pos = end
+                    continue
+        if eof:
+            if started:
+                raise ValueError("Unexpected end of file inside JSON array")
+            return
+        chunk = f.read(read_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+def _iter_ndjson(f, offset, stop_offset=None):
+    """
+    Yields (record, end_offset) for each line of a binary NDJSON file from offset on,
+    up to the line boundary stop_offset if given. A trailing line that is not yet
+    complete JSON (still being written) is left unread.
+    """
+    f.seek(offset)
+    for line in f:
+        if stop_offset is not None and offset >= stop_offset:
+            return
+        if not line.endswith(b'\n'):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            yield record, offset + len(line)
+            return
+        offset += len(line)
+        if line.strip():
+            yield json.loads(line), offset
+
+def iter_raw_batches(input_json_path, batch_size=50_000, start_offset=0, read_size=1 << 20,
+                     stop_offset=None):
+    """
+    Reads raw tweets from a JSON array or newline-delimited JSON file incrementally,
+    yielding (records, end_offset) pairs with at most batch_size records each.
+
+    For NDJSON input reading starts at byte start_offset (and stops at stop_offset, a
+    line boundary, if given) and end_offset is the byte offset just past the batch, so
+    a later run can resume from it. JSON arrays (and Arrow streams) are always read
+    whole and end_offset is None.
+    """
+    if is_arrow_stream(input_json_path):
+        for table in iter_raw_tables(input_json_path, batch_size):
+            yield table.to_pylist(), None
+        return
+    if is_ndjson(input_json_path):
+        f = open(input_json_path, 'rb')
+        records = _iter_ndjson(f, start_offset, stop_offset)
+    else:
+        f = open(input_json_path, 'r', encoding='utf-8')
+        records = ((record, None) for record in _iter_json_array(f, read_size))
+
+    # Text files report the position of the underlying byte stream
+    raw = getattr(f, 'buffer', f)
+    with f:
+        batch, end_offset = [], start_offset
+        started, position = time.perf_counter(), raw.tell()
+        for record, end_offset in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                METRICS.record('load', time.perf_counter() - started, len(batch), raw.tell() - position)
+                METRICS.count('raw_records', len(batch))
+                yield batch, end_offset
+                batch = []
+                started, position = time.perf_counter(), raw.tell()
+        if batch:
+            METRICS.record('load', time.perf_counter() - started, len(batch), raw.tell() - position)
+            METRICS.count('raw_records', len(batch))
+            yield batch, end_offset
+
+def iter_raw_records(input_json_path, batch_size=50_000, read_size=1 << 20):
+    """
+    Reads raw tweets from a JSON array or newline-delimited JSON file incrementally,
+    yielding lists of at most batch_size records.
+    """
+    for records, _ in iter_raw_batches(input_json_path, batch_size, read_size=read_size):
+        yield records
+
+def expand_input_paths(input_json_path):
+    """
+    Resolves the raw input into a sorted list of files. The input may be a single JSON,
+    NDJSON, Arrow stream or processed Parquet file, a directory of them (such as the
+    scraper's rotating output) or a glob pattern.
+    """
+    if os.path.isdir(input_json_path):
+        paths = [
+            os.path.join(input_json_path, name) for name in os.listdir(input_json_path)
+            if name.endswith(('.json', '.ndjson', ARROW_EXTENSION, PROCESSED_EXTENSION))
+        ]
+    elif any(char in input_json_path for char in '*?['):
+        paths = glob.glob(input_json_path)
+    else:
+        paths = [input_json_path]
+    if not paths:
+        raise FileNotFoundError(f"No raw tweet files found at {input_json_path}")
+    return sorted(paths)
+
+def read_raw_frame(input_json_path):
+    """
+    Loads one raw JSON array, NDJSON or Arrow stream file into a DataFrame.
+    """
+    if is_arrow_stream(input_json_path):
+        table = pa.Table.from_batches(list(_iter_arrow_stream(input_json_path)), schema=RAW_SCHEMA)
+        with METRICS.step('to_frame', rows=table.num_rows):
+            return table.to_pandas()
+    if is_ndjson(input_json_path):
+        # Read through iter_raw_records so a line still being written is skipped
+        records = [record for records in iter_raw_records(input_json_path) for record in records]
+        with METRICS.step('to_frame', rows=len(records)):
+            return pd.DataFrame.from_records(records)
+    with METRICS.step('load', bytes_read=os.path.getsize(input_json_path)) as sizes:
+        df = pd.read_json(input_json_path)
+        sizes['rows'] = len(df)
+    METRICS.count('raw_records', len(df))
+    return df
+
+def _complete_ndjson_length(path):
+    """
+    Returns how many bytes of an NDJSON file hold complete lines, leaving out a
+    trailing line that is still being written (as _iter_ndjson does).
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            start = max(0, position - (1 << 16))
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            position = start
+        else:
+            end = 0
+        if end == size:
+            return size
+        f.seek(end)
+        try:
+            json.loads(f.read())
+        except json.JSONDecodeError:
+            return end
+        return size
+
+def iter_raw_tables(input_json_path, batch_size=50_000, block_size=16 << 20, start_offset=0,
+                    stop_offset=None):
+    """
+    Reads one raw JSON array or NDJSON file as Arrow tables with RAW_SCHEMA, without
+    going through pandas.
+
+    NDJSON is parsed by Arrow's multi-threaded JSON reader in blocks of block_size
+    bytes, from start_offset up to stop_offset (line boundaries) or the last complete
+    line. JSON arrays, which that reader does not support, are parsed by
+    iter_raw_records and converted batch_size records at a time. Arrow streams are
+    read as they are, batch_size rows at a time.
+    """
+    if is_arrow_stream(input_json_path):
+        pending, rows = [], 0
+        for batch in _iter_arrow_stream(input_json_path):
+            pending.append(pa.Table.from_batches([batch]))
+            rows += batch.num_rows
+            if rows >= batch_size:
+                table = pa.concat_tables(pending)
+                full = rows - rows % batch_size
+                for start in range(0, full, batch_size):
+                    yield table.slice(start, batch_size)
+                pending, rows = [table.slice(full)], rows - full
+        if rows:
+            yield pa.concat_tables(pending)
+        return
+    if not is_ndjson(input_json_path):
+        for records in iter_raw_records(input_json_path, batch_size):
+            with METRICS.step('to_arrow', rows=len(records)):
+                table = pa.Table.from_pylist(records, schema=RAW_SCHEMA)
+            yield table
+        return
+
+    length = _complete_ndjson_length(input_json_path) if stop_offset is None else stop_offset
+    if length <= start_offset:
+        return
+    with pa.memory_map(input_json_path) as source:
+        reader = pj.open_json(
+            pa.BufferReader(source.read_at(length - start_offset, start_offset)),
+            read_options=pj.ReadOptions(block_size=block_size),
+            parse_options=pj.ParseOptions(explicit_schema=RAW_SCHEMA, unexpected_field_behavior='ignore'),
+        )
+        while True:
+            started = time.perf_counter()
+            try:
+                batch = reader.read_next_batch()
+            except StopIteration:
+                return
+            METRICS.record('load', time.perf_counter() - started, batch.num_rows, batch.nbytes)
+            METRICS.count('raw_records', batch.num_rows)
+            yield pa.Table.from_batches([batch])
+
+def process_frame(df, symbols_path=None):
+    """
+    Applies the cleaning and normalization steps to a DataFrame of raw tweets in place
+    and returns it with the final column order. The symbols column lists the symbols of
+    the dictionary at symbols_path (the default one for None) each tweet mentions.
+    """
     # --- Data Cleaning and Normalization ---
 
     # 1. Handle potential duplicates based on tweet ID
-    df.drop_duplicates(subset=['id'], inplace=True)
+    rows = len(df)
+    with METRICS.step('dedup', rows=rows):
+        df.drop_duplicates(subset=['id'], inplace=True)
+    METRICS.count('duplicates_dropped', rows - len(df))
 
     # 2. Convert timestamp to datetime object for time-based analysis
-    df['timestamp_utc'] = pd.to_datetime(df['timestamp_utc'])
+    with METRICS.step('to_datetime', rows=len(df)):
+        df['timestamp_utc'] = pd.to_datetime(df['timestamp_utc'])
 
     # 3. Clean the tweet content for NLP tasks
-    df['cleaned_content'] = df['content'].apply(clean_tweet_content)
+    with METRICS.step('clean', rows=len(df)):
+        df['cleaned_content'] = clean_tweet_content_batch(df['content'])
+
+    # 4. Extract the market symbols mentioned in the content and hashtags
+    with METRICS.step('symbols', rows=len(df)):
+        symbols = load_symbol_matcher(symbols_path).match(df['cleaned_content'], df['hashtags'])
+        df['symbols'] = pd.Series(symbols.to_pandas().to_numpy(), index=df.index)
+    METRICS.count('symbol_mentions', len(pc.list_flatten(symbols)))
+
+    # 5. Ensure numeric types for engagement metrics
+    with METRICS.step('numeric', rows=len(df)):
+        for col in COUNT_COLUMNS:
+            counts = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            df[col] = counts.clip(0, np.iinfo(COUNT_DTYPE).max).astype(COUNT_DTYPE)
 
-    # 4. Ensure numeric types for engagement metrics
-    numeric_cols = ['like_count', 'retweet_count', 'reply_count', 'quote_count', 'user_followers']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    # 6. Compact repeated strings
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
 
     # Reorder columns for clarity
-    final_columns = [
-        'id', 'timestamp_utc', 'username', 'user_followers', 'user_location',
-        'content', 'cleaned_content', 'hashtags', 'mentioned_users', 'like_count',
-        'retweet_count', 'reply_count', 'quote_count', 'url'
-    ]
-    df = df[final_columns]
+    return df[FINAL_COLUMNS]
+
+def process_table(table, symbols_path=None):
+    """
+    Arrow counterpart of process_frame: applies the same cleaning and normalization
+    to a table of raw tweets (RAW_SCHEMA) with Arrow compute kernels, without
+    converting to pandas, and returns a table with PROCESSED_SCHEMA.
+    """
+    columns = {name: table.column(name) for name in table.column_names}
+
+    # 1. Handle potential duplicates based on tweet ID, keeping the first of each
+    rows = table.num_rows
+    with METRICS.step('dedup', rows=rows):
+        positions = pa.table({'id': columns['id'], 'row': pa.array(np.arange(rows))})
+        first_rows = positions.group_by('id', use_threads=False).aggregate([('row', 'min')])
+        if first_rows.num_rows < rows:
+            keep = pa.array(np.sort(first_rows.column('row_min').to_numpy()))
+            columns = {name: column.take(keep) for name, column in columns.items()}
+    METRICS.count('duplicates_dropped', rows - len(columns['id']))
+    rows = len(columns['id'])
+
+    # 2. Parse the ISO 8601 timestamps into UTC
+    with METRICS.step('to_datetime', rows=rows):
+        columns['timestamp_utc'] = columns['timestamp_utc'].cast(PROCESSED_SCHEMA.field('timestamp_utc').type)
+
+    # 3. Clean the tweet content for NLP tasks
+    with METRICS.step('clean', rows=rows):
+        columns['cleaned_content'] = clean_tweet_content_batch(columns['content'])
+
+    # 4. Extract the market symbols mentioned in the content and hashtags
+    with METRICS.step('symbols', rows=rows):
+        matcher = load_symbol_matcher(symbols_path)
+        columns['symbols'] = matcher.match(columns['cleaned_content'], columns['hashtags'])
+    METRICS.count('symbol_mentions', len(pc.list_flatten(columns['symbols'])))
+
+    # 5. Missing counts become 0, and counts are clipped to the uint32 range
+    with METRICS.step('numeric', rows=rows):
+        for col in COUNT_COLUMNS:
+            counts = pc.fill_null(columns[col], 0)
+            counts = pc.min_element_wise(pc.max_element_wise(counts, 0), int(np.iinfo(COUNT_DTYPE).max))
+            columns[col] = counts.cast(COUNT_DTYPE)
+
+    # 6. Compact repeated strings
+    for col in CATEGORICAL_COLUMNS:
+        columns[col] = pc.dictionary_encode(columns[col])
+
+    return pa.table([columns[name] for name in FINAL_COLUMNS], schema=PROCESSED_SCHEMA)
+
+def _process_records(records, engine='pandas', symbols_path=None):
+    """
+    Processes a list of raw tweet dicts with the given engine into an Arrow table.
+    """
+    if engine == 'arrow':
+        with METRICS.step('to_arrow', rows=len(records)):
+            table = pa.Table.from_pylist(records, schema=RAW_SCHEMA)
+        return process_table(table, symbols_path)
+    with METRICS.step('to_frame', rows=len(records)):
+        df = pd.DataFrame.from_records(records)
+    df = process_frame(df, symbols_path)
+    with METRICS.step('to_arrow', rows=len(df)):
+        return pa.Table.from_pandas(df, schema=PROCESSED_SCHEMA, preserve_index=False)
+
+def iter_processed_tables(input_path, symbols_path=None):
+    """
+    Yields the row groups of a processed Parquet file as tables. With symbols_path the
+    symbols column is extracted again with that dictionary.
+    """
+    parquet_file = pq.ParquetFile(input_path)
+    for i in range(parquet_file.num_row_groups):
+        with METRICS.step('load') as sizes:
+            table = parquet_file.read_row_group(i).cast(PROCESSED_SCHEMA)
+            sizes['rows'] = table.num_rows
+            sizes['bytes_read'] = parquet_file.metadata.row_group(i).total_byte_size
+        if symbols_path is not None:
+            with METRICS.step('symbols', rows=table.num_rows):
+                symbols = load_symbol_matcher(symbols_path).match(table.column('cleaned_content'),
+                                                                  table.column('hashtags'))
+                table = table.set_column(table.schema.get_field_index('symbols'), 'symbols', symbols)
+        yield table
+
+def add_partition_columns(table):
+    """
+    Appends the date and hour partition columns derived from timestamp_utc.
+    """
+    timestamps = table.column('timestamp_utc')
+    table = table.append_column('date', pc.strftime(timestamps, format='%Y-%m-%d'))
+    return table.append_column('hour', pc.hour(timestamps).cast(pa.int32()))
+
+def _write_tables(tables, path, partitioned=False, basename='part'):
+    """
+    Writes an iterable of processed Arrow tables to path and returns the row count.
+
+    Unpartitioned output is a single Parquet file with one row group per table.
+    Partitioned output is a hive-style dataset directory laid out as
+    date=YYYY-MM-DD/hour=H/<basename>-N.parquet.
+    """
+    rows = 0
+    if not partitioned:
+        with pq.ParquetWriter(path, PROCESSED_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+            for table in tables:
+                with METRICS.step('parquet_write', rows=table.num_rows):
+                    writer.write_table(table)
+                rows += table.num_rows
+        METRICS.count('rows_written', rows)
+        return rows
+
+    upstream_seconds = 0.0
+
+    def batches():
+        nonlocal rows, upstream_seconds
+        tables_iter = iter(tables)
+        while True:
+            # Time spent producing the tables is not part of the write
+            started = time.perf_counter()
+            table = next(tables_iter, None)
+            upstream_seconds += time.perf_counter() - started
+            if table is None:
+                return
+            rows += table.num_rows
+            yield from add_partition_columns(table).to_batches()
+
+    started = time.perf_counter()
+    ds.write_dataset(
+        batches(), path, schema=PARTITIONED_SCHEMA, format='parquet',
+        file_options=ds.ParquetFileFormat().make_write_options(compression=PARQUET_COMPRESSION),
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+        basename_template=basename + '-{i}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    METRICS.record('parquet_write', time.perf_counter() - started - upstream_seconds, rows)
+    METRICS.count('rows_written', rows)
+    return rows
+
+def _remove_path(path):
+    """
+    Removes a Parquet file or dataset directory if it exists.
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def _replace_output(tables, output_parquet_path, partitioned):
+    """
+    Writes the tables to a temporary path and swaps it in for the previous output, so
+    a failed run never leaves a truncated dataset behind. Returns the row count.
+    """
+    tmp_path = output_parquet_path + '.tmp'
+    _remove_path(tmp_path)
+    rows = _write_tables(tables, tmp_path, partitioned)
+    if partitioned and not os.path.exists(tmp_path):
+        os.makedirs(tmp_path)
+    _remove_path(output_parquet_path)
+    os.replace(tmp_path, output_parquet_path)
+    return rows
+
+def _process_data_streaming(input_json_path, output_parquet_path, batch_size, partitioned, engine,
+                            symbols_path=None):
+    """
+    Streams raw tweets through process_frame (or process_table) batch by batch,
+    appending each batch to the Parquet output as it goes. Only the set of seen ids
+    grows with the input.
+    """
+    print(f"Streaming raw data in batches of {batch_size:,} records...")
+
+    def arrow_batches():
+        for path in expand_input_paths(input_json_path):
+            for raw in iter_raw_tables(path, batch_size):
+                # Drop ids already written by an earlier batch
+                keep = [tweet_id not in seen_ids for tweet_id in raw.column('id').to_pylist()]
+                if not all(keep):
+                    raw = raw.filter(pa.array(keep))
+                if raw.num_rows:
+                    yield process_table(raw, symbols_path)
+
+    def pandas_batches():
+        for path in expand_input_paths(input_json_path):
+            for records in iter_raw_records(path, batch_size):
+                # Drop ids already written by an earlier batch
+                records = [record for record in records if record['id'] not in seen_ids]
+                if records:
+                    yield _process_records(records, symbols_path=symbols_path)
+
+    seen_ids = set()
+
+    def processed_tables():
+        total_rows = 0
+        batches = arrow_batches() if engine == 'arrow' else pandas_batches()
+        for batch_number, table in enumerate(batches, start=1):
+            seen_ids.update(table.column('id').to_pylist())
+            total_rows += table.num_rows
+            print(f"Batch {batch_number}: processed {table.num_rows:,} rows ({total_rows:,} total)")
+            yield table
+
+    total_rows = _replace_output(processed_tables(), output_parquet_path, partitioned)
+    print(f"Saved {total_rows:,} processed rows to {output_parquet_path}.")
+    print("Done.")
+
+def _merge_processed(input_paths, output_parquet_path, partitioned, symbols_path=None):
+    """
+    Merges processed Parquet files (e.g. the scraper's --output-format parquet output)
+    into the output row group by row group, dropping ids already written, without
+    reading or processing any raw tweets.
+    """
+    print(f"Merging {len(input_paths)} processed Parquet files...")
+    seen_ids = set()
+
+    def tables():
+        for path in input_paths:
+            for table in iter_processed_tables(path, symbols_path):
+                keep = [tweet_id not in seen_ids for tweet_id in table.column('id').to_pylist()]
+                METRICS.count('duplicates_dropped', keep.count(False))
+                if not all(keep):
+                    table = table.filter(pa.array(keep))
+                seen_ids.update(table.column('id').to_pylist())
+                yield table
+
+    total_rows = _replace_output(tables(), output_parquet_path, partitioned)
+    print(f"Saved {total_rows:,} rows to {output_parquet_path}")
+    print("Done.")
+
+def plan_shards(input_json_path, shard_bytes=64 << 20):
+    """
+    Splits the raw input into (path, start_offset, stop_offset) shards that can be
+    processed independently, in input order.
+
+    NDJSON files are cut into byte ranges of about shard_bytes, each ending on a line
+    boundary; the last range ends at the last complete line. JSON arrays cannot be
+    split without parsing them and are one shard each, with None offsets.
+    """
+    shards = []
+    for path in expand_input_paths(input_json_path):
+        if not is_ndjson(path):
+            shards.append((path, None, None))
+            continue
+        length = _complete_ndjson_length(path)
+        start = 0
+        with open(path, 'rb') as f:
+            while start < length:
+                f.seek(start + shard_bytes)
+                f.readline()
+                stop = min(f.tell(), length) if start + shard_bytes < length else length
+                shards.append((path, start, stop))
+                start = stop
+    return shards
+
+def _process_shard(shard, part_path, batch_size, engine, symbols_path=None):
+    """
+    Processes one shard into the Parquet file part_path, dropping ids repeated within
+    the shard, and returns the row count with the metrics recorded on the way. Runs in
+    a pool worker.
+    """
+    path, start_offset, stop_offset = shard
+    seen_ids = set()
+    # Pool workers are reused across shards, so only this shard's metrics go back
+    METRICS.steps, METRICS.counters = {}, {}
+
+    def tables():
+        if engine == 'arrow':
+            raw_tables = iter_raw_tables(path, batch_size, start_offset=start_offset or 0,
+                                         stop_offset=stop_offset)
+        else:
+            raw_tables = (records for records, _ in iter_raw_batches(path, batch_size, start_offset or 0,
+                                                                     stop_offset=stop_offset))
+        for raw in raw_tables:
+            if engine == 'arrow':
+                keep = [tweet_id not in seen_ids for tweet_id in raw.column('id').to_pylist()]
+                table = process_table(raw if all(keep) else raw.filter(pa.array(keep)), symbols_path)
+            else:
+                records = [record for record in raw if record['id'] not in seen_ids]
+                if not records:
+                    continue
+                table = _process_records(records, symbols_path=symbols_path)
+            seen_ids.update(table.column('id').to_pylist())
+            yield table
+
+    rows = _write_tables(tables(), part_path)
+    # Parts are temporary; the parent counts the rows of the merged output
+    METRICS.counters.pop('rows_written', None)
+    return rows, METRICS.steps, METRICS.counters
+
+def _first_occurrences(part_paths):
+    """
+    Returns a boolean keep mask per part file that is False for ids already present in
+    an earlier part, so the first occurrence in input order wins as in a serial run.
+    """
+    ids = [pq.read_table(path, columns=['id']).column('id').to_numpy() for path in part_paths]
+    all_ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    keep = np.zeros(len(all_ids), dtype=bool)
+    keep[np.unique(all_ids, return_index=True)[1]] = True
+    return np.split(keep, np.cumsum([len(part) for part in ids])[:-1])
+
+def _process_data_parallel(input_json_path, output_parquet_path, batch_size, partitioned, engine, workers,
+                           symbols_path=None):
+    """
+    Processes the raw input as shards in a pool of worker processes, each writing a
+    temporary Parquet part, then drops ids repeated across shards and merges the parts
+    into the output in input order. The output is the same as a serial run's.
+    """
+    shards = plan_shards(input_json_path)
+    print(f"Processing {len(shards)} shards with {workers} worker processes...")
+    parts_dir = output_parquet_path + '.shards'
+    _remove_path(parts_dir)
+    os.makedirs(parts_dir)
+    part_paths = [os.path.join(parts_dir, f'shard-{i:05d}.parquet') for i in range(len(shards))]
+    try:
+        # Spawned workers start clean instead of inheriting the parent's threads
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_process_shard, shard, part_path, batch_size, engine, symbols_path)
+                       for shard, part_path in zip(shards, part_paths)]
+            for number, future in enumerate(futures, start=1):
+                rows, steps, counters = future.result()
+                METRICS.merge(steps, counters)
+                print(f"Shard {number}/{len(shards)}: processed {rows:,} rows")
+
+        with METRICS.step('cross_shard_dedup') as sizes:
+            keep_masks = _first_occurrences(part_paths)
+            sizes['rows'] = sum(len(keep) for keep in keep_masks)
+        duplicates = sum(int((~keep).sum()) for keep in keep_masks)
+        METRICS.count('duplicates_dropped', duplicates)
+        print(f"Dropped {duplicates:,} ids repeated across shards")
+
+        def merged_tables():
+            for part_path, keep in zip(part_paths, keep_masks):
+                part = pq.ParquetFile(part_path)
+                offset = 0
+                for i in range(part.num_row_groups):
+                    table = part.read_row_group(i)
+                    group_keep = keep[offset:offset + table.num_rows]
+                    offset += table.num_rows
+                    yield table if group_keep.all() else table.filter(pa.array(group_keep))
+
+        total_rows = _replace_output(merged_tables(), output_parquet_path, partitioned)
+    finally:
+        _remove_path(parts_dir)
+    print(f"Saved {total_rows:,} rows to {output_parquet_path}")
+    print("Done.")
+
+def load_watermark(dataset_dir):
+    """
+    Returns the watermark of an incrementally built dataset: the highest tweet id and
+    timestamp already processed, plus the byte offset reached in each NDJSON source.
+    """
+    path = os.path.join(dataset_dir, WATERMARK_FILENAME)
+    if not os.path.exists(path):
+        return {'max_id': None, 'max_timestamp_utc': None, 'offsets': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_watermark(dataset_dir, watermark):
+    """
+    Atomically replaces the watermark file of a dataset directory.
+    """
+    path = os.path.join(dataset_dir, WATERMARK_FILENAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(watermark, f, indent=4)
+    os.replace(path + '.tmp', path)
+
+def _rows_after_watermark(dataset_dir, min_id):
+    """
+    Returns the id and timestamp_utc of dataset rows with an id greater than min_id
+    (every row if min_id is None).
+
+    Normally this is empty; it only finds rows when a previous run committed its part
+    file but crashed before saving the watermark, or when the watermark was lost. The
+    id filter is pushed down to row group statistics, so the check reads next to
+    nothing when the watermark is in sync.
+    """
+    dataset = ds.dataset(dataset_dir, schema=PROCESSED_SCHEMA, format='parquet')
+    id_filter = None if min_id is None else ds.field('id') > min_id
+    return dataset.to_table(columns=['id', 'timestamp_utc'], filter=id_filter)
+
+def _ids_in_dataset(dataset_dir, ids):
+    """
+    Returns which of the given ids are already stored in the dataset. The id range in
+    the filter lets row group statistics skip most of the dataset.
+    """
+    if not ids:
+        return set()
+    dataset = ds.dataset(dataset_dir, schema=PROCESSED_SCHEMA, format='parquet')
+    id_filter = (
+        (ds.field('id') >= min(ids)) & (ds.field('id') <= max(ids))
+        & ds.field('id').isin(pa.array(sorted(ids), type=pa.int64()))
+    )
+    return set(dataset.to_table(columns=['id'], filter=id_filter).column('id').to_pylist())
+
+def _advance_watermark(watermark, ids, timestamps):
+    """
+    Raises the watermark's max id / timestamp to cover the given (non-empty) columns.
+    """
+    max_id = pc.max(ids).as_py()
+    if watermark['max_id'] is None or max_id > watermark['max_id']:
+        watermark['max_id'] = max_id
+    max_ts = pc.max(timestamps).as_py().isoformat()
+    if watermark['max_timestamp_utc'] is None or max_ts > watermark['max_timestamp_utc']:
+        watermark['max_timestamp_utc'] = max_ts
+
+def _process_data_incremental(input_json_path, output_dir, batch_size, partitioned, engine, symbols_path=None):
+    """
+    Processes only the raw tweets newer than the dataset's watermark and appends them
+    to the dataset directory as new part files, then advances the watermark.
+    """
+    if os.path.isfile(output_dir):
+        raise ValueError(f"{output_dir} is a single Parquet file; incremental mode needs a dataset directory")
+    os.makedirs(output_dir, exist_ok=True)
+
+    watermark = load_watermark(output_dir)
+    max_id = watermark['max_id']
+    print(f"Incremental run from watermark id={max_id} ({watermark['max_timestamp_utc']})")
+
+    # Rows already in the dataset but above the watermark are never appended twice
+    existing = _rows_after_watermark(output_dir, max_id)
+    seen_ids = set(existing.column('id').to_pylist())
+    if existing.num_rows:
+        _advance_watermark(watermark, existing.column('id'), existing.column('timestamp_utc'))
+
+    run_name = f"part-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    def new_records(path):
+        """
+        Yields batches of the records in one raw file that are not in the dataset yet.
+        """
+        if not is_ndjson(path):
+            # A JSON array is rewritten as a whole, so the id watermark decides what is new
+            for records, _ in iter_raw_batches(path, batch_size):
+                yield [
+                    record for record in records
+                    if (max_id is None or record['id'] > max_id) and record['id'] not in seen_ids
+                ]
+            return
+
+        # NDJSON sources are resumed from the byte offset reached last time, unless the
+        # file has since been truncated or replaced by a smaller one. Everything past
+        # the offset is new to this dataset, except tweets below the id watermark (for
+        # instance from a quieter query), which are looked up in the dataset.
+        source = os.path.abspath(path)
+        start_offset = watermark['offsets'].get(source, 0)
+        if start_offset > os.path.getsize(path):
+            start_offset = 0
+        for records, end_offset in iter_raw_batches(path, batch_size, start_offset):
+            late_ids = {record['id'] for record in records if max_id is not None and record['id'] <= max_id}
+            with METRICS.step('dataset_lookup', rows=len(late_ids)):
+                stored_ids = _ids_in_dataset(output_dir, late_ids)
+            yield [
+                record for record in records
+                if record['id'] not in seen_ids and record['id'] not in stored_ids
+            ]
+            # Only saved along with the watermark, after the new data is committed
+            watermark['offsets'][source] = end_offset
+
+    def new_processed_tables(path):
+        """
+        Yields the tables of a processed Parquet file with the rows not in the dataset
+        yet. Committed files never change, so a file read completely once is skipped.
+        """
+        source = os.path.abspath(path)
+        num_rows = pq.ParquetFile(path).metadata.num_rows
+        if watermark['offsets'].get(source) == num_rows:
+            return
+        for table in iter_processed_tables(path, symbols_path):
+            ids = table.column('id').to_pylist()
+            late_ids = {tweet_id for tweet_id in ids if max_id is not None and tweet_id <= max_id}
+            with METRICS.step('dataset_lookup', rows=len(late_ids)):
+                stored_ids = _ids_in_dataset(output_dir, late_ids)
+            keep = [tweet_id not in seen_ids and tweet_id not in stored_ids for tweet_id in ids]
+            yield table if all(keep) else table.filter(pa.array(keep))
+        watermark['offsets'][source] = num_rows
+
+    def new_tables():
+        for path in expand_input_paths(input_json_path):
+            if is_processed_parquet(path):
+                for table in new_processed_tables(path):
+                    if table.num_rows:
+                        seen_ids.update(table.column('id').to_pylist())
+                        _advance_watermark(watermark, table.column('id'), table.column('timestamp_utc'))
+                        yield table
+                continue
+            for records in new_records(path):
+                if not records:
+                    continue
+                table = _process_records(records, engine, symbols_path)
+                seen_ids.update(table.column('id').to_pylist())
+                _advance_watermark(watermark, table.column('id'), table.column('timestamp_utc'))
+                yield table
+
+    # New data is staged under a name Parquet dataset readers ignore (leading '_' or
+    # '.') and only moved into the dataset once it has been written completely.
+    if partitioned:
+        staging_dir = os.path.join(output_dir, '_staging-' + run_name)
+        new_rows = _write_tables(new_tables(), staging_dir, partitioned=True, basename=run_name)
+        if new_rows:
+            for root, _, files in os.walk(staging_dir):
+                target_dir = os.path.join(output_dir, os.path.relpath(root, staging_dir))
+                os.makedirs(target_dir, exist_ok=True)
+                for name in files:
+                    os.replace(os.path.join(root, name), os.path.join(target_dir, name))
+        _remove_path(staging_dir)
+    else:
+        tmp_path = os.path.join(output_dir, '.' + run_name + '.parquet.tmp')
+        new_rows = _write_tables(new_tables(), tmp_path)
+        if new_rows:
+            os.replace(tmp_path, os.path.join(output_dir, run_name + '.parquet'))
+        _remove_path(tmp_path)
+
+    if new_rows:
+        print(f"Appended {new_rows:,} new rows to {output_dir}")
+    else:
+        print("No new tweets since the last run.")
+
+    save_watermark(output_dir, watermark)
+    print(f"Watermark advanced to id={watermark['max_id']} ({watermark['max_timestamp_utc']})")
+    print("Done.")
+
+def process_data(input_json_path='raw_tweets', output_parquet_path='processed_tweets.parquet',
+                 stream=False, batch_size=50_000, incremental=False, partitioned=False, engine='pandas',
+                 workers=None, symbols_path=None):
+    """
+    Loads raw data, processes it, and saves it to Parquet format.
+
+    The raw input may be a JSON array or newline-delimited JSON file, an Arrow stream
+    file (.arrows, from scrapper.py --output-format arrow), or a directory or glob
+    pattern of such files (e.g. the scraper's rotating output). With
+    stream=True it is read in batches of batch_size records and each processed batch is
+    appended to the Parquet output as it goes, so peak memory stays bounded for very
+    large dumps.
+
+    With incremental=True output_parquet_path is a dataset directory: only tweets not
+    yet in it (past the saved NDJSON offsets, or above the id watermark for JSON arrays)
+    are processed, in batches, and appended as new part files.
+
+    The input may instead be processed Parquet files, as scrapper.py --output-format
+    parquet writes them. Those tweets are not processed again: their row groups are
+    merged into the output (or appended, with incremental=True), dropping repeated
+    ids, and only the symbols column is redone if symbols_path is given.
+
+    With partitioned=True the output is a hive-partitioned dataset directory split by
+    date and hour of timestamp_utc, which lets readers skip whole time ranges.
+
+    engine='arrow' processes the tweets with process_table instead of process_frame:
+    JSON is read straight into Arrow tables and every step runs as an Arrow compute
+    kernel, so no pandas objects are created. The output is the same.
+
+    With workers set, the input is split into shards (files, and byte ranges of NDJSON
+    files) that a pool of that many processes handles in parallel, in batches; ids
+    repeated across shards are then dropped and the parts merged, giving the same
+    output as a serial run.
+
+    Every tweet gets a symbols column: the symbols of the dictionary at symbols_path
+    (see symbols.load_symbol_dictionary; symbols.json by default) that its content or
+    hashtags mention. analyze.py builds an inverted index from it to compute signals
+    per symbol without going back to the text.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    processed = [is_processed_parquet(path) for path in expand_input_paths(input_json_path)]
+    if any(processed) and not all(processed):
+        raise ValueError(f"{input_json_path} mixes processed Parquet files with raw tweet files")
+    if all(processed) and not incremental:
+        _merge_processed(expand_input_paths(input_json_path), output_parquet_path, partitioned, symbols_path)
+        return
+    if workers is not None:
+        if incremental:
+            raise ValueError("workers cannot be combined with incremental mode")
+        _process_data_parallel(input_json_path, output_parquet_path, batch_size, partitioned, engine, workers,
+                               symbols_path)
+        return
+    if incremental:
+        _process_data_incremental(input_json_path, output_parquet_path, batch_size, partitioned, engine,
+                                  symbols_path)
+        return
+    if stream:
+        _process_data_streaming(input_json_path, output_parquet_path, batch_size, partitioned, engine,
+                                symbols_path)
+        return
+    if engine == 'arrow':
+        print("Loading raw data...")
+        raw = pa.concat_tables([RAW_SCHEMA.empty_table()] + [
+            table for path in expand_input_paths(input_json_path) for table in iter_raw_tables(path, batch_size)
+        ])
+        print("Processing data...")
+        table = process_table(raw, symbols_path)
+        print(f"Data processed. Shape of the table: {table.shape}")
+        print(f"Saving processed data to {output_parquet_path}...")
+        _replace_output([table], output_parquet_path, partitioned)
+        print("Done.")
+        return
+
+    print("Loading raw data...")
+    # Load data from JSON into a pandas DataFrame
+    df = pd.concat([read_raw_frame(path) for path in expand_input_paths(input_json_path)], ignore_index=True)
+
+    print("Processing data...")
+    df = process_frame(df, symbols_path)
 
     print(f"Data processed. Shape of the DataFrame: {df.shape}")
 
@@ -53,9 +1092,35 @@ def process_data(input_json_path='raw_tweets.json', output_parquet_path='process
     # Save the cleaned DataFrame to Parquet format
     # Parquet is highly efficient for analytics
     print(f"Saving processed data to {output_parquet_path}...")
-    df.to_parquet(output_parquet_path, index=False)
+    with METRICS.step('to_arrow', rows=len(df)):
+        table = pa.Table.from_pandas(df, schema=PROCESSED_SCHEMA, preserve_index=False)
+    _replace_output([table], output_parquet_path, partitioned)
     print("Done.")
 
 
 if __name__ == '__main__':
-    process_data()
+    parser = argparse.ArgumentParser(description="Clean raw tweets and save them as Parquet.")
+    parser.add_argument('--input', default='raw_tweets',
+                        help="raw JSON array, NDJSON or Arrow stream file, the scraper's processed Parquet "
+                             "files, or a directory or glob pattern of them (default: the scraper's "
+                             "output directory, raw_tweets)")
+    parser.add_argument('--output', default='processed_tweets.parquet')
+    parser.add_argument('--stream', action='store_true', help="process the input in bounded-memory batches")
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--incremental', action='store_true',
+                        help="only process tweets newer than the output dataset's watermark")
+    parser.add_argument('--partitioned', action='store_true',
+                        help="write a dataset partitioned by date/hour of timestamp_utc")
+    parser.add_argument('--engine', choices=ENGINES, default='pandas',
+                        help="process with pandas or with Arrow compute kernels only")
+    parser.add_argument('--workers', type=int,
+                        help="process shards of the input in this many worker processes")
+    parser.add_argument('--symbols', help="symbol dictionary (JSON or CSV) to extract the symbols column with "
+                                          "(default: symbols.json)")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented_run('process', args.metrics_file, args.prometheus_file, args.profile, args.tracemalloc):
+        process_data(args.input, args.output, stream=args.stream, batch_size=args.batch_size,
+                     incremental=args.incremental, partitioned=args.partitioned, engine=args.engine,
+                     workers=args.workers, symbols_path=args.symbols)
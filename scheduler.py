@@ -0,0 +1,201 @@
+# scheduler.py
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+class QueryScheduler:
+    """
+    Decides which search to poll next so that the request budget goes to the queries
+    that bring in fresh tweets.
+
+    For every query it keeps an estimate of how many fresh tweets (ones no other query
+    or earlier poll returned) it gains per second, smoothed over its polls. A query
+    is due once a full page of fresh tweets is expected, within [min_interval,
+    max_interval] seconds of its last poll, so busy queries are polled proportionally
+    more often. A poll that finds nothing new halves the estimate, which doubles the
+    wait before the next one: quiet queries back off exponentially, down to one poll
+    every max_interval, which keeps watching them for a burst. A poll cut off before
+    it reached the tweets it already had (truncated) means the query outran its
+    polls, so its estimate is doubled rather than smoothed. A query never polled is
+    due at once, and polled again after min_interval to measure its rate. Among due
+    queries the one with the most fresh tweets expected per request goes first.
+
+    Times are seconds on any clock (time.time() for the scraper, simulated ones for
+    simulate_polling). The state of every query, including the newest tweet id seen,
+    is kept in a JSON file when path is given, written by save() and at most every
+    save_interval seconds by maybe_save(); before_save is called first, as in
+    ScrapeCheckpoints.
+    """
+
+    def __init__(self, queries, page_size=20, min_interval=30.0, max_interval=1800.0, smoothing=0.5, path=None,
+                 save_interval=5.0, before_save=None):
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.path = path
+        self.save_interval = save_interval
+        self.before_save = before_save
+        saved = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)['queries']
+        self.queries = {query: saved.get(query, {'rate': None, 'last_poll': None, 'newest_id': None,
+                                                 'polls': 0, 'requests': 0, 'fresh': 0})
+                        for query in queries}
+        self._polling = set()
+        self._last_save = time.monotonic()
+
+    def interval(self, query):
+        """
+        Returns the seconds between polls of a query at its estimated rate.
+        """
+        rate = self.queries[query]['rate']
+        if rate is None:
+            # Polled once: poll again soon to measure its rate
+            return self.min_interval
+        if rate <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, self.page_size / rate))
+
+    def expected_yield(self, query, now):
+        """
+        Returns the fresh tweets a poll of query is expected to bring per request.
+        """
+        state = self.queries[query]
+        if state['rate'] is None:
+            return math.inf
+        expected = state['rate'] * (now - state['last_poll'])
+        return expected / max(1, math.ceil(expected / self.page_size))
+
+    def next_poll(self, now):
+        """
+        Returns (query, seconds until it is due) for the query to poll next, or
+        (None, None) while every query is being polled.
+        """
+        best, best_wait, best_yield = None, None, None
+        for query, state in self.queries.items():
+            if query in self._polling:
+                continue
+            wait = 0.0 if state['last_poll'] is None else max(0.0, state['last_poll'] + self.interval(query) - now)
+            score = self.expected_yield(query, now)
+            if best is None or (wait, -score) < (best_wait, -best_yield):
+                best, best_wait, best_yield = query, wait, score
+        return best, best_wait
+
+    def start(self, query):
+        """
+        Marks a query as being polled, so it is not handed out twice at once.
+        """
+        self._polling.add(query)
+
+    def record(self, query, fresh, requests, now, newest_id=None, truncated=False):
+        """
+        Records a finished poll: fresh tweets found with requests requests, and whether
+        it stopped before reaching the tweets of the previous poll.
+        """
+        self._polling.discard(query)
+        state = self.queries[query]
+        if state['last_poll'] is not None:
+            rate = fresh / max(now - state['last_poll'], 1e-9)
+            if truncated:
+                state['rate'] = 2 * max(rate, state['rate'] or 0.0)
+            elif state['rate'] is None:
+                state['rate'] = rate
+            else:
+                state['rate'] = self.smoothing * rate + (1 - self.smoothing) * state['rate']
+        state['last_poll'] = now
+        if newest_id is not None and (state['newest_id'] is None or newest_id > state['newest_id']):
+            state['newest_id'] = newest_id
+        state['polls'] += 1
+        state['requests'] += requests
+        state['fresh'] += fresh
+
+    def release(self, query):
+        """
+        Gives up on a poll that failed, leaving the query's state as it was.
+        """
+        self._polling.discard(query)
+
+    def maybe_save(self):
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        """
+        Atomically replaces the state file.
+        """
+        if self.before_save is not None:
+            self.before_save()
+        if self.path:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'queries': self.queries}, f, indent=4)
+            os.replace(self.path + '.tmp', self.path)
+        self._last_save = time.monotonic()
+
+class FixedScheduler(QueryScheduler):
+    """
+    Polls every query at the same cadence, every interval seconds, oldest poll first:
+    the baseline QueryScheduler is compared with.
+    """
+
+    def __init__(self, queries, interval=60.0, page_size=20):
+        super().__init__(queries, page_size=page_size, min_interval=interval, max_interval=interval)
+
+    def interval(self, query):
+        return self.max_interval
+
+    def expected_yield(self, query, now):
+        last_poll = self.queries[query]['last_poll']
+        return math.inf if last_poll is None else now - last_poll
+
+def poisson_arrivals(rates, duration, seed=0):
+    """
+    Returns sorted post times in [0, duration) for a Poisson stream whose rate
+    (tweets per second) is rates[i] during second i (or a constant rate).
+    """
+    rng = np.random.default_rng(seed)
+    rates = np.broadcast_to(np.asarray(rates, dtype=float), (int(duration),))
+    counts = rng.poisson(rates)
+    return np.sort(np.repeat(np.arange(len(counts)), counts) + rng.random(counts.sum()))
+
+def simulate_polling(scheduler, arrivals, duration, requests_per_second, page_size=20, max_pages=10):
+    """
+    Replays polling offline: arrivals maps each query to the sorted times its tweets
+    are posted, and scheduler (a QueryScheduler) picks the polls, one second at a
+    time, within a budget of requests_per_second.
+
+    A poll returns the tweets posted since the query's previous poll, newest first,
+    page_size per request and at most max_pages pages; older ones are missed, as a
+    live poll stops at the newest tweet it already has. A poll costs at least one
+    request. Returns the requests made, the tweets captured, missed and still
+    waiting for a poll at the end, and the delays between posting and capture.
+    """
+    seen = {query: 0 for query in arrivals}
+    requests, captured, missed, delays = 0, 0, 0, []
+    tokens = 0.0
+    for now in range(1, int(duration) + 1):
+        tokens = min(tokens + requests_per_second, max(requests_per_second, max_pages))
+        while tokens >= 1:
+            query, wait = scheduler.next_poll(now)
+            if query is None or wait > 0:
+                break
+            scheduler.start(query)
+            posts = arrivals[query]
+            end = np.searchsorted(posts, now)
+            new = posts[seen[query]:end]
+            seen[query] = end
+            kept = new[-max_pages * page_size:]
+            cost = max(1, math.ceil(len(kept) / page_size))
+            tokens -= cost
+            requests += cost
+            captured += len(kept)
+            missed += len(new) - len(kept)
+            delays.append(now - kept)
+            scheduler.record(query, len(kept), cost, now, truncated=len(kept) < len(new))
+    waiting = sum(len(posts) - seen[query] for query, posts in arrivals.items())
+    delays = np.concatenate(delays) if delays else np.zeros(0)
+    return {'requests': requests, 'captured': captured, 'missed': missed, 'waiting': waiting, 'delays': delays}
@@ -1,46 +1,605 @@
+import argparse
 import asyncio
-from twscrape import API, gather
-from twscrape.logger import set_log_level
 import json
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from twscrape import API
+from twscrape.accounts_pool import NoAccountError
+from twscrape.logger import set_log_level
+from twscrape.models import parse_tweets
+from twscrape.utils import find_obj
+
+from backfill import BackfillPlan
+from checkpoints import ScrapeCheckpoints
+from scheduler import QueryScheduler
+from seen_index import SeenIdIndex
+from session_cache import SessionCache
+from tweet_writers import ArrowTweetWriter, NDJSONTweetWriter, ParquetTweetWriter, TweetRecord
+
+# Searches run by default: the original combined hashtag query
+DEFAULT_QUERIES = ['(#nifty50 OR #sensex OR #intraday OR #banknifty) lang:en']
+
+# Accounts added to the pool
+ACCOUNTS = [
+    {'username': 'user1', 'password': 'pass1', 'email': 'u1@example.com', 'email_password': 'mail_pass1'},
+]
+
+# Output formats of the scraper and the writer of each
+OUTPUT_WRITERS = {'ndjson': NDJSONTweetWriter, 'arrow': ArrowTweetWriter, 'parquet': ParquetTweetWriter}
+
+def tweet_to_row(tweet):
+    """
+    Selects the fields we keep from a twscrape Tweet, as per the assignment, into a
+    compact TweetRecord.
+    """
+    user = tweet.user
+    return TweetRecord(
+        tweet.id,
+        user.username,
+        tweet.date.isoformat(), # Use ISO format for universal compatibility
+        tweet.rawContent,
+        tweet.likeCount,
+        tweet.retweetCount,
+        tweet.replyCount,
+        tweet.quoteCount,
+        tweet.hashtags,
+        [mentioned.username for mentioned in tweet.mentionedUsers] if tweet.mentionedUsers else [],
+        tweet.url,
+        user.followersCount,
+        user.location,
+    )
+
+def tweet_to_record(tweet):
+    """
+    Returns the fields we keep from a twscrape Tweet as a dict.
+    """
+    return tweet_to_row(tweet)._asdict()
+
+# Queued after the tweets of a page, so its cursor is recorded once they are consumed
+_PageConsumed = namedtuple('_PageConsumed', ['query', 'tweet_ids', 'next_cursor'])
+# Queued after the last page of a search that ended normally (at limit, known tweets
+# or the last page), so its checkpoint is completed once the tweets are consumed
+_SearchFinished = namedtuple('_SearchFinished', ['query'])
+# Queued after the last page of a backfill window, so the plan records it once its
+# tweets are consumed; tweets is None for a window given up on, oldest set for a split
+# and handoff for a split made for an idle search
+_WindowSearched = namedtuple('_WindowSearched', ['name', 'tweets', 'oldest', 'handoff'])
+# Queued after the fresh tweets of a poll, so the scheduler records it once they are consumed
+_PollDone = namedtuple('_PollDone', ['query', 'fresh', 'requests', 'polled_at', 'newest_id', 'truncated'])
+
+async def search_pages(api, query, limit=-1, cursor=None):
+    """
+    Yields (tweets, next_cursor) for each page of a search, starting from the page at
+    cursor if given. next_cursor is None on the last page. limit is rounded up to
+    whole pages, so that the next run can carry on from the last cursor.
+    """
+    if hasattr(api, 'search_pages'):
+        # MockAPI pages natively
+        async for page in api.search_pages(query, limit, cursor):
+            yield page
+        return
+    async for rep in api.search_raw(query, limit=limit, kv={'cursor': cursor} if cursor else None):
+        obj = rep.json()
+        next_cursor = find_obj(obj, lambda x: x.get('cursorType') == 'Bottom')
+        yield list(parse_tweets(obj)), next_cursor.get('value') if next_cursor else None
+
+async def refresh_sessions(api, usernames, sessions, ready=None):
+    """
+    Logs the accounts in again one at a time and caches the sessions of those that
+    succeed, setting the ready event after the first one.
+    """
+    for username in usernames:
+        await api.pool.relogin([username])
+        account = await api.pool.get_account(username)
+        if account is not None and account.active and sessions.put(username, account.cookies):
+            sessions.save()
+            if ready is not None:
+                ready.set()
+        else:
+            sessions.invalidate(username)
+            print(f"Could not log in {username}")
+
+async def start_accounts(api, accounts=ACCOUNTS, sessions=None):
+    """
+    Adds the accounts to api.pool with a session ready to search, and returns the task
+    still refreshing sessions in the background (None if there is nothing to refresh).
+
+    Without sessions every inactive account is logged in before returning, as
+    api.pool.login_all does. With a SessionCache, accounts with an unexpired cached
+    session are activated from its cookies without logging in, and the others are
+    logged in again in the background; the pool picks each one up once it is done.
+    Only if no account had a usable session does this wait, for the first login.
+    """
+    for account in accounts:
+        await api.pool.add_account(account['username'], account['password'], account['email'],
+                                   account['email_password'])
+    if sessions is None:
+        await api.pool.login_all()  # try to login to receive account cookies
+        return None
+
+    stale = []
+    for account in accounts:
+        cookies = sessions.get(account['username'])
+        if cookies is None:
+            stale.append(account['username'])
+        else:
+            await api.pool.add_account_cookies(account['username'], json.dumps(cookies))
+    print(f"Reusing {len(accounts) - len(stale)} cached sessions, refreshing {len(stale)}")
+    if not stale:
+        return None
+
+    ready = asyncio.Event()
+    refresh = asyncio.create_task(refresh_sessions(api, stale, sessions, ready))
+    if len(stale) == len(accounts):
+        # Nothing to search with until an account has logged in (or all have failed)
+        ready_wait = asyncio.create_task(ready.wait())
+        await asyncio.wait([refresh, ready_wait], return_when=asyncio.FIRST_COMPLETED)
+        ready_wait.cancel()
+    return refresh
+
+async def forget_invalid_sessions(api, sessions):
+    """
+    Drops the cached sessions of accounts the pool has deactivated, e.g. because the
+    site rejected their session during the scrape, and saves the cache.
+    """
+    for account in await api.pool.get_all():
+        if not account.active:
+            sessions.invalidate(account.username)
+    sessions.save()
+
+async def active_account_count(api):
+    """
+    Returns the number of active accounts in the API's pool.
+    """
+    accounts = await api.pool.get_all()
+    return sum(1 for account in accounts if account.active)
+
+async def iter_new_tweets(api, queries, limit=20, concurrency=None, max_retries=8,
+                          backoff=2.0, max_backoff=300.0, seen_ids=None, known_ids=None,
+                          stop_after_known=20, checkpoints=None):
+    """
+    Runs several searches concurrently and yields each previously unseen Tweet as soon
+    as any of them returns it.
+
+    Each search holds one account from api.pool while it pages through results, so by
+    default as many searches run at once as there are active accounts. Rate limits are
+    tracked per account by the pool, which locks a limited account until its window
+    resets and moves the search, cursor intact, to the next free account. If the pool
+    is configured to raise NoAccountError instead of waiting, the search backs off
+    exponentially (with jitter) and is retried. seen_ids is shared by all searches, so
+    a tweet matching several queries is only yielded once.
+
+    known_ids holds the ids scraped by earlier runs (such as a SeenIdIndex); those
+    tweets are skipped. Since search results come newest first, a search that meets
+    stop_after_known known tweets in a row has reached what earlier runs already
+    scraped and stops paging (None keeps paging).
+
+    With checkpoints (a ScrapeCheckpoints), the cursor of every page is recorded once
+    the consumer has taken all of the page's tweets, so a search cut short (by a
+    crash, or given up after NoAccountError) continues from its saved cursor, also
+    when retried. A search that ends normally, at limit or at known tweets, is marked
+    complete, so the next run starts again from the newest tweets.
+    """
+    if concurrency is None:
+        concurrency = max(1, await active_account_count(api))
+    semaphore = asyncio.Semaphore(concurrency)
+    seen_ids = set() if seen_ids is None else seen_ids
+    # Bounded, so searches pause instead of piling up tweets the consumer has not taken
+    queue = asyncio.Queue(maxsize=1000)
+    done = object()
+
+    async def run_query(query):
+        for attempt in range(max_retries + 1):
+            try:
+                async with semaphore:
+                    known_streak = 0
+                    cursor = checkpoints.resume_cursor(query) if checkpoints is not None else None
+                    async for tweets, next_cursor in search_pages(api, query, limit, cursor):
+                        reached_known = False
+                        for tweet in tweets:
+                            if known_ids is not None and tweet.id in known_ids:
+                                known_streak += 1
+                                if stop_after_known is not None and known_streak >= stop_after_known:
+                                    reached_known = True
+                                    break
+                                continue
+                            known_streak = 0
+                            if tweet.id not in seen_ids:
+                                seen_ids.add(tweet.id)
+                                await queue.put(tweet)
+                        if checkpoints is not None:
+                            await queue.put(_PageConsumed(query, [tweet.id for tweet in tweets],
+                                                          None if reached_known else next_cursor))
+                        if reached_known:
+                            break
+                if checkpoints is not None:
+                    await queue.put(_SearchFinished(query))
+                return
+            except NoAccountError:
+                if attempt == max_retries:
+                    print(f"Giving up on {query!r}: no account available after {max_retries} retries")
+                    return
+                # Sleep outside the semaphore so other searches can use the slot
+                delay = min(max_backoff, backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"No account available for {query!r}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
 
-async def main():
+    async def run_all():
+        try:
+            await asyncio.gather(*(run_query(query) for query in queries))
+        finally:
+            await queue.put(done)
+
+    producer = asyncio.create_task(run_all())
+    try:
+        while (tweet := await queue.get()) is not done:
+            if isinstance(tweet, _PageConsumed):
+                checkpoints.record_page(tweet.query, tweet.tweet_ids, tweet.next_cursor)
+                checkpoints.maybe_save()
+                continue
+            if isinstance(tweet, _SearchFinished):
+                checkpoints.mark_complete(tweet.query)
+                checkpoints.maybe_save()
+                continue
+            yield tweet
+        await producer  # re-raise anything a search failed with
+    finally:
+        producer.cancel()
+
+async def iter_backfill_tweets(api, plan, concurrency=None, max_retries=8, backoff=2.0, max_backoff=300.0,
+                               seen_ids=None, known_ids=None, checkpoints=None, split_after=None):
+    """
+    Searches the windows of a BackfillPlan concurrently as the plan hands them out,
+    and yields each previously unseen Tweet as soon as any search returns it.
+
+    As many windows are searched at once as there are active accounts (or
+    concurrency), each paged to its end. A window that has returned split_after
+    tweets (by default four times the plan's target) with more pages to go is
+    stopped and split, so the rest of a burst is shared out among the accounts
+    instead of paged through by one; so is a window with at least twice the plan's
+    min_window left to search while a search sits idle for want of windows. Tweets
+    scraped by earlier runs (known_ids) are skipped but never end a window early.
+    NoAccountError is retried as in iter_new_tweets. Windows are recorded in the
+    plan, and pages in checkpoints, once the consumer has taken their tweets.
+    """
+    if concurrency is None:
+        concurrency = max(1, await active_account_count(api))
+    split_after = plan.target_tweets * 4 if split_after is None else split_after
+    seen_ids = set() if seen_ids is None else seen_ids
+    queue = asyncio.Queue(maxsize=1000)
+    # Notified when the plan changes, for searches waiting on a window to split
+    changed = asyncio.Condition()
+    idle, handoffs = 0, 0
+    done = object()
+
+    def should_split(name, searched, oldest):
+        """
+        Decides at a page boundary whether a window with more pages stops there:
+        returns None to go on, 'dense' past split_after tweets, or 'handoff' to share
+        it with an idle search.
+        """
+        nonlocal handoffs
+        if searched >= split_after:
+            return 'dense'
+        # One split per idle search, and only of windows with enough time left to halve
+        since = datetime.fromisoformat(plan.window(name)['since'])
+        if idle > handoffs and oldest - since >= 2 * plan.min_window:
+            handoffs += 1
+            return 'handoff'
+        return None
+
+    async def search_window(name):
+        for attempt in range(max_retries + 1):
+            try:
+                window_ids, oldest = set(), None
+                cursor = checkpoints.resume_cursor(name) if checkpoints is not None else None
+                async for tweets, next_cursor in search_pages(api, name, -1, cursor):
+                    window_ids.update(tweet.id for tweet in tweets)
+                    for tweet in tweets:
+                        oldest = tweet.date if oldest is None else min(oldest, tweet.date)
+                        if (known_ids is None or tweet.id not in known_ids) and tweet.id not in seen_ids:
+                            seen_ids.add(tweet.id)
+                            await queue.put(tweet)
+                    split = should_split(name, len(window_ids), oldest) if next_cursor is not None else None
+                    if checkpoints is not None:
+                        await queue.put(_PageConsumed(name, [tweet.id for tweet in tweets],
+                                                      None if split else next_cursor))
+                    if split:
+                        return _WindowSearched(name, len(window_ids), oldest, split == 'handoff')
+                return _WindowSearched(name, len(window_ids), None, False)
+            except NoAccountError:
+                if attempt == max_retries:
+                    print(f"Giving up on {name!r}: no account available after {max_retries} retries")
+                    return _WindowSearched(name, None, None, False)
+                delay = min(max_backoff, backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"No account available for {name!r}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def run_searches():
+        nonlocal idle
+        while True:
+            async with changed:
+                # With nothing left to carve, a running window may still be split
+                idle += 1
+                await changed.wait_for(lambda: plan.has_work() or not plan.running)
+                idle -= 1
+                name = plan.next_window()
+            if name is None:
+                return
+            await queue.put(await search_window(name))
+
+    async def run_all():
+        try:
+            await asyncio.gather(*(run_searches() for _ in range(concurrency)))
+        finally:
+            await queue.put(done)
+
+    producer = asyncio.create_task(run_all())
+    try:
+        while (tweet := await queue.get()) is not done:
+            if isinstance(tweet, _PageConsumed):
+                checkpoints.record_page(tweet.query, tweet.tweet_ids, tweet.next_cursor)
+                checkpoints.maybe_save()
+                continue
+            if isinstance(tweet, _WindowSearched):
+                if tweet.tweets is None:
+                    plan.release(tweet.name)
+                elif tweet.oldest is None:
+                    plan.finish(tweet.name, tweet.tweets)
+                else:
+                    plan.split(tweet.name, tweet.tweets, tweet.oldest)
+                if tweet.handoff:
+                    # The idle search this split was for can take a window now
+                    handoffs -= 1
+                plan.maybe_save()
+                async with changed:
+                    changed.notify_all()
+                continue
+            yield tweet
+        await producer  # re-raise anything a search failed with
+    finally:
+        producer.cancel()
+
+async def poll_query(api, query, newest_id=None, max_pages=10, seen_ids=None, known_ids=None):
+    """
+    Fetches the tweets of a search posted since its newest tweet seen before
+    (newest_id), paging until it reaches that tweet or max_pages pages (one page if
+    there is no newest_id yet).
+
+    Returns the fresh tweets (not in seen_ids or known_ids; seen_ids is updated), the
+    requests made, the newest tweet id seen and whether the poll stopped at max_pages
+    before reaching newest_id.
+    """
+    seen_ids = set() if seen_ids is None else seen_ids
+    fresh, requests, newest, truncated = [], 0, newest_id, False
+    async for tweets, next_cursor in search_pages(api, query):
+        requests += 1
+        reached_known = False
+        for tweet in tweets:
+            if newest_id is not None and tweet.id <= newest_id:
+                reached_known = True
+                break
+            newest = tweet.id if newest is None else max(newest, tweet.id)
+            if tweet.id not in seen_ids and (known_ids is None or tweet.id not in known_ids):
+                seen_ids.add(tweet.id)
+                fresh.append(tweet)
+        if reached_known or next_cursor is None:
+            break
+        if requests >= (max_pages if newest_id is not None else 1):
+            truncated = newest_id is not None
+            break
+    return fresh, requests, newest, truncated
+
+async def poll_queries(api, scheduler, duration, concurrency=None, max_pages=10, backoff=2.0, max_backoff=300.0,
+                       seen_ids=None, known_ids=None):
+    """
+    Polls the queries of a QueryScheduler for duration seconds, each one when the
+    scheduler has it due, and yields each fresh Tweet as soon as a poll returns it.
+
+    As many polls run at once as there are active accounts (or concurrency). A poll
+    pages back to the newest tweet the query returned before (see poll_query), and is
+    recorded in the scheduler, which spaces out the polls of quiet queries, once the
+    consumer has taken its tweets. A poll without an account (NoAccountError) is
+    retried later with exponential backoff.
+    """
+    if concurrency is None:
+        concurrency = max(1, await active_account_count(api))
+    seen_ids = set() if seen_ids is None else seen_ids
+    queue = asyncio.Queue(maxsize=1000)
+    deadline = time.time() + duration
+    done = object()
+
+    async def run_polls():
+        failures = 0
+        while (now := time.time()) < deadline:
+            query, wait = scheduler.next_poll(now)
+            if query is None or wait > 0:
+                # Every query is being polled, or none is due yet
+                await asyncio.sleep(min(1.0 if wait is None else wait, deadline - now))
+                continue
+            scheduler.start(query)
+            try:
+                fresh, requests, newest_id, truncated = await poll_query(
+                    api, query, scheduler.queries[query]['newest_id'], max_pages, seen_ids, known_ids)
+            except NoAccountError:
+                scheduler.release(query)
+                delay = min(max_backoff, backoff * 2 ** failures) * random.uniform(0.5, 1.5)
+                failures += 1
+                print(f"No account available to poll {query!r}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            for tweet in fresh:
+                await queue.put(tweet)
+            await queue.put(_PollDone(query, len(fresh), requests, now, newest_id, truncated))
+
+    async def run_all():
+        try:
+            await asyncio.gather(*(run_polls() for _ in range(concurrency)))
+        finally:
+            await queue.put(done)
+
+    producer = asyncio.create_task(run_all())
+    try:
+        while (tweet := await queue.get()) is not done:
+            if isinstance(tweet, _PollDone):
+                scheduler.record(tweet.query, tweet.fresh, tweet.requests, tweet.polled_at, tweet.newest_id,
+                                 tweet.truncated)
+                scheduler.maybe_save()
+                continue
+            yield tweet
+        await producer  # re-raise anything a poll failed with
+    finally:
+        producer.cancel()
+
+async def scrape_queries(api, queries, limit=20, **kwargs):
+    """
+    Runs several searches concurrently and returns the deduplicated tweet records.
+    Takes the same options as iter_new_tweets.
+    """
+    return [tweet_to_record(tweet) async for tweet in iter_new_tweets(api, queries, limit, **kwargs)]
+
+async def main(queries=DEFAULT_QUERIES, limit=20, concurrency=None, output_dir='raw_tweets',
+               seen_index='seen_ids.npy', stop_after_known=20, checkpoint_file='scrape_checkpoints.json',
+               since=None, until=None, window_days=1, session_file='sessions.json', session_ttl_hours=24.0,
+               output_format='ndjson', symbols_path=None, backfill_file='backfill_plan.json',
+               window_tweets=1000, poll_minutes=None, schedule_file='poll_schedule.json'):
     api = API()  # or API("path-to.db") – default is `accounts.db`
 
-    await api.pool.add_account("user1", "pass1", "u1@example.com", "mail_pass1")
-    await api.pool.login_all() # try to login to receive account cookies
+    # Cached sessions are reused; expired ones are refreshed while the scrape runs
+    started = time.perf_counter()
+    sessions = SessionCache(session_file, session_ttl_hours) if session_file else None
+    refresh = await start_accounts(api, ACCOUNTS, sessions)
+    print(f"Accounts ready to search after {time.perf_counter() - started:.2f}s")
+    if refresh is not None and concurrency is None:
+        # Accounts still logging in join the searches once they are ready
+        concurrency = len(ACCOUNTS)
 
     # API USAGE
 
-    # search (latest tab)
-    query = '(#nifty50 OR #sensex OR #intraday OR #banknifty) lang:en'
-    scraped_tweets = await gather(api.search(query, limit=20))  # list[Tweet]
-    print(scraped_tweets)
-    tweets_data_to_save = []
-    for tweet in scraped_tweets:
-        # Select only the fields you need, as per the assignment
-        tweets_data_to_save.append({
-            'id': tweet.id,
-            'username': tweet.user.username,
-            'timestamp_utc': tweet.date.isoformat(), # Use ISO format for universal compatibility
-            'content': tweet.rawContent,
-            'like_count': tweet.likeCount,
-            'retweet_count': tweet.retweetCount,
-            'reply_count': tweet.replyCount,
-            'quote_count': tweet.quoteCount,
-            'hashtags': tweet.hashtags,
-            'mentioned_users': [user.username for user in tweet.mentionedUsers] if tweet.mentionedUsers else [],
-            'url': tweet.url,
-            'user_followers': tweet.user.followersCount,
-            'user_location': tweet.user.location
-        })
-
-    # Save the list of dictionaries to a JSON file
-    # JSON is great for storing raw, semi-structured data before processing
-    raw_data_filename = 'raw_tweets.json'
-    with open(raw_data_filename, 'w', encoding='utf-8') as f:
-        json.dump(tweets_data_to_save, f, ensure_ascii=False, indent=4)
-
-    print(f"Successfully saved raw data to {raw_data_filename}")
+    # search (latest tab), every query fanned out across the account pool
+    # Each tweet is written out as soon as it arrives, as one compact NDJSON line;
+    # NDJSON is easy to append to and process.py reads it directly. The arrow format
+    # writes batches of compact columnar rows instead, which process.py reads without
+    # decoding any JSON, and the parquet format processes the tweets as it goes,
+    # writing the processed dataset itself.
+    # A backfill of [since, until) is split into time windows scraped in parallel,
+    # sized to about window_tweets tweets each as the tweet density becomes known;
+    # windows finished by an earlier run are skipped
+    # Polling for poll_minutes keeps every query's newest tweets coming in, polling
+    # each query as often as it has produced fresh tweets so far
+    checkpoints = ScrapeCheckpoints(checkpoint_file) if checkpoint_file else None
+    plan = None
+    if since is not None and until is not None:
+        plan = BackfillPlan(backfill_file, target_tweets=window_tweets, initial_window=timedelta(days=window_days))
+        backfills = [plan.add(query, since, until) for query in queries]
+        print(f"Backfilling {len(backfills)} queries, "
+              f"{sum(not plan.is_complete(key) for key in backfills)} of them unfinished")
+    scheduler = None
+    if poll_minutes is not None:
+        if plan is not None:
+            raise ValueError("poll_minutes polls for new tweets and cannot be combined with a backfill")
+        scheduler = QueryScheduler(queries, path=schedule_file or None)
+
+    # Tweets saved by earlier runs are dropped before they are written; the ids of this
+    # run's tweets are added once it ends, so overlapping queries do not stop each other
+    known_ids = SeenIdIndex(seen_index) if seen_index else None
+    scraped_ids = []
+    try:
+        writer_options = {'symbols_path': symbols_path} if output_format == 'parquet' else {}
+        with OUTPUT_WRITERS[output_format](output_dir, **writer_options) as writer:
+            # Progress is only saved once the tweets before it are on disk
+            progress = [state for state in (checkpoints, plan, scheduler) if state is not None]
+
+            def save_progress():
+                for state in progress:
+                    state.save()
+
+            for state in progress:
+                if output_format == 'parquet':
+                    # Syncing commits a whole Parquet file, so rather than on a timer,
+                    # progress is saved each time the writer commits one on its own
+                    state.save_interval = float('inf')
+                else:
+                    state.before_save = writer.sync
+            if output_format == 'parquet':
+                writer.on_commit = save_progress
+            if plan is not None:
+                tweets = iter_backfill_tweets(api, plan, concurrency=concurrency, known_ids=known_ids,
+                                              checkpoints=checkpoints)
+            elif scheduler is not None:
+                tweets = poll_queries(api, scheduler, poll_minutes * 60, concurrency=concurrency, known_ids=known_ids)
+            else:
+                tweets = iter_new_tweets(api, queries, limit=limit, concurrency=concurrency, known_ids=known_ids,
+                                         stop_after_known=stop_after_known, checkpoints=checkpoints)
+            try:
+                async for tweet in tweets:
+                    writer.write(tweet_to_row(tweet))
+                    scraped_ids.append(tweet.id)
+            finally:
+                if output_format == 'parquet':
+                    writer.sync()
+                save_progress()
+    finally:
+        if known_ids is not None:
+            known_ids.update(scraped_ids)
+            known_ids.flush()
+        if sessions is not None:
+            if refresh is not None:
+                await refresh
+            await forget_invalid_sessions(api, sessions)
+
+    print(f"Successfully saved {writer.records_written} tweets for {len(queries)} queries "
+          f"to {', '.join(writer.paths) or output_dir}")
+    if plan is not None:
+        for key in backfills:
+            windows = plan.backfills[key]['windows'].values()
+            print(f"{key}: {plan.progress(key):.0%} searched in {len(windows)} windows")
+    if scheduler is not None:
+        for query, state in scheduler.queries.items():
+            print(f"{query}: {state['fresh']} fresh tweets from {state['requests']} requests in {state['polls']} polls, "
+                  f"next poll in {scheduler.interval(query):.0f}s")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape tweets for one or more search queries.")
+    parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES,
+                        help="search queries, e.g. tickers or hashtags (default: the nifty/sensex query)")
+    parser.add_argument('--limit', type=int, default=20, help="maximum tweets per query")
+    parser.add_argument('--concurrency', type=int, help="concurrent searches (default: active accounts)")
+    parser.add_argument('--output-dir', default='raw_tweets', help="directory for the rotating output files")
+    parser.add_argument('--output-format', choices=sorted(OUTPUT_WRITERS), default='ndjson',
+                        help="raw output as NDJSON lines or Arrow stream batches, or processed tweets as Parquet")
+    parser.add_argument('--symbols', help="symbol dictionary for --output-format parquet (default: symbols.json)")
+    parser.add_argument('--seen-index', default='seen_ids.npy',
+                        help="file of the tweet ids already scraped, skipped on later runs ('' to disable)")
+    parser.add_argument('--stop-after-known', type=int, default=20,
+                        help="stop a search after this many already-scraped tweets in a row (0: keep paging)")
+    parser.add_argument('--checkpoint-file', default='scrape_checkpoints.json',
+                        help="file of each query's pagination cursor, to resume from ('' to disable)")
+    parser.add_argument('--since', help="backfill from this date (YYYY-MM-DD), with --until")
+    parser.add_argument('--until', help="backfill up to this date (exclusive)")
+    parser.add_argument('--window-days', type=float, default=1,
+                        help="days in the first backfill window; later ones are sized by the tweet density")
+    parser.add_argument('--window-tweets', type=int, default=1000, help="tweets to aim for per backfill window")
+    parser.add_argument('--backfill-file', default='backfill_plan.json',
+                        help="plan of the backfill windows and their completion, to resume from")
+    parser.add_argument('--poll-minutes', type=float,
+                        help="keep polling the queries for new tweets for this many minutes, busiest queries most often")
+    parser.add_argument('--schedule-file', default='poll_schedule.json',
+                        help="each query's tweet rate and newest tweet for --poll-minutes, to resume from")
+    parser.add_argument('--session-file', default='sessions.json',
+                        help="cache of the accounts' login sessions, reused by later runs ('' to log in every run)")
+    parser.add_argument('--session-ttl-hours', type=float, default=24.0,
+                        help="hours a cached session is reused before it is refreshed")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.queries, limit=args.limit, concurrency=args.concurrency, output_dir=args.output_dir,
+                     seen_index=args.seen_index, stop_after_known=args.stop_after_known or None,
+                     checkpoint_file=args.checkpoint_file, since=args.since, until=args.until,
+                     window_days=args.window_days, session_file=args.session_file,
+                     session_ttl_hours=args.session_ttl_hours, output_format=args.output_format,
+                     symbols_path=args.symbols, backfill_file=args.backfill_file,
+                     window_tweets=args.window_tweets, poll_minutes=args.poll_minutes,
+                     schedule_file=args.schedule_file))
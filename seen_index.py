@@ -0,0 +1,65 @@
+# seen_index.py
+import os
+
+import numpy as np
+
+class SeenIdIndex:
+    """
+    Persistent set of the tweet ids scraped so far.
+
+    The ids are kept as a sorted int64 array in a .npy file that is memory-mapped, so
+    the index costs 8 bytes per id on disk and only the pages touched by lookups in
+    memory; a lookup is a binary search. Unlike a Bloom filter it has no false
+    positives, so a new tweet is never dropped by mistake. Ids added during a run are
+    held in a set and merged into the file by flush(), which the context manager calls
+    on exit.
+    """
+
+    def __init__(self, path='seen_ids.npy'):
+        self.path = path
+        self._pending = set()
+        if os.path.exists(path):
+            self._ids = np.load(path, mmap_mode='r')
+        else:
+            self._ids = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._ids) + len(self._pending)
+
+    def __contains__(self, tweet_id):
+        if tweet_id in self._pending:
+            return True
+        position = np.searchsorted(self._ids, tweet_id)
+        return position < len(self._ids) and self._ids[position] == tweet_id
+
+    def add(self, tweet_id):
+        if tweet_id not in self:
+            self._pending.add(tweet_id)
+
+    def update(self, tweet_ids):
+        for tweet_id in tweet_ids:
+            self.add(tweet_id)
+
+    def flush(self):
+        """
+        Merges the ids added since the last flush into the file, atomically.
+        """
+        if not self._pending:
+            return
+        pending = np.fromiter(self._pending, dtype=np.int64, count=len(self._pending))
+        merged = np.union1d(self._ids, pending)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+        os.replace(tmp_path, self.path)
+        self._ids = np.load(self.path, mmap_mode='r')
+        self._pending = set()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
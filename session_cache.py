@@ -0,0 +1,69 @@
+# session_cache.py
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+# Cookies that make up a logged-in session, as twscrape requires them
+SESSION_COOKIES = ('auth_token', 'ct0')
+
+class SessionCache:
+    """
+    Logged-in account sessions kept in a JSON file, so that a scraper start reuses
+    them instead of logging every account in again.
+
+    Only sessions from a successful login (cookies including auth_token and ct0) are
+    stored, each with the time it was validated and an expiry ttl_hours later, after
+    which it is refreshed by a new login. An account the API deactivates, e.g. after
+    its session was rejected, is dropped with invalidate(). Changes are kept in
+    memory until save(). The file holds live auth_token and ct0 cookies, so it is
+    written readable by its owner only (mode 0600).
+    """
+
+    def __init__(self, path='sessions.json', ttl_hours=24.0):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.sessions = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.sessions = json.load(f)['sessions']
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, username, now=None):
+        """
+        Returns the cookies of an account's cached session, or None if there is none
+        or it has expired.
+        """
+        session = self.sessions.get(username)
+        now = now or datetime.now(timezone.utc)
+        if session is None or datetime.fromisoformat(session['expires_at']) <= now:
+            return None
+        return session['cookies']
+
+    def put(self, username, cookies):
+        """
+        Caches the session of an account that just logged in; cookies without a
+        complete session are not cached.
+        """
+        if not all(cookies.get(name) for name in SESSION_COOKIES):
+            self.invalidate(username)
+            return False
+        validated_at = datetime.now(timezone.utc)
+        self.sessions[username] = {'cookies': dict(cookies), 'validated_at': validated_at.isoformat(),
+                                   'expires_at': (validated_at + self.ttl).isoformat()}
+        return True
+
+    def invalidate(self, username):
+        self.sessions.pop(username, None)
+
+    def save(self):
+        """
+        Atomically replaces the cache file, readable by its owner only.
+        """
+        fd = os.open(self.path + '.tmp', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # A .tmp file left by an earlier version may have been created with wider permissions
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': self.sessions}, f, indent=4)
+        os.replace(self.path + '.tmp', self.path)
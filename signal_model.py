@@ -0,0 +1,179 @@
+# signal_model.py
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from signals import SIGNAL_WEIGHTS
+
+# Bumped whenever the artifact layout changes; load() refuses other versions
+FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'model.json'
+IDF_FILENAME = 'idf.npy'
+# Features min-max scaled into composite_signal and confidence, as in analyze_data
+SCALED_FEATURES = ['buzz_signal', 'retweet_count', 'like_count', 'user_followers']
+SCORING_COLUMNS = ['timestamp_utc', 'cleaned_content', 'retweet_count', 'like_count', 'user_followers']
+
+def _buzz(vectorizer, texts):
+    tfidf_matrix = vectorizer.transform(pd.Series(texts).fillna(''))
+    return np.asarray(tfidf_matrix.sum(axis=1)).ravel()
+
+class SignalModel:
+    """
+    The fitted parts of analyze_data's signal: the TF-IDF vocabulary and idf weights,
+    and the min/max each feature is scaled with.
+
+    fit() does what analyze_data does on every run; score() then turns any batch of
+    processed tweets into signals with those parameters, without refitting. Saved as a
+    directory holding a small JSON manifest and the idf weights as a .npy file, which
+    load() memory-maps.
+    """
+
+    def __init__(self, vocabulary, idf, scale_min, scale_max, weights=SIGNAL_WEIGHTS, info=None):
+        self.vocabulary = list(vocabulary)
+        self.idf = idf
+        self.scale_min = dict(scale_min)
+        self.scale_max = dict(scale_max)
+        self.weights = dict(weights)
+        self.info = dict(info or {})
+        self.vectorizer = TfidfVectorizer(vocabulary=self.vocabulary)
+        self.vectorizer.idf_ = idf
+
+    @classmethod
+    def fit(cls, df, max_features=100):
+        """
+        Fits the vectorizer and feature ranges on a frame of processed tweets.
+        """
+        vectorizer = TfidfVectorizer(max_features=max_features, stop_words='english')
+        vectorizer.fit(df['cleaned_content'].fillna(''))
+        features = df[SCALED_FEATURES[1:]].astype('float64')
+        features['buzz_signal'] = _buzz(vectorizer, df['cleaned_content'])
+        info = {'fitted_at': datetime.now(timezone.utc).isoformat(), 'tweets': len(df),
+                'max_features': max_features}
+        if 'timestamp_utc' in df and len(df):
+            info['data_start'] = pd.Timestamp(df['timestamp_utc'].min()).isoformat()
+            info['data_end'] = pd.Timestamp(df['timestamp_utc'].max()).isoformat()
+        return cls(vectorizer.get_feature_names_out(), vectorizer.idf_,
+                   features.min().to_dict(), features.max().to_dict(), info=info)
+
+    @property
+    def version(self):
+        """
+        Short hash identifying the fitted parameters.
+        """
+        digest = hashlib.sha256(json.dumps([self.vocabulary, self.scale_min, self.scale_max,
+                                            self.weights]).encode())
+        digest.update(np.ascontiguousarray(self.idf, dtype=np.float64).tobytes())
+        return digest.hexdigest()[:12]
+
+    def _scaled(self, name, values):
+        # Same as MinMaxScaler.transform; a constant feature scales to 0
+        low, high = self.scale_min[name], self.scale_max[name]
+        span = high - low if high > low else 1.0
+        return (np.asarray(values, dtype=np.float64) - low) / span
+
+    def score(self, df):
+        """
+        Returns buzz_signal, composite_signal and confidence for a frame of processed
+        tweets, aligned with its index.
+        """
+        buzz = _buzz(self.vectorizer, df['cleaned_content'])
+        composite = (
+            self.weights['buzz'] * self._scaled('buzz_signal', buzz) +
+            self.weights['retweets'] * self._scaled('retweet_count', df['retweet_count']) +
+            self.weights['likes'] * self._scaled('like_count', df['like_count'])
+        )
+        confidence = self._scaled('user_followers', df['user_followers'])
+        return pd.DataFrame({'buzz_signal': buzz, 'composite_signal': composite,
+                             'confidence': confidence}, index=df.index)
+
+    def save(self, path):
+        """
+        Writes the model to the directory path, replacing any previous model there.
+        """
+        manifest = {'format_version': FORMAT_VERSION, 'version': self.version,
+                    'vocabulary': self.vocabulary, 'scale_min': self.scale_min,
+                    'scale_max': self.scale_max, 'weights': self.weights, 'info': self.info}
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, IDF_FILENAME), np.asarray(self.idf, dtype=np.float64))
+        with open(os.path.join(tmp_path, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=1)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a model written by save(), memory-mapping its idf weights.
+        """
+        with open(os.path.join(path, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"{path} has model format {manifest.get('format_version')}, "
+                             f"expected {FORMAT_VERSION}; refit it with signal_model.py fit")
+        idf = np.load(os.path.join(path, IDF_FILENAME), mmap_mode='r')
+        return cls(manifest['vocabulary'], idf, manifest['scale_min'], manifest['scale_max'],
+                   manifest['weights'], manifest['info'])
+
+def fit_signal_model(input_parquet_path='processed_tweets.parquet', model_path='signal_model',
+                     start=None, end=None):
+    """
+    Fits a SignalModel on the processed tweets in [start, end) and saves it to model_path.
+    """
+    from analyze import load_processed_data
+
+    df = load_processed_data(input_parquet_path, start=start, end=end, columns=SCORING_COLUMNS)
+    model = SignalModel.fit(df)
+    model.save(model_path)
+    print(f"Fitted signal model {model.version} on {len(df):,} tweets, saved to {model_path}")
+    return model
+
+def score_batch(input_parquet_path, model_path='signal_model', output_parquet_path=None,
+                start=None, end=None):
+    """
+    Scores the processed tweets in [start, end) with a saved SignalModel and returns
+    them with their signals, optionally writing them to output_parquet_path.
+    """
+    from analyze import load_processed_data
+
+    started = time.perf_counter()
+    model = SignalModel.load(model_path)
+    loaded = time.perf_counter()
+    df = load_processed_data(input_parquet_path, start=start, end=end, columns=SCORING_COLUMNS)
+    read = time.perf_counter()
+    df[['buzz_signal', 'composite_signal', 'confidence']] = model.score(df).to_numpy()
+    scored = time.perf_counter()
+    print(f"Scored {len(df):,} tweets with model {model.version}: load {(loaded - started) * 1e3:.1f}ms, "
+          f"read {(read - loaded) * 1e3:.1f}ms, score {(scored - read) * 1e3:.1f}ms")
+    if output_parquet_path is not None:
+        df.to_parquet(output_parquet_path, index=False)
+        print(f"Signals saved to {output_parquet_path}")
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fit the signal model once, then score new batches with it.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in [('fit', "fit the model on processed tweets"),
+                            ('score', "score processed tweets with a saved model")]:
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument('--input', default='processed_tweets.parquet', help="Parquet file or dataset directory")
+        command_parser.add_argument('--model', default='signal_model', help="model directory")
+        command_parser.add_argument('--start', help="only use tweets at or after this UTC time")
+        command_parser.add_argument('--end', help="only use tweets before this UTC time")
+    subparsers.choices['score'].add_argument('--output', help="write the scored tweets to this Parquet file")
+    args = parser.parse_args()
+
+    if args.command == 'fit':
+        fit_signal_model(args.input, args.model, start=args.start, end=args.end)
+    else:
+        score_batch(args.input, args.model, args.output, start=args.start, end=args.end)
@@ -0,0 +1,136 @@
+# signals.py
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Weights of the normalised components in composite_signal; content buzz matters most
+SIGNAL_WEIGHTS = {'buzz': 0.6, 'retweets': 0.3, 'likes': 0.1}
+
+class RollingMinMax:
+    """
+    Minimum and maximum of the values pushed in a trailing time window.
+
+    Two monotonic deques hold only the values that can still become the window's
+    minimum or maximum, so each push costs O(1) amortised.
+    """
+
+    def __init__(self, window):
+        self.window = pd.Timedelta(window).value
+        self._mins = deque()
+        self._maxs = deque()
+
+    def push(self, time_ns, value):
+        """
+        Adds a value observed at time_ns (nanoseconds, non-decreasing) and returns the
+        (min, max) of the values in (time_ns - window, time_ns].
+        """
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((time_ns, value))
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((time_ns, value))
+        cutoff = time_ns - self.window
+        while mins[0][0] <= cutoff:
+            mins.popleft()
+        while maxs[0][0] <= cutoff:
+            maxs.popleft()
+        return mins[0][1], maxs[0][1]
+
+def _scale(value, low, high):
+    # A constant window scales to 0, like MinMaxScaler on a constant feature
+    return (value - low) / (high - low) if high > low else 0.0
+
+class StreamingSignalCalculator:
+    """
+    Computes composite_signal and confidence one tweet at a time, as tweets arrive.
+
+    Instead of a MinMaxScaler fit on the whole dataset, buzz_signal, retweet_count,
+    like_count and user_followers are min-max scaled over the tweets of the trailing
+    window (a pandas offset such as '1h'), so a signal only depends on tweets up to
+    and including its own and memory is bounded by the window.
+    """
+
+    def __init__(self, window='1h', weights=SIGNAL_WEIGHTS):
+        self.window = window
+        self.weights = weights
+        self._buzz = RollingMinMax(window)
+        self._retweets = RollingMinMax(window)
+        self._likes = RollingMinMax(window)
+        self._followers = RollingMinMax(window)
+
+    def update(self, timestamp, buzz_signal, retweet_count, like_count, user_followers):
+        """
+        Adds one tweet (in time order) and returns its (composite_signal, confidence).
+        """
+        time_ns = pd.Timestamp(timestamp).value
+        composite = (
+            self.weights['buzz'] * _scale(buzz_signal, *self._buzz.push(time_ns, buzz_signal)) +
+            self.weights['retweets'] * _scale(retweet_count, *self._retweets.push(time_ns, retweet_count)) +
+            self.weights['likes'] * _scale(like_count, *self._likes.push(time_ns, like_count))
+        )
+        confidence = _scale(user_followers, *self._followers.push(time_ns, user_followers))
+        return composite, confidence
+
+def _rolling_scaled(series, window):
+    rolling = series.rolling(window)
+    low, high = rolling.min(), rolling.max()
+    span = high - low
+    return ((series - low) / span.where(span > 0)).fillna(0.0)
+
+def trailing_window_signals(df, window='1h', weights=SIGNAL_WEIGHTS):
+    """
+    Returns composite_signal and confidence for a time-indexed, sorted frame of tweets,
+    the same values StreamingSignalCalculator emits when fed the tweets one by one,
+    computed with vectorised rolling windows.
+    """
+    composite = (
+        weights['buzz'] * _rolling_scaled(df['buzz_signal'].astype('float64'), window) +
+        weights['retweets'] * _rolling_scaled(df['retweet_count'].astype('float64'), window) +
+        weights['likes'] * _rolling_scaled(df['like_count'].astype('float64'), window)
+    )
+    confidence = _rolling_scaled(df['user_followers'].astype('float64'), window)
+    return pd.DataFrame({'composite_signal': composite, 'confidence': confidence}, index=df.index)
+
+def _grouped_scaled(values, groups, times, window):
+    """
+    Min-max scales values within each group, over the whole group or, with window,
+    over the group's trailing window. Rows of a group must be contiguous and in time
+    order.
+    """
+    series = pd.Series(values, index=times)
+    if window is None:
+        grouped = series.groupby(groups, sort=False)
+        low, high = grouped.transform('min').to_numpy(), grouped.transform('max').to_numpy()
+    else:
+        # Results come back group by group, which is the row order already
+        rolling = series.groupby(groups, sort=False).rolling(window)
+        low, high = rolling.min().to_numpy(), rolling.max().to_numpy()
+    span = high - low
+    scaled = (values - low) / np.where(span > 0, span, 1.0)
+    return np.where(span > 0, scaled, 0.0)
+
+def grouped_signals(df, groups, window=None, weights=SIGNAL_WEIGHTS):
+    """
+    Returns composite_signal and confidence for a time-indexed frame of tweets with
+    every feature min-max scaled among the tweets of the same group (e.g. a symbol),
+    for all groups in one pass.
+
+    Without window the scaling spans the whole group, as analyze_data's MinMaxScaler
+    does for all tweets; with window it spans the group's trailing window, as
+    trailing_window_signals does. groups holds one label per row; the rows of each
+    group must be contiguous and sorted by time.
+    """
+    groups = np.asarray(groups)
+
+    def scaled(column):
+        return _grouped_scaled(df[column].to_numpy(dtype='float64'), groups, df.index, window)
+
+    composite = (
+        weights['buzz'] * scaled('buzz_signal') +
+        weights['retweets'] * scaled('retweet_count') +
+        weights['likes'] * scaled('like_count')
+    )
+    return pd.DataFrame({'composite_signal': composite, 'confidence': scaled('user_followers')}, index=df.index)
@@ -0,0 +1,230 @@
+# symbols.py
+import csv
+import functools
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Indices, Nifty 50 stocks and a few other instruments; pass another dictionary to
+# process.py --symbols to track a different universe
+DEFAULT_SYMBOLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'symbols.json')
+
+SYMBOLS_TYPE = pa.list_(pa.string())
+
+def normalize_alias(alias):
+    """
+    Splits a symbol name into the tokens it appears as in cleaned_content, which has
+    punctuation removed and is lowercased (see process.clean_tweet_content).
+    """
+    return re.sub(r'[^\w\s]', '', alias).lower().split()
+
+def load_symbol_dictionary(path=DEFAULT_SYMBOLS_PATH):
+    """
+    Reads a symbol dictionary: a JSON object mapping each symbol to a list of names it
+    goes by, or a CSV file with the symbol in the first column and its names in the
+    others (a header row starting with 'symbol' is skipped).
+    """
+    if path.endswith('.csv'):
+        dictionary = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() == 'symbol':
+                    continue
+                names = dictionary.setdefault(row[0].strip(), [])
+                names.extend(name.strip() for name in row[1:] if name.strip())
+        return dictionary
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class SymbolMatcher:
+    """
+    Finds the symbols of a dictionary mentioned in tweets, over cleaned_content and
+    the hashtags.
+
+    Every symbol matches its own name and its aliases as whole tokens, and multi-word
+    aliases also match written as one word ('bank nifty' matches #BankNifty). The
+    aliases are compiled into a token trie stored level by level: at level n an Arrow
+    hash set holds the n-token phrases, and another the (n-1)-token prefixes that
+    continue into a longer phrase. Matching walks all tokens of a batch down the trie
+    together, so each level is a handful of Arrow kernels over the surviving
+    positions, and the work stays proportional to the tokens whatever the size of
+    the dictionary.
+    """
+
+    def __init__(self, dictionary):
+        self.symbols = sorted(dictionary)
+        phrase_symbols = {}
+        for code, symbol in enumerate(self.symbols):
+            for alias in [symbol, *dictionary[symbol]]:
+                tokens = normalize_alias(alias)
+                if not tokens:
+                    continue
+                for phrase in {' '.join(tokens), ''.join(tokens)}:
+                    phrase_symbols.setdefault(phrase, set()).add(code)
+
+        phrases = sorted(phrase_symbols)
+        self.max_tokens = max((phrase.count(' ') + 1 for phrase in phrases), default=0)
+        self._phrases = pa.array(phrases, type=pa.string())
+        # Symbols of phrase i are _phrase_codes[_phrase_offsets[i]:_phrase_offsets[i + 1]]
+        codes = [sorted(phrase_symbols[phrase]) for phrase in phrases]
+        self._phrase_offsets = np.concatenate([[0], np.cumsum([len(c) for c in codes])]).astype(np.int64)
+        self._phrase_codes = np.array([code for c in codes for code in c], dtype=np.int64)
+        self._prefixes = {}
+        for n in range(2, self.max_tokens + 1):
+            prefixes = {' '.join(phrase.split(' ')[:n - 1]) for phrase in phrases if phrase.count(' ') + 1 >= n}
+            self._prefixes[n] = pa.array(sorted(prefixes), type=pa.string())
+        self._symbol_array = pa.array(self.symbols, type=pa.string())
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_SYMBOLS_PATH):
+        return cls(load_symbol_dictionary(path))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _phrase_matches(self, strings):
+        """
+        Returns the phrase number of each string, -1 where it is not a phrase.
+        """
+        return pc.fill_null(pc.index_in(strings, value_set=self._phrases), -1).to_numpy()
+
+    def _match_array(self, contents, hashtags):
+        rows, phrase_ids = [], []
+
+        # Content: walk every token position down the trie, one level per token
+        tokens = pc.utf8_split_whitespace(pc.fill_null(contents, ''))
+        flat = pc.list_flatten(tokens)
+        parents = pc.list_parent_indices(tokens).to_numpy()
+        positions = np.arange(len(flat))
+        grams = flat
+        for n in range(1, self.max_tokens + 1):
+            if n > 1:
+                # Keep the grams that can continue into a longer phrase within the same tweet
+                ends = positions + (n - 1)
+                keep = ends < len(flat)
+                keep[keep] = parents[ends[keep]] == parents[positions[keep]]
+                keep &= pc.is_in(grams, value_set=self._prefixes[n]).to_numpy(zero_copy_only=False)
+                if not keep.any():
+                    break
+                positions = positions[keep]
+                grams = pc.binary_join_element_wise(grams.filter(pa.array(keep)),
+                                                    flat.take(pa.array(positions + (n - 1))), ' ')
+            found = self._phrase_matches(grams)
+            hit = found >= 0
+            rows.append(parents[positions[hit]])
+            phrase_ids.append(found[hit])
+
+        # Hashtags are single tokens without the '#'
+        if hashtags is not None:
+            tags = pc.utf8_lower(pc.list_flatten(hashtags))
+            found = self._phrase_matches(tags)
+            hit = found >= 0
+            rows.append(pc.list_parent_indices(hashtags).to_numpy()[hit])
+            phrase_ids.append(found[hit])
+
+        rows = np.concatenate(rows).astype(np.int64)
+        phrase_ids = np.concatenate(phrase_ids).astype(np.int64)
+
+        # Expand each matched phrase into its symbols
+        starts = self._phrase_offsets[phrase_ids]
+        counts = self._phrase_offsets[phrase_ids + 1] - starts
+        rows = np.repeat(rows, counts)
+        codes = self._phrase_codes[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+        # One sorted entry per tweet and symbol
+        keys = np.unique(rows * max(len(self.symbols), 1) + codes)
+        rows, codes = np.divmod(keys, max(len(self.symbols), 1))
+        offsets = np.zeros(len(contents) + 1, dtype=np.int32)
+        offsets[1:] = np.cumsum(np.bincount(rows, minlength=len(contents)))
+        return pa.ListArray.from_arrays(pa.array(offsets), self._symbol_array.take(pa.array(codes)))
+
+    def match(self, contents, hashtags=None):
+        """
+        Returns the symbols mentioned in each tweet as a list<string> array, sorted
+        and without repeats (empty for tweets that mention none).
+
+        contents is the cleaned_content column and hashtags the hashtags column, as
+        pyarrow arrays, chunked arrays or pandas Series.
+        """
+        if isinstance(contents, pd.Series):
+            contents = pa.array(contents, type=pa.string(), from_pandas=True)
+        if isinstance(hashtags, pd.Series):
+            hashtags = pa.array(hashtags, type=SYMBOLS_TYPE, from_pandas=True)
+
+        if not isinstance(contents, pa.ChunkedArray):
+            if isinstance(hashtags, pa.ChunkedArray):
+                hashtags = hashtags.combine_chunks()
+            return self._match_array(contents, hashtags)
+        if hashtags is None:
+            return pa.chunked_array([self._match_array(chunk, None) for chunk in contents.chunks], type=SYMBOLS_TYPE)
+        if not isinstance(hashtags, pa.ChunkedArray):
+            hashtags = pa.chunked_array([hashtags])
+        if [len(c) for c in contents.chunks] != [len(c) for c in hashtags.chunks]:
+            contents, hashtags = pa.chunked_array([contents.combine_chunks()]), pa.chunked_array([hashtags.combine_chunks()])
+        return pa.chunked_array([self._match_array(chunk, tags) for chunk, tags in zip(contents.chunks, hashtags.chunks)],
+                                type=SYMBOLS_TYPE)
+
+@functools.lru_cache(maxsize=8)
+def load_symbol_matcher(path=None):
+    """
+    Returns the SymbolMatcher for a dictionary file (the default dictionary for None),
+    compiled once per process.
+    """
+    return SymbolMatcher.from_file(path or DEFAULT_SYMBOLS_PATH)
+
+class SymbolIndex:
+    """
+    Inverted index of a symbols column: for each symbol, the positions of the tweets
+    that mention it.
+
+    Built from the symbols lists alone, so per-symbol analysis never goes back to the
+    tweet text. The postings of all symbols are stored in one array, grouped by symbol
+    (in sorted order) and in row order within a symbol: rows[offsets[i]:offsets[i + 1]]
+    are the rows mentioning symbols[i].
+    """
+
+    def __init__(self, symbols_column):
+        if isinstance(symbols_column, pd.Series):
+            symbols_column = pa.array(symbols_column, type=SYMBOLS_TYPE, from_pandas=True)
+        if isinstance(symbols_column, pa.ChunkedArray):
+            symbols_column = symbols_column.combine_chunks()
+        self.num_rows = len(symbols_column)
+        parents = pc.list_parent_indices(symbols_column).to_numpy()
+        encoded = pc.dictionary_encode(pc.list_flatten(symbols_column))
+        names = encoded.dictionary.to_numpy(zero_copy_only=False)
+        order = np.argsort(names)
+        rank = np.empty(len(names), dtype=np.int64)
+        rank[order] = np.arange(len(names))
+        codes = rank[encoded.indices.to_numpy()]
+
+        self.symbols = names[order]
+        self.rows = parents[np.argsort(codes, kind='stable')]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(names)))]).astype(np.int64)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        position = np.searchsorted(self.symbols, symbol)
+        return position < len(self.symbols) and self.symbols[position] == symbol
+
+    def rows_for(self, symbol):
+        """
+        Returns the sorted positions of the tweets mentioning symbol.
+        """
+        if symbol not in self:
+            return np.zeros(0, dtype=np.int64)
+        position = np.searchsorted(self.symbols, symbol)
+        return self.rows[self.offsets[position]:self.offsets[position + 1]]
+
+    def counts(self):
+        """
+        Returns the number of tweets mentioning each symbol, most mentioned first.
+        """
+        counts = pd.Series(np.diff(self.offsets), index=self.symbols, name='tweets')
+        return counts.sort_values(ascending=False, kind='stable')
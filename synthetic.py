@@ -0,0 +1,94 @@
+# synthetic.py
+import random
+from datetime import datetime, timedelta, timezone
+
+from tweet_writers import NDJSONTweetWriter
+
+# Vocabulary loosely modelled on raw_tweets.json so the synthetic content exercises
+# the same regex paths (hashtags, mentions, t.co links, emoji, numbers, newlines).
+HASHTAGS = [
+    'Nifty', 'Nifty50', 'nifty', 'sensex', 'Sensex', 'banknifty', 'BankNifty', 'NiftyBank',
+    'FinNifty', 'NiftyMidcap', 'NiftySmallCap', 'StockMarket', 'StocksToBuy', 'StocksToWatch',
+    'StocksInFocus', 'BreakoutStocks', 'OptionsTrading', 'intraday', 'trading', 'investing',
+    'mutualfunds', 'stocks', 'nse', 'bse', 'MarketTrends', 'Updates',
+]
+WORDS = [
+    'market', 'nifty', 'breakout', 'support', 'resistance', 'levels', 'target', 'stoploss',
+    'bullish', 'bearish', 'chart', 'daily', 'weekly', 'trend', 'momentum', 'volume', 'buy',
+    'sell', 'hold', 'entry', 'exit', 'futures', 'options', 'call', 'put', 'expiry', 'gap',
+    'up', 'down', 'rally', 'crash', 'the', 'is', 'at', 'for', 'and', 'on', 'in', 'today',
+    'view', 'position', 'lots', 'avg', 'price', 'high', 'low', 'close', 'open',
+]
+PUNCTUATION = ['.', ',', ':', '!', '?', '(', ')', '-', '/', '"', '&amp;', '%', '+', '₹']
+EMOJI = ['📈', '📉', '🚀', '🔥', '🔹', '✅', '🇮🇳', '💰']
+LOCATIONS = ['', '', 'India', 'Noida', 'Mumbai', 'MUMBAI', 'Mumbai, India', 'New Delhi, India',
+             'Chandigarh', 'kolkata 🇮🇳 ', 'Bengaluru', 'DM for Collaboration']
+
+# Twitter snowflake ids encode the creation time in milliseconds since this epoch
+TWITTER_EPOCH_MS = 1288834974657
+
+def _synthetic_content(rng, hashtags, mentions):
+    """
+    Builds one tweet body out of words, numbers, punctuation, emoji, tags and links.
+    """
+    tokens = []
+    for _ in range(rng.randint(4, 40)):
+        roll = rng.random()
+        if roll < 0.65:
+            tokens.append(rng.choice(WORDS))
+        elif roll < 0.75:
+            tokens.append(str(rng.randint(1, 99999)))
+        elif roll < 0.85:
+            tokens.append(rng.choice(PUNCTUATION))
+        elif roll < 0.92:
+            tokens.append(rng.choice(EMOJI))
+        else:
+            tokens.append('\n')
+    for user in mentions:
+        tokens.insert(rng.randint(0, len(tokens)), '@' + user)
+    if rng.random() < 0.6:
+        link = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJ0123456789') for _ in range(10))
+        tokens.append('https://t.co/' + link)
+    tokens.extend('#' + tag for tag in hashtags)
+    return ' '.join(tokens)
+
+def generate_synthetic_tweets(n, seed=42, start=datetime(2025, 8, 1, tzinfo=timezone.utc)):
+    """
+    Yields n deterministic synthetic tweets with the same fields as raw_tweets.json.
+    """
+    rng = random.Random(seed)
+    usernames = [f'trader{i:05d}' for i in range(max(1, min(n // 20, 50_000)))]
+    timestamp = start
+    for seq in range(n):
+        timestamp += timedelta(milliseconds=rng.randint(1, 2000))
+        ms = int(timestamp.timestamp() * 1000)
+        tweet_id = ((ms - TWITTER_EPOCH_MS) << 22) | (seq & 0x3FFFFF)
+        username = rng.choice(usernames)
+        hashtags = rng.sample(HASHTAGS, rng.randint(0, 8))
+        mentions = rng.sample(usernames, min(rng.randint(0, 2), len(usernames))) if rng.random() < 0.2 else []
+        yield {
+            'id': tweet_id,
+            'username': username,
+            'timestamp_utc': timestamp.replace(microsecond=0).isoformat(),
+            'content': _synthetic_content(rng, hashtags, mentions),
+            'like_count': int(rng.paretovariate(1.5)) - 1,
+            'retweet_count': int(rng.paretovariate(2.0)) - 1,
+            'reply_count': int(rng.paretovariate(2.5)) - 1,
+            'quote_count': int(rng.paretovariate(3.0)) - 1,
+            'hashtags': hashtags,
+            'mentioned_users': mentions,
+            'url': f'https://x.com/{username}/status/{tweet_id}',
+            'user_followers': int(rng.paretovariate(0.8)),
+            'user_location': rng.choice(LOCATIONS),
+        }
+
+def write_synthetic_ndjson(directory, n, seed=42):
+    """
+    Writes n synthetic tweets to rotating NDJSON files in directory, the way the
+    scraper writes real ones, and returns the file paths.
+    """
+    with NDJSONTweetWriter(directory, prefix='synthetic', max_seconds=float('inf'),
+                           fsync_every=100_000, fsync_interval=60.0) as writer:
+        for tweet in generate_synthetic_tweets(n, seed=seed):
+            writer.write(tweet)
+    return writer.paths
@@ -0,0 +1,303 @@
+# tweet_writers.py
+import json
+import os
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from process import ARROW_EXTENSION, PARQUET_COMPRESSION, PROCESSED_SCHEMA, RAW_SCHEMA, process_table
+
+# One scraped tweet with the fields we keep, in RAW_SCHEMA order. A tuple holds them
+# without a per-record dict of field names.
+TweetRecord = namedtuple('TweetRecord', RAW_SCHEMA.names)
+
+def records_to_batch(records):
+    """
+    Converts a list of TweetRecords into one Arrow record batch with RAW_SCHEMA,
+    building each column from the transposed rows in a single call.
+    """
+    columns = zip(*records) if records else [[]] * len(RAW_SCHEMA)
+    return pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, RAW_SCHEMA)],
+                           schema=RAW_SCHEMA)
+
+def serialize_records(records, compression=None):
+    """
+    Serializes a list of TweetRecords as an Arrow IPC stream holding one record batch.
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, RAW_SCHEMA, options=pa.ipc.IpcWriteOptions(compression=compression)) as writer:
+        writer.write_batch(records_to_batch(records))
+    return sink.getvalue()
+
+class NDJSONTweetWriter:
+    """
+    Appends scraped tweet records to newline-delimited JSON files as they arrive.
+
+    Each record is written as one compact line in a single call, and the file is
+    flushed and fsync'ed every fsync_every records or fsync_interval seconds, so a
+    crash loses at most the last few records and never garbles earlier lines. A new
+    file is started once the current one reaches max_bytes or has been open for
+    max_seconds. Files are named <prefix>-<UTC start time>-<n>.ndjson inside directory,
+    which process.py can read directly (process.py --input <directory>).
+    """
+
+    def __init__(self, directory='raw_tweets', prefix='raw_tweets', max_bytes=256 << 20,
+                 max_seconds=3600, fsync_every=500, fsync_interval=5.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.paths = []
+        self.records_written = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_next(self):
+        self.close()
+        started = datetime.now(timezone.utc)
+        path = os.path.join(self.directory, f"{self.prefix}-{started:%Y%m%dT%H%M%S}-{len(self.paths):04d}.ndjson")
+        self._file = open(path, 'a', encoding='utf-8')
+        self._opened_at = time.monotonic()
+        self._last_sync = self._opened_at
+        self._unsynced = 0
+        # Counted rather than asked of the file, as tell() would flush every line
+        self._bytes = 0
+        self.paths.append(path)
+
+    def write(self, record):
+        """
+        Appends one record (a dict or a TweetRecord), rotating and syncing the file as
+        configured.
+        """
+        if isinstance(record, TweetRecord):
+            record = record._asdict()
+        now = time.monotonic()
+        if self._file is None or self._bytes >= self.max_bytes or now - self._opened_at >= self.max_seconds:
+            self._open_next()
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self._file.write(line)
+        self._bytes += len(line.encode('utf-8'))
+        self.records_written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """
+        Flushes buffered records and fsyncs them to disk.
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+        self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ArrowTweetWriter:
+    """
+    Appends scraped tweets to Arrow IPC stream files in compact columnar batches.
+
+    Records are buffered as TweetRecords and written as one record batch (RAW_SCHEMA,
+    buffers compressed with compression) once batch_size of them are pending or on
+    sync(), which also fsyncs the file; sync() runs at least every sync_interval
+    seconds while records arrive. A crash loses at most the pending records: a
+    stream cut off inside a batch still reads up to the last complete one. Files are
+    rotated like NDJSONTweetWriter's and named <prefix>-<UTC start time>-<writer
+    id>-<n>.arrows, the writer id being random so runs started in the same second
+    never share a name; an existing file is never overwritten. process.py reads them
+    without any JSON decoding.
+    """
+
+    def __init__(self, directory='raw_tweets', prefix='raw_tweets', batch_size=1000, max_bytes=256 << 20,
+                 max_seconds=3600, sync_interval=5.0, compression='zstd'):
+        self.directory = directory
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.sync_interval = sync_interval
+        self.options = pa.ipc.IpcWriteOptions(compression=compression)
+        self.writer_id = uuid.uuid4().hex[:8]
+        self.paths = []
+        self.records_written = 0
+        self._pending = []
+        self._file = None
+        self._writer = None
+        self._last_sync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_next(self):
+        self._close_file()
+        started = datetime.now(timezone.utc)
+        name = f"{self.prefix}-{started:%Y%m%dT%H%M%S}-{self.writer_id}-{len(self.paths):04d}{ARROW_EXTENSION}"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, 'xb')
+        self._writer = pa.ipc.new_stream(self._file, RAW_SCHEMA, options=self.options)
+        self._opened_at = time.monotonic()
+        self.paths.append(path)
+
+    def write(self, record):
+        """
+        Buffers one record (a TweetRecord or a dict), writing out a batch as configured.
+        """
+        if not isinstance(record, TweetRecord):
+            record = TweetRecord(**record)
+        self._pending.append(record)
+        self.records_written += 1
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """
+        Writes the pending records as one batch and fsyncs the file.
+        """
+        self._last_sync = time.monotonic()
+        if not self._pending:
+            return
+        if (self._file is None or self._file.tell() >= self.max_bytes
+                or self._last_sync - self._opened_at >= self.max_seconds):
+            self._open_next()
+        self._writer.write_batch(records_to_batch(self._pending))
+        self._pending = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close_file(self):
+        if self._file is not None:
+            self._writer.close()
+            self._file.close()
+            self._file, self._writer = None, None
+
+    def close(self):
+        self.sync()
+        self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ParquetTweetWriter:
+    """
+    Processes scraped tweets as they arrive and writes them as Parquet files with
+    PROCESSED_SCHEMA, the same tweets process.py would produce from the raw output.
+
+    Records are buffered as TweetRecords; every row_group_size of them are run through
+    process.process_table (symbols from the dictionary at symbols_path) and written
+    as one row group. A Parquet file is only readable once its footer is written, so
+    each file is written under a hidden name and committed once it holds max_rows
+    rows, max_seconds after the last commit, or on sync(), which also writes the
+    pending records. Committing links it into place as <prefix>-<UTC start
+    time>-<writer id>-<n>.parquet, named as ArrowTweetWriter names its files, and
+    never over an existing file. A crash loses the records since the last commit, so scrape
+    progress is best saved from on_commit, called after every commit, rather than by
+    forcing small files with sync(). The directory is a Parquet dataset analyze.py
+    reads as it is, and process.py merges it into a single output without decoding
+    any JSON.
+    """
+
+    def __init__(self, directory='processed_tweets', prefix='tweets', row_group_size=10_000,
+                 max_rows=1_000_000, max_seconds=3600, symbols_path=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.row_group_size = row_group_size
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.symbols_path = symbols_path
+        self.writer_id = uuid.uuid4().hex[:8]
+        self.paths = []
+        self.records_written = 0
+        self._pending = []
+        self._writer = None
+        self._rows = 0
+        self._last_commit = time.monotonic()
+        self.on_commit = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_next(self):
+        started = datetime.now(timezone.utc)
+        name = f"{self.prefix}-{started:%Y%m%dT%H%M%S}-{self.writer_id}-{len(self.paths):04d}.parquet"
+        self._path = os.path.join(self.directory, name)
+        # Parquet dataset readers skip names starting with '.'
+        self._tmp_path = os.path.join(self.directory, '.' + name + '.tmp')
+        self._writer = pq.ParquetWriter(self._tmp_path, PROCESSED_SCHEMA, compression=PARQUET_COMPRESSION)
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._open_next()
+        raw = pa.Table.from_batches([records_to_batch(self._pending)])
+        self._pending = []
+        table = process_table(raw, self.symbols_path)
+        self._writer.write_table(table)
+        self._rows += table.num_rows
+
+    def _commit(self):
+        """
+        Writes the footer of the current file, fsyncs it and moves it into place; a
+        file already committed under the same name raises FileExistsError.
+        """
+        self._last_commit = time.monotonic()
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self._rows = 0
+        with open(self._tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        # Unlike a rename, a link fails rather than replace an existing file
+        os.link(self._tmp_path, self._path)
+        os.remove(self._tmp_path)
+        self.paths.append(self._path)
+        if self.on_commit is not None:
+            self.on_commit()
+
+    def write(self, record):
+        """
+        Buffers one record (a TweetRecord or a dict), writing a row group and
+        committing the file as configured.
+        """
+        if not isinstance(record, TweetRecord):
+            record = TweetRecord(**record)
+        self._pending.append(record)
+        self.records_written += 1
+        if len(self._pending) >= self.row_group_size:
+            self._write_pending()
+        if self._rows >= self.max_rows or time.monotonic() - self._last_commit >= self.max_seconds:
+            self.sync()
+
+    def sync(self):
+        """
+        Writes the pending records and commits the current file.
+        """
+        self._write_pending()
+        self._commit()
+
+    def close(self):
+        self.sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()